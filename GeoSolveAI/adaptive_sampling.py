@@ -0,0 +1,147 @@
+"""
+Adaptive sampling of y = f(x) for /api/plot.
+
+Starts from a coarse uniform grid and repeatedly bisects the intervals where
+the curve bends sharply, changes a lot relative to its overall span, or runs
+into the edge of its domain; every round evaluates all new midpoints in one
+vectorized call. Smooth curves stop refining almost immediately, while
+oscillating or steep regions get the points. Jumps that survive refinement
+down to the minimum interval width (or change sign across a huge jump, as at
+the poles of tan(x) and 1/x) are treated as discontinuities: a NaN is
+inserted so the line is broken there instead of drawn as a false vertical
+segment. The total number of function evaluations never exceeds the budget.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+INITIAL_POINTS = 65
+DEFAULT_BUDGET = 2000
+# Bisect where adjacent segments turn by more than this (radians, normalized coordinates)
+ANGLE_TOLERANCE = 0.1
+# ... or where one interval changes by more than this fraction of the curve's span
+JUMP_TOLERANCE = 0.05
+# Refinement stops at this fraction of the plotted range
+MIN_WIDTH_FRACTION = 1e-6
+# Intervals lying entirely this many spans beyond the typical range are off-screen
+OFFSCREEN_SPANS = 2.0
+
+SampledCurve = namedtuple('SampledCurve', ['x', 'y', 'evaluations', 'breaks', 'y_limits'])
+SharedSamples = namedtuple('SharedSamples', ['x', 'ys', 'evaluations', 'breaks', 'y_limits'])
+
+
+def _evaluate(f, xs):
+    with np.errstate(all='ignore'):
+        ys = np.asarray(f(xs))
+    if np.iscomplexobj(ys):
+        ys = np.where(np.abs(ys.imag) < 1e-12, ys.real, np.nan)
+    return np.broadcast_to(ys.astype(float), xs.shape).copy()
+
+
+def _robust_range(ys):
+    """5th-95th percentile of the finite values, so poles do not dominate the scale."""
+    finite = ys[np.isfinite(ys)]
+    if finite.size < 2:
+        return None
+    low, high = np.percentile(finite, [5, 95])
+    return float(low), float(high)
+
+
+def _offscreen(ys, y_range, y_scale):
+    """Intervals whose endpoints both lie far beyond the same edge of the typical range."""
+    if not y_range:
+        return np.zeros(len(ys) - 1, dtype=bool)
+    with np.errstate(invalid='ignore'):
+        above = ys > y_range[1] + OFFSCREEN_SPANS * y_scale
+        below = ys < y_range[0] - OFFSCREEN_SPANS * y_scale
+    return (above[:-1] & above[1:]) | (below[:-1] & below[1:])
+
+
+def _interval_scores(xs, ys, x_scale, y_scale, y_range):
+    """Refinement priority per interval; zero means the interval is fine as it is."""
+    finite = np.isfinite(ys)
+    both = finite[:-1] & finite[1:]
+    dx = np.diff(xs) / x_scale
+    dy = np.where(both, np.diff(np.where(finite, ys, 0.0)) / y_scale, 0.0)
+
+    scores = np.where(np.abs(dy) > JUMP_TOLERANCE, np.abs(dy), 0.0)
+    # Domain edges: one endpoint defined and the other not
+    scores[finite[:-1] != finite[1:]] = 1.0
+
+    if len(dx) > 1:
+        angles = np.arctan2(dy, dx)
+        turn = np.where(both[:-1] & both[1:], np.abs(np.diff(angles)), 0.0)
+        bend = turn > ANGLE_TOLERANCE
+        scores[:-1][bend] = np.maximum(scores[:-1][bend], turn[bend])
+        scores[1:][bend] = np.maximum(scores[1:][bend], turn[bend])
+
+    # Steep flanks of a pole far outside the view are never drawn; do not spend points there
+    scores[_offscreen(ys, y_range, y_scale)] = 0.0
+    return scores, dy
+
+
+def _row_scale(ys):
+    y_range = _robust_range(ys)
+    if not y_range:
+        return None, 1.0
+    span = y_range[1] - y_range[0]
+    return y_range, span if span >= 1e-12 else max(abs(y_range[0]), 1.0)
+
+
+def sample_many(funcs, start, stop, budget=DEFAULT_BUDGET, initial=INITIAL_POINTS):
+    """
+    Sample several vectorized functions of one parameter on a shared adaptive grid.
+    An interval is refined when any of the functions needs it, so overlays cost one
+    grid. Returns SharedSamples with ys shaped (len(funcs), points); budget counts
+    grid points.
+    """
+    initial = max(2, min(initial, budget))
+    xs = np.linspace(start, stop, initial)
+    ys = np.array([_evaluate(f, xs) for f in funcs])
+    evaluations = initial
+
+    x_scale = (stop - start) or 1.0
+    scales = [_row_scale(row) for row in ys]
+    min_width = abs(x_scale) * MIN_WIDTH_FRACTION
+
+    while evaluations < budget:
+        scores = np.max([_interval_scores(xs, row, x_scale, y_scale, y_range)[0]
+                         for row, (y_range, y_scale) in zip(ys, scales)], axis=0)
+        candidates = np.nonzero((scores > 0) & (np.abs(np.diff(xs)) > min_width))[0]
+        if candidates.size == 0:
+            break
+        remaining = budget - evaluations
+        if candidates.size > remaining:
+            candidates = np.sort(candidates[np.argsort(scores[candidates])[::-1][:remaining]])
+        mids = (xs[candidates] + xs[candidates + 1]) / 2
+        xs = np.insert(xs, candidates + 1, mids)
+        ys = np.insert(ys, candidates + 1, np.array([_evaluate(f, mids) for f in funcs]), axis=1)
+        evaluations += mids.size
+
+    # Jumps refinement could not resolve are discontinuities (poles, steps)
+    narrow = np.abs(np.diff(xs)) <= 2 * min_width
+    row_breaks, y_limits = [], []
+    for row, (y_range, y_scale) in zip(ys, scales):
+        _, dy = _interval_scores(xs, row, x_scale, y_scale, y_range)
+        pole = (np.sign(row[:-1]) * np.sign(row[1:]) < 0) & (np.abs(dy) > 1.0)
+        row_breaks.append((np.abs(dy) > JUMP_TOLERANCE) & (narrow | pole) & ~_offscreen(row, y_range, y_scale))
+        # Clip the view to the curve's typical span; values near poles run off to infinity
+        y_limits.append((y_range[0] - 0.25 * y_scale, y_range[1] + 0.25 * y_scale) if pole.any() and y_range else None)
+
+    breaks = np.nonzero(np.any(row_breaks, axis=0))[0]
+    if breaks.size:
+        # One inserted column per break: NaN for the curves broken there, the midpoint for the rest
+        fill = np.where(np.array(row_breaks)[:, breaks], np.nan, (ys[:, breaks] + ys[:, breaks + 1]) / 2)
+        xs = np.insert(xs, breaks + 1, (xs[breaks] + xs[breaks + 1]) / 2)
+        ys = np.insert(ys, breaks + 1, fill, axis=1)
+
+    return SharedSamples(xs, ys, evaluations, [int(b.sum()) for b in row_breaks], y_limits)
+
+
+def sample(f, start, stop, budget=DEFAULT_BUDGET, initial=INITIAL_POINTS):
+    """
+    Sample a vectorized function over [start, stop] adaptively.
+    Returns a SampledCurve; y contains NaN at domain gaps and discontinuities.
+    """
+    shared = sample_many([f], start, stop, budget, initial)
+    return SampledCurve(shared.x, shared.ys[0], shared.evaluations, shared.breaks[0], shared.y_limits[0])
@@ -0,0 +1,158 @@
+"""
+Keyset-paginated, filterable admin lists (users, feedback, quizzes, quiz submissions).
+
+Lists are ordered newest first on (timestamp, id) and paged by cursor: the
+cursor carries the (timestamp, id) of the last row returned, and the next
+page is the rows strictly after it in that order. Unlike OFFSET, each page is
+an index range seek however deep it is, and rows inserted meanwhile neither
+shift nor repeat entries. Exports walk the same keyset in fixed-size chunks,
+each its own short query, so memory stays flat and no read transaction is
+held open while the response streams.
+"""
+import base64
+import csv
+import io
+import json
+from collections import namedtuple
+from datetime import datetime
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+EXPORT_CHUNK = 1000
+
+# select: query up to (not including) WHERE, with output column names as aliases
+# sort/id: SQL expressions of the keyset; sort_field: the sort column's output name
+# filters: query parameter -> (SQL condition with one placeholder, parser of the parameter value)
+AdminList = namedtuple('AdminList', 'name select sort sort_field id filters columns')
+
+
+def _timestamp(value):
+    """ISO date or datetime -> the 'YYYY-MM-DD HH:MM:SS' form SQLite's CURRENT_TIMESTAMP stores."""
+    try:
+        return datetime.fromisoformat(value).strftime('%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        raise ValueError(f'Invalid date: {value!r} (use YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS)') from None
+
+
+def _flag(value):
+    if value.lower() in ('1', 'true', 'yes'):
+        return 1
+    if value.lower() in ('0', 'false', 'no'):
+        return 0
+    raise ValueError(f'Invalid flag: {value!r} (use true or false)')
+
+
+def _int(value):
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f'Invalid id: {value!r}') from None
+
+
+def _date_filters(column):
+    # since is inclusive, until exclusive, so consecutive ranges never overlap
+    return {'since': (f'{column} >= ?', _timestamp), 'until': (f'{column} < ?', _timestamp)}
+
+
+USERS = AdminList(
+    'users', 'SELECT id, name, email, phone, created_at FROM users',
+    'created_at', 'created_at', 'id',
+    {'email': ('email = ?', str), **_date_filters('created_at')},
+    ('id', 'name', 'email', 'phone', 'created_at'))
+
+FEEDBACK = AdminList(
+    'feedback', 'SELECT id, user_email, message, resolved, created_at FROM feedback',
+    'created_at', 'created_at', 'id',
+    {'resolved': ('resolved = ?', _flag), 'user_email': ('user_email = ?', str), **_date_filters('created_at')},
+    ('id', 'user_email', 'message', 'resolved', 'created_at'))
+
+QUIZZES = AdminList(
+    'quizzes', 'SELECT id, title, description, created_by, created_at, question_count FROM quizzes',
+    'created_at', 'created_at', 'id',
+    {'created_by': ('created_by = ?', str), **_date_filters('created_at')},
+    ('id', 'title', 'description', 'created_by', 'created_at', 'question_count'))
+
+SUBMISSIONS = AdminList(
+    'submissions',
+    '''SELECT qs.id AS id, q.title AS quiz_title, qs.user_email AS user_email, qs.score AS score,
+              q.question_count AS total, qs.submitted_at AS submitted_at
+       FROM quiz_submissions qs
+       JOIN quizzes q ON qs.quiz_id = q.id''',
+    'qs.submitted_at', 'submitted_at', 'qs.id',
+    {'quiz_id': ('qs.quiz_id = ?', _int), 'user_email': ('qs.user_email = ?', str),
+     **_date_filters('qs.submitted_at')},
+    ('id', 'quiz_title', 'user_email', 'score', 'total', 'submitted_at'))
+
+
+def encode_cursor(row, admin_list):
+    key = json.dumps([row[admin_list.sort_field], row['id']], separators=(',', ':'))
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(sort value, id) from a cursor. Raises ValueError for anything this module did not produce."""
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        # Both end up as SQL parameters, which must be scalars
+        if not isinstance(row_id, int) or not isinstance(sort_value, (str, int, float, type(None))):
+            raise ValueError
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor') from None
+    return sort_value, row_id
+
+
+def parse_filters(admin_list, args):
+    """{parameter: parsed value} for the filters present in args. Raises ValueError."""
+    return {name: parse(args[name]) for name, (_, parse) in admin_list.filters.items()
+            if args.get(name, '') != ''}
+
+
+def _query(admin_list, filters, after, limit):
+    conditions = [admin_list.filters[name][0] for name in filters]
+    params = list(filters.values())
+    if after is not None:
+        conditions.append(f'({admin_list.sort}, {admin_list.id}) < (?, ?)')
+        params.extend(after)
+    where = f' WHERE {" AND ".join(conditions)}' if conditions else ''
+    sql = (f'{admin_list.select}{where} '
+           f'ORDER BY {admin_list.sort} DESC, {admin_list.id} DESC LIMIT ?')
+    return sql, params + [limit]
+
+
+def page(database, admin_list, filters, cursor=None, limit=100):
+    """One page of rows as dicts, and the cursor of the next page (None on the last page)."""
+    after = decode_cursor(cursor) if cursor else None
+    # One extra row says whether another page follows without a COUNT(*)
+    rows = database.query(*_query(admin_list, filters, after, limit + 1))
+    next_cursor = encode_cursor(rows[limit - 1], admin_list) if len(rows) > limit else None
+    return [dict(row) for row in rows[:limit]], next_cursor
+
+
+def iter_rows(database, admin_list, filters, chunk=EXPORT_CHUNK):
+    """Every matching row as a dict, fetched chunk by chunk along the keyset."""
+    after = None
+    while True:
+        rows = database.query(*_query(admin_list, filters, after, chunk))
+        for row in rows:
+            yield dict(row)
+        if len(rows) < chunk:
+            return
+        after = (rows[-1][admin_list.sort_field], rows[-1]['id'])
+
+
+def export_lines(rows, export_format, columns):
+    """Serialize rows lazily as NDJSON lines or CSV lines (with a header row)."""
+    if export_format == 'ndjson':
+        for row in rows:
+            yield json.dumps(row) + '\n'
+        return
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([row[column] for column in columns])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header alone when nothing matched
+    if buffer.tell():
+        yield buffer.getvalue()
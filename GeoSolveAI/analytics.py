@@ -0,0 +1,148 @@
+"""
+Incrementally maintained analytics for /api/admin/stats and /api/admin/dashboard.
+
+Every write that matters to the dashboard (registration, feedback, feedback
+resolution, graded submissions, deletions) also updates small rollup tables
+in the same transaction, so the rollups never drift from the base tables and
+the polling endpoints read a handful of precomputed rows instead of scanning:
+
+  stats_totals        current counts: users, feedback, resolved feedback, submissions
+  stats_daily         per UTC day: registrations, feedback, submissions, score sum, active users
+  stats_active_users  who was active on which day, to count each user once per day
+  stats_quiz          per quiz: submissions and score sum
+  stats_question      per question: attempts and correct answers
+
+Totals track the rows that currently exist and go down on deletion; daily
+buckets record activity as it happened and are never rewritten. The tables
+are created and backfilled from existing data by migration 4 (migrations.py).
+"""
+from collections import Counter
+
+TOTALS = ('users', 'feedback', 'resolved_feedback', 'submissions')
+
+
+def _bump(c, name, delta):
+    if delta:
+        c.execute('''INSERT INTO stats_totals (name, value) VALUES (?, ?)
+                     ON CONFLICT(name) DO UPDATE SET value = value + excluded.value''', (name, delta))
+
+
+def _bump_day(c, column, delta=1, score=0):
+    # column is one of this module's own constants, never request input
+    c.execute(f'''INSERT INTO stats_daily (day, {column}, score_total) VALUES (date('now'), ?, ?)
+                  ON CONFLICT(day) DO UPDATE SET {column} = {column} + excluded.{column},
+                                                 score_total = score_total + excluded.score_total''',
+              (delta, score))
+
+
+def _touch_active(c, emails):
+    """Mark users active today; each is counted into stats_daily.active_users once per day."""
+    new = 0
+    for email in set(emails):
+        new += c.execute("INSERT OR IGNORE INTO stats_active_users (day, user_email) VALUES (date('now'), ?)",
+                         (email,)).rowcount
+    if new:
+        _bump_day(c, 'active_users', new)
+
+
+def record_registration(c, email):
+    _bump(c, 'users', 1)
+    _bump_day(c, 'registrations')
+    _touch_active(c, [email])
+
+
+def record_feedback(c, email):
+    _bump(c, 'feedback', 1)
+    _bump_day(c, 'feedback')
+    _touch_active(c, [email])
+
+
+def record_feedback_resolved(c, delta):
+    """delta: +1 when a feedback item became resolved, -1 when it was reopened."""
+    _bump(c, 'resolved_feedback', delta)
+
+
+def record_users_deleted(c, count):
+    _bump(c, 'users', -count)
+
+
+def record_submissions(c, submissions):
+    """Fold a batch of quiz_scoring.Submission tuples into the rollups (SubmissionWriter's on_write)."""
+    _bump(c, 'submissions', len(submissions))
+    _bump_day(c, 'submissions', len(submissions), sum(s.score for s in submissions))
+    _touch_active(c, [s.user_email for s in submissions])
+
+    per_quiz = Counter()
+    quiz_scores = Counter()
+    attempts = Counter()
+    correct = Counter()
+    question_quiz = {}
+    for s in submissions:
+        per_quiz[s.quiz_id] += 1
+        quiz_scores[s.quiz_id] += s.score
+        for qid in s.attempted:
+            qid = int(qid)
+            attempts[qid] += 1
+            question_quiz[qid] = s.quiz_id
+        for qid in s.correct:
+            correct[int(qid)] += 1
+    c.executemany('''INSERT INTO stats_quiz (quiz_id, submissions, score_total) VALUES (?, ?, ?)
+                     ON CONFLICT(quiz_id) DO UPDATE SET submissions = submissions + excluded.submissions,
+                                                        score_total = score_total + excluded.score_total''',
+                  [(quiz_id, count, quiz_scores[quiz_id]) for quiz_id, count in per_quiz.items()])
+    c.executemany('''INSERT INTO stats_question (question_id, quiz_id, attempts, correct) VALUES (?, ?, ?, ?)
+                     ON CONFLICT(question_id) DO UPDATE SET attempts = attempts + excluded.attempts,
+                                                            correct = correct + excluded.correct''',
+                  [(qid, question_quiz[qid], count, correct[qid]) for qid, count in attempts.items()])
+
+
+def record_quiz_deleted(c, quiz_id):
+    """Call before the quiz's submissions are deleted."""
+    removed = c.execute('SELECT COUNT(*) FROM quiz_submissions WHERE quiz_id = ?', (quiz_id,)).fetchone()[0]
+    _bump(c, 'submissions', -removed)
+    c.execute('DELETE FROM stats_quiz WHERE quiz_id = ?', (quiz_id,))
+    c.execute('DELETE FROM stats_question WHERE quiz_id = ?', (quiz_id,))
+
+
+def totals(conn):
+    """Current totals, plus today's active users."""
+    result = dict.fromkeys(TOTALS, 0)
+    result.update({row[0]: row[1] for row in conn.execute('SELECT name, value FROM stats_totals')})
+    today = conn.execute("SELECT active_users FROM stats_daily WHERE day = date('now')").fetchone()
+    result['active_users_today'] = today[0] if today else 0
+    return result
+
+
+def daily(conn, days):
+    """The last `days` days that had any activity, oldest first."""
+    rows = conn.execute('''SELECT day, registrations, feedback, submissions, score_total, active_users
+                           FROM stats_daily WHERE day > date('now', ?) ORDER BY day''',
+                        (f'-{int(days)} days',)).fetchall()
+    return [{**dict(row), 'average_score': row['score_total'] / row['submissions'] if row['submissions'] else None}
+            for row in rows]
+
+
+def quiz_performance(conn):
+    """Per-quiz submission count, average score and average percentage, most submitted first."""
+    rows = conn.execute('''SELECT q.id AS quiz_id, q.title, q.question_count, s.submissions, s.score_total
+                           FROM stats_quiz s JOIN quizzes q ON q.id = s.quiz_id
+                           ORDER BY s.submissions DESC, q.id''').fetchall()
+    result = []
+    for row in rows:
+        average = row['score_total'] / row['submissions']
+        result.append({'quiz_id': row['quiz_id'], 'title': row['title'], 'submissions': row['submissions'],
+                       'question_count': row['question_count'], 'average_score': round(average, 2),
+                       'average_percent': round(100 * average / row['question_count'], 1)
+                       if row['question_count'] else None})
+    return result
+
+
+def question_difficulty(conn, quiz_id):
+    """Per-question attempts and share answered correctly for one quiz, hardest first."""
+    rows = conn.execute('''SELECT qq.id AS question_id, qq.question_text, COALESCE(s.attempts, 0) AS attempts,
+                                  COALESCE(s.correct, 0) AS correct
+                           FROM quiz_questions qq LEFT JOIN stats_question s ON s.question_id = qq.id
+                           WHERE qq.quiz_id = ? ORDER BY qq.id''', (quiz_id,)).fetchall()
+    result = [{**dict(row), 'correct_rate': round(row['correct'] / row['attempts'], 3) if row['attempts'] else None}
+              for row in rows]
+    return sorted(result, key=lambda q: (q['correct_rate'] is None, q['correct_rate']))
@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_from_directory, Response
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 import os
@@ -6,17 +6,44 @@ import io
 import base64
 import sympy as sp
 from sympy import *
-from sympy.parsing.sympy_parser import parse_expr, standard_transformations, implicit_multiplication_application
 import matplotlib
 matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
 import numpy as np
 from PIL import Image
 import math
+import re
+from fractions import Fraction
 import sqlite3
 from datetime import datetime
 import hashlib
+import json
+import threading
+import time
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from solve_cache import SolveCache
+from db import Database
+import migrations
+import admin_lists
+import analytics
+from quiz_scoring import AnswerKeyCache, SubmissionWriter, grade as grade_responses
+from render_cache import RenderCache, render_key
+from rendering import figure_pool, render_image, data_url, IMAGE_FORMATS
+import adaptive_sampling
+from expression_compiler import ExpressionCompiler
+from plot_data import encode_samples, encode_curves, ENCODINGS as PLOT_DATA_ENCODINGS
+import plot_curves
+import plot_tiles
+import geometry_engine
+from geometry_drawing import draw_shape
+import geometry_sheets
+from solution_steps import EXPLAINERS
+import trig_table
+from expression_normalizer import normalize_expression, split_top_level
+from expression_parser import ExpressionParser, cheap_to_evaluate
+from numeric_eval import evaluate_constant, ResultTooLarge
+from solver_strategy import solve_polynomial_fast, choose_variable
+from sympy_worker import SympyWorkerPool, OperationTimeout, PoolBusy
 
 app = Flask(__name__, static_folder='client/build', static_url_path='')
 CORS(app)
@@ -25,57 +52,71 @@ UPLOAD_FOLDER = 'uploads'
 DATABASE = 'geosolve.db'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-def init_db():
-    """Initialize SQLite database with required tables."""
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS users
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  name TEXT NOT NULL,
-                  email TEXT UNIQUE NOT NULL,
-                  password TEXT NOT NULL,
-                  phone TEXT,
-                  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS feedback
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  user_email TEXT NOT NULL,
-                  message TEXT NOT NULL,
-                  resolved INTEGER DEFAULT 0,
-                  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS quizzes
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  title TEXT NOT NULL,
-                  description TEXT,
-                  created_by TEXT NOT NULL,
-                  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS quiz_questions
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  quiz_id INTEGER NOT NULL,
-                  question_text TEXT NOT NULL,
-                  option_a TEXT NOT NULL,
-                  option_b TEXT NOT NULL,
-                  option_c TEXT NOT NULL,
-                  option_d TEXT NOT NULL,
-                  correct_answer TEXT NOT NULL,
-                  FOREIGN KEY(quiz_id) REFERENCES quizzes(id))''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS quiz_submissions
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  quiz_id INTEGER NOT NULL,
-                  user_email TEXT NOT NULL,
-                  responses TEXT NOT NULL,
-                  score INTEGER,
-                  submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                  FOREIGN KEY(quiz_id) REFERENCES quizzes(id))''')
-    
-    conn.commit()
-    conn.close()
+# Pooled WAL-mode connections shared by every route that reads or writes DATABASE
+database = Database(
+    DATABASE,
+    pool_size=int(os.environ.get('DB_POOL_SIZE', 8)),
+    busy_timeout_ms=int(os.environ.get('DB_BUSY_TIMEOUT_MS', 5000)),
+    cache_size_kib=int(os.environ.get('DB_CACHE_SIZE_KB', 16 * 1024)),
+    mmap_size=int(os.environ.get('DB_MMAP_SIZE', 64 * 1024 * 1024))
+)
+
+# Quiz answer keys for grading, and the group-commit writer for graded submissions
+answer_keys = AnswerKeyCache(max_entries=int(os.environ.get('QUIZ_KEY_CACHE_MAX_ENTRIES', 512)))
+submission_writer = SubmissionWriter(database, max_batch=int(os.environ.get('QUIZ_SUBMIT_MAX_BATCH', 256)),
+                                     on_write=analytics.record_submissions)
+
+# Admin lists are keyset-paginated; limit defaults to ADMIN_PAGE_SIZE and is capped at ADMIN_PAGE_MAX
+ADMIN_PAGE_SIZE = int(os.environ.get('ADMIN_PAGE_SIZE', 500))
+ADMIN_PAGE_MAX = int(os.environ.get('ADMIN_PAGE_MAX', 5000))
+
+# Solve-result cache; set SOLVE_CACHE_DB to keep results across restarts
+solve_cache = SolveCache(
+    max_entries=int(os.environ.get('SOLVE_CACHE_MAX_ENTRIES', 2048)),
+    max_bytes=int(os.environ.get('SOLVE_CACHE_MAX_BYTES', 16 * 1024 * 1024)),
+    db_path=os.environ.get('SOLVE_CACHE_DB') or None
+)
 
-init_db()
+# Shared parser: transformations built once, normalized input -> SymPy expression memo
+expression_parser = ExpressionParser(max_entries=int(os.environ.get('PARSE_MEMO_MAX_ENTRIES', 4096)))
+
+# SymPy work runs in isolated worker processes with a hard per-operation timeout
+sympy_pool = SympyWorkerPool(
+    size=int(os.environ.get('SOLVE_WORKERS', min(4, os.cpu_count() or 1))),
+    timeout=float(os.environ.get('SOLVE_TIMEOUT', 10)),
+    max_queue=int(os.environ.get('SOLVE_MAX_QUEUE', 16))
+)
+
+# Batch items are dispatched from these threads into the SymPy worker pool
+SOLVE_BATCH_MAX_ITEMS = int(os.environ.get('SOLVE_BATCH_MAX_ITEMS', 200))
+batch_executor = ThreadPoolExecutor(max_workers=sympy_pool.size, thread_name_prefix='solve-batch')
+
+# Rendered plots, keyed on everything that affects the image; set PLOT_CACHE_DIR for a disk tier
+plot_cache = RenderCache(
+    max_bytes=int(os.environ.get('PLOT_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+    disk_dir=os.environ.get('PLOT_CACHE_DIR') or None
+)
+PLOT_CACHE_MAX_AGE = int(os.environ.get('PLOT_CACHE_MAX_AGE', 3600))
+# Images under /api/render/<hash> never change, so browsers may keep them this long
+RENDER_MAX_AGE = int(os.environ.get('RENDER_MAX_AGE', 365 * 24 * 3600))
+# Plot expressions compiled once to vectorized callables (whitelisted AST, no raw eval)
+plot_compiler = ExpressionCompiler(max_entries=int(os.environ.get('PLOT_COMPILE_MAX_ENTRIES', 1024)))
+
+# Function evaluations allowed per plot for adaptive sampling (requests may ask for fewer via max_points)
+PLOT_POINT_BUDGET = int(os.environ.get('PLOT_POINT_BUDGET', adaptive_sampling.DEFAULT_BUDGET))
+PLOT_FIGSIZE = (10, 6)
+PLOT_DPI = 100
+# Zoom/pan tiles: neighbours of each requested tile are computed in the background
+tile_prefetcher = plot_tiles.TilePrefetcher(
+    ThreadPoolExecutor(max_workers=int(os.environ.get('PLOT_TILE_PREFETCH_WORKERS', 2)), thread_name_prefix='plot-tile')
+)
+GEOMETRY_FIGSIZE = (8, 8)
+GEOMETRY_DPI = 100
+GEOMETRY_MARGINS = {'left': 0.08, 'right': 0.96, 'bottom': 0.06, 'top': 0.94}
+GEOMETRY_BATCH_MAX_ITEMS = int(os.environ.get('GEOMETRY_BATCH_MAX_ITEMS', 500))
+
+# Bring the schema up to date (tables, indexes, denormalized columns); see migrations.py
+migrations.migrate(database)
 
 def get_gemini_model():
     """Return the valid Gemini model for GeoSolve"""
@@ -87,6 +128,34 @@ def verify_admin_key(request):
     admin_key = request.headers.get('X-Admin-Key')
     return admin_key == admin_email
 
+def admin_list_response(admin_list, key):
+    """
+    An admin list, filtered by the query string: one keyset page ({key: rows,
+    'next_cursor': ...}) of limit rows, ADMIN_PAGE_SIZE by default. The full
+    list is the format=ndjson|csv export, which streams every row.
+    """
+    try:
+        filters = admin_lists.parse_filters(admin_list, request.args)
+        export_format = request.args.get('format')
+        if export_format:
+            if export_format not in admin_lists.EXPORT_FORMATS:
+                raise ValueError(f'format must be one of {", ".join(admin_lists.EXPORT_FORMATS)}')
+            rows = admin_lists.iter_rows(database, admin_list, filters)
+            lines = admin_lists.export_lines(rows, export_format, admin_list.columns)
+            mimetype = 'application/x-ndjson' if export_format == 'ndjson' else 'text/csv'
+            return Response(lines, mimetype=mimetype, headers={
+                'Content-Disposition': f'attachment; filename={admin_list.name}.{export_format}'})
+        try:
+            limit = int(request.args.get('limit', ADMIN_PAGE_SIZE))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= ADMIN_PAGE_MAX:
+            raise ValueError(f'limit must be between 1 and {ADMIN_PAGE_MAX}')
+        rows, next_cursor = admin_lists.page(database, admin_list, filters, request.args.get('cursor'), limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({key: rows, 'next_cursor': next_cursor}), 200
+
 @app.route('/')
 def serve():
     return send_from_directory(app.static_folder, 'index.html')
@@ -102,55 +171,7 @@ def clean_expression(expr_str):
     Clean and normalize mathematical expressions for SymPy parsing.
     Handles: ^ to **, missing parentheses, implicit multiplication, function calls, angle expressions
     """
-    import re
-    
-    expr = expr_str.strip()
-    
-    # Replace ^ with **
-    expr = expr.replace('^', '**')
-    
-    # Function names that need auto-parenthesis
-    functions = ['sin', 'cos', 'tan', 'log', 'exp', 'sqrt', 'abs', 'asin', 'acos', 'atan', 'sinh', 'cosh', 'tanh']
-    
-    # SPECIAL HANDLING: Detect angle expressions like "sin45" or "cos30"
-    # Pattern: function name followed immediately by number (no space, no paren)
-    # E.g., "sin45" -> "sin(radians(45))", but "sin(x)" stays as is
-    for func in functions:
-        # Match pattern like: sin45, cos30, tan60, but NOT sin(x) or sinx
-        pattern = rf'\b{func}(\d+(?:\.\d+)?)\b'
-        matches = re.finditer(pattern, expr)
-        for match in matches:
-            angle_value = match.group(1)
-            # Replace sin45 with sin(radians(45))
-            expr = expr[:match.start()] + f'{func}(radians({angle_value}))' + expr[match.end():]
-    
-    # Fix function calls: sin x -> sin(x), cos 30 -> cos(30)
-    for func in functions:
-        # Pattern: function followed by space or immediate value (but not already parenthesized)
-        pattern = rf'{func}\s+(?![\(\[])'
-        expr = re.sub(pattern, f'{func}(', expr)
-    
-    # Handle implicit multiplication: 3x -> 3*x, 2(x+1) -> 2*(x+1), etc.
-    expr_processed = ''
-    for i, char in enumerate(expr):
-        expr_processed += char
-        if i < len(expr) - 1:
-            curr = char
-            next_char = expr[i + 1]
-            # Add * between: digit-letter, digit-paren, paren-letter, )-(, )-digit, )-(
-            if ((curr.isdigit() or curr == ')') and (next_char.isalpha() or next_char == '(')) or \
-               (curr.isalpha() and next_char == '(' and not curr.isspace()) or \
-               (curr == ')' and (next_char == '(' or next_char.isdigit())):
-                # But don't add * if one already exists
-                if expr_processed[-2:] != '* ':
-                    expr_processed += '*'
-    
-    expr = expr_processed
-    
-    # Remove extra spaces
-    expr = ' '.join(expr.split())
-    
-    return expr
+    return normalize_expression(expr_str)
 
 @app.route('/api/register', methods=['POST'])
 def register():
@@ -175,25 +196,20 @@ def register():
         hashed_password = hashlib.sha256(password.encode()).hexdigest()
         
         # Save to database
-        conn = sqlite3.connect(DATABASE)
-        c = conn.cursor()
-        
         try:
-            c.execute('''INSERT INTO users (name, email, password)
-                         VALUES (?, ?, ?)''',
-                      (name, email, hashed_password))
-            conn.commit()
-            conn.close()
+            with database.transaction() as c:
+                c.execute('''INSERT INTO users (name, email, password)
+                             VALUES (?, ?, ?)''',
+                          (name, email, hashed_password))
+                analytics.record_registration(c, email)
             
             return jsonify({
                 'success': True,
                 'message': 'Account created successfully'
             }), 200
         except sqlite3.IntegrityError:
-            conn.close()
             return jsonify({'message': 'Email already registered'}), 409
         except Exception as e:
-            conn.close()
             return jsonify({'message': f'Registration failed: {str(e)}'}), 500
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -226,41 +242,23 @@ def admin_login():
 
 @app.route('/api/admin/users', methods=['GET'])
 def get_admin_users():
-    """Get all registered users - requires admin key."""
+    """Get registered users, newest first, a page at a time (filters: email, since, until) - requires admin key."""
     if not verify_admin_key(request):
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        conn = sqlite3.connect(DATABASE)
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
-        
-        c.execute('SELECT id, name, email, phone, created_at FROM users ORDER BY created_at DESC')
-        rows = c.fetchall()
-        conn.close()
-        
-        users = [dict(row) for row in rows]
-        return jsonify({'users': users, 'total': len(users)}), 200
+        return admin_list_response(admin_lists.USERS, 'users')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/admin/feedback', methods=['GET'])
 def get_admin_feedback():
-    """Get all user feedback/complaints - requires admin key."""
+    """Get user feedback/complaints a page at a time (filters: resolved, user_email, since, until) - requires admin key."""
     if not verify_admin_key(request):
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        conn = sqlite3.connect(DATABASE)
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
-        
-        c.execute('SELECT id, user_email, message, created_at FROM feedback ORDER BY created_at DESC')
-        rows = c.fetchall()
-        conn.close()
-        
-        feedback_list = [dict(row) for row in rows]
-        return jsonify({'feedback': feedback_list, 'total': len(feedback_list)}), 200
+        return admin_list_response(admin_lists.FEEDBACK, 'feedback')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -280,17 +278,13 @@ def register_user():
         # Hash password
         hashed_password = hashlib.sha256(password.encode()).hexdigest()
         
-        conn = sqlite3.connect(DATABASE)
-        c = conn.cursor()
-        
         try:
-            c.execute('INSERT INTO users (name, email, password, phone) VALUES (?, ?, ?, ?)',
-                     (name, email, hashed_password, phone))
-            conn.commit()
-            conn.close()
+            with database.transaction() as c:
+                c.execute('INSERT INTO users (name, email, password, phone) VALUES (?, ?, ?, ?)',
+                          (name, email, hashed_password, phone))
+                analytics.record_registration(c, email)
             return jsonify({'success': True, 'message': 'User registered successfully'}), 201
         except sqlite3.IntegrityError:
-            conn.close()
             return jsonify({'error': 'Email already registered'}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -306,13 +300,10 @@ def submit_feedback():
         if not all([user_email, message]):
             return jsonify({'error': 'Email and message are required'}), 400
         
-        conn = sqlite3.connect(DATABASE)
-        c = conn.cursor()
-        
-        c.execute('INSERT INTO feedback (user_email, message) VALUES (?, ?)',
-                 (user_email, message))
-        conn.commit()
-        conn.close()
+        with database.transaction() as c:
+            c.execute('INSERT INTO feedback (user_email, message) VALUES (?, ?)',
+                      (user_email, message))
+            analytics.record_feedback(c, user_email)
         
         return jsonify({'success': True, 'message': 'Feedback submitted successfully'}), 201
     except Exception as e:
@@ -328,85 +319,178 @@ def format_textbook_solution(steps_list, solution):
     formatted.append(f"Final Answer: {solution}")
     return '\n'.join(formatted)
 
-def handle_trig_constant(func_name, angle_str):
-    """Handler for trig functions with constants like sin45, cos90, tan30"""
+# Angles are in degrees unless suffixed with rad/radians ("sin 1.2 rad", "sin 0..3 step 0.5 rad")
+TRIG_CONSTANT_RE = re.compile(r'\s*(a?(?:sin|cos|tan|cot|sec|csc))\s*\(?\s*(-?\d+(?:\.\d+)?)\s*(rad(?:ians)?)?\s*\)?\s*')
+TRIG_RANGE_RE = re.compile(r'\s*(sin|cos|tan|cot|sec|csc)\s*\(?\s*(-?\d+(?:\.\d+)?)\s*\.\.\s*(-?\d+(?:\.\d+)?)\s*\)?'
+                           r'(?:\s*step\s*(\d+(?:\.\d+)?))?\s*(rad(?:ians)?)?\s*')
+
+# tan, cot, sec and csc are explained as ratios of sin and cos
+TRIG_RATIOS = {
+    'tan': ('sin(θ) / cos(θ)', 'cos'),
+    'cot': ('cos(θ) / sin(θ)', 'sin'),
+    'sec': ('1 / cos(θ)', 'cos'),
+    'csc': ('1 / sin(θ)', 'sin')
+}
+
+def angle_mark(unit):
+    """Suffix that labels an angle in step text."""
+    return '°' if unit == 'degrees' else ' rad'
+
+def handle_trig_constant(func_name, angle_str, unit='degrees'):
+    """Handler for trig functions with constants like sin45, cos90, tan30, sec60, asin0.5, sin 1.2 rad"""
     try:
-        angle = float(angle_str)
-        angle_rad = math.radians(angle)
+        if func_name in trig_table.INVERSE_FUNCTIONS:
+            return handle_inverse_trig_constant(func_name, float(angle_str), unit)
         
+        angle = float(angle_str)
+        exact, value = trig_table.evaluate(func_name, angle, unit)
+        angle_rad = math.radians(angle) if unit == 'degrees' else angle
+        mark = angle_mark(unit)
         sin_val = math.sin(angle_rad)
         cos_val = math.cos(angle_rad)
-        tan_val = math.tan(angle_rad) if abs(cos_val) > 1e-10 else None
-        
-        exact_vals = {0: '0', 30: '1/2', 45: '√(2)/2', 60: '√(3)/2', 90: '1', 120: '√(3)/2', 135: '√(2)/2', 150: '1/2', 180: '0'}
+        note = f"Note: {func_name}(constant) is a fixed number with no variable, so it is NOT differentiable"
         
-        if func_name == 'sin':
-            exact = exact_vals.get(int(angle)) if angle == int(angle) else None
-            steps = [f"Finding sin({angle}°)", f"sin({angle}°) = {sin_val:.6f}"]
-            if exact:
-                steps.append(f"Exact value: sin({angle}°) = {exact}")
-            steps.append(f"Note: sin(constant) is a fixed number with no variable, so it is NOT differentiable")
-            return {
-                'type': 'Trigonometric Function',
-                'solution': exact if exact else f'{sin_val:.6f}',
-                'steps': steps
-            }
-        elif func_name == 'cos':
-            exact = exact_vals.get(int(angle)) if angle == int(angle) else None
-            steps = [f"Finding cos({angle}°)", f"cos({angle}°) = {cos_val:.6f}"]
+        if func_name in ('sin', 'cos'):
+            steps = [f"Finding {func_name}({angle}{mark})", f"{func_name}({angle}{mark}) = {value:.6f}"]
             if exact:
-                steps.append(f"Exact value: cos({angle}°) = {exact}")
-            steps.append(f"Note: cos(constant) is a fixed number with no variable, so it is NOT differentiable")
+                steps.append(f"Exact value: {func_name}({angle}{mark}) = {exact}")
+            steps.append(note)
             return {
                 'type': 'Trigonometric Function',
-                'solution': exact if exact else f'{cos_val:.6f}',
+                'solution': exact if exact else f'{value:.6f}',
                 'steps': steps
             }
-        elif func_name == 'tan':
-            if abs(cos_val) < 1e-10:
-                steps = [
-                    "Finding tan(θ) using the formula:",
-                    "tan(θ) = sin(θ) / cos(θ)",
-                    "",
-                    f"sin({angle}°) = {sin_val:.6f}",
-                    f"cos({angle}°) ≈ 0",
-                    "",
-                    "Division by zero is NOT DEFINED",
-                    "tan(θ) is UNDEFINED when cos(θ) = 0",
-                    "",
-                    "Note: tan(constant) is not defined here, so it is NOT differentiable"
-                ]
-                return {'type': 'Trigonometric Function', 'solution': 'UNDEFINED', 'steps': steps}
-            exact = {30: '1/√(3)', 45: '1', 60: '√(3)'}.get(int(angle))
-            steps = [
-                "Finding tan(θ) using the formula:",
-                "tan(θ) = sin(θ) / cos(θ)",
-                "",
-                f"sin({angle}°) = {sin_val:.6f}",
-                f"cos({angle}°) = {cos_val:.6f}",
+        
+        formula, zero_part = TRIG_RATIOS[func_name]
+        steps = [
+            f"Finding {func_name}(θ) using the formula:",
+            f"{func_name}(θ) = {formula}",
+            "",
+            f"sin({angle}{mark}) = {sin_val:.6f}" if abs(sin_val) > 1e-10 else f"sin({angle}{mark}) ≈ 0",
+            f"cos({angle}{mark}) = {cos_val:.6f}" if abs(cos_val) > 1e-10 else f"cos({angle}{mark}) ≈ 0",
+            ""
+        ]
+        if value is None:
+            steps += [
+                "Division by zero is NOT DEFINED",
+                f"{func_name}(θ) is UNDEFINED when {zero_part}(θ) = 0",
                 "",
-                f"tan({angle}°) = {sin_val:.6f} / {cos_val:.6f}",
-                f"tan({angle}°) = {tan_val:.6f}",
+                f"Note: {func_name}(constant) is not defined here, so it is NOT differentiable"
             ]
-            if exact:
-                steps.append(f"Exact value: tan({angle}°) = {exact}")
-            steps.append(f"Note: tan(constant) is a fixed number with no variable, so it is NOT differentiable")
-            return {
-                'type': 'Trigonometric Function',
-                'solution': exact if exact else f'{tan_val:.6f}',
-                'steps': steps
-            }
+            return {'type': 'Trigonometric Function', 'solution': 'UNDEFINED', 'steps': steps}
+        
+        steps.append(f"{func_name}({angle}{mark}) = {value:.6f}")
+        if exact:
+            steps.append(f"Exact value: {func_name}({angle}{mark}) = {exact}")
+        steps.append(note)
+        return {
+            'type': 'Trigonometric Function',
+            'solution': exact if exact else f'{value:.6f}',
+            'steps': steps
+        }
     except:
         return None
 
-@app.route('/api/solve', methods=['POST'])
-def solve():
+def handle_inverse_trig_constant(func_name, value, unit='degrees'):
+    """Handler for inverse trig functions with constants like asin0.5, acos(-1), atan1 (answered in unit)"""
+    degrees, exact_degrees = trig_table.evaluate_inverse(func_name, value)
+    base = func_name[1:]
+    steps = [f"Finding {func_name}({value})", f"We need the angle θ (principal value) with {base}(θ) = {value}"]
+    
+    if degrees is None:
+        steps.append(f"{value} is outside the domain of {func_name}, so there is no such angle")
+        return {'type': 'Inverse Trigonometric Function', 'solution': 'UNDEFINED', 'steps': steps}
+    
+    steps.append(f"{func_name}({value}) = {degrees:.6f}° = {math.radians(degrees):.6f} rad")
+    if exact_degrees is not None:
+        steps.append(f"Exact value: {func_name}({value}) = {exact_degrees}° = {trig_table.format_radians(exact_degrees)}")
+        solution = f'{exact_degrees}°' if unit == 'degrees' else trig_table.format_radians(exact_degrees)
+    else:
+        solution = f'{degrees:.6f}°' if unit == 'degrees' else f'{math.radians(degrees):.6f}'
+    return {'type': 'Inverse Trigonometric Function', 'solution': solution, 'steps': steps}
+
+def handle_trig_range(func_name, start_str, stop_str, step_str, unit='degrees'):
+    """Handler for trig tables like "sin 0..360 step 15" (evaluated in one vectorized pass)."""
+    start, stop = float(start_str), float(stop_str)
+    standard_step = trig_table.STANDARD_STEP if unit == 'degrees' else math.radians(trig_table.STANDARD_STEP)
+    step = float(step_str) if step_str else standard_step
+    rows = trig_table.table(func_name, start, stop, step, unit)
+    mark = angle_mark(unit)
+    exact_count = sum(1 for row in rows if row['exact'] is not None)
+    return {
+        'type': 'Trigonometric Table',
+        'solution': rows,
+        'steps': [
+            f"Evaluating {func_name}(θ) for θ = {start:g}{mark} to {stop:g}{mark} in steps of {step:g}{mark}",
+            f"{len(rows)} values computed, {exact_count} with exact values from the standard-angle table"
+        ]
+    }
+
+def run_sympy(operation, expr, symbol=None, cancel_event=None):
+    """Run a SymPy operation through the result cache and the worker pool."""
+    return solve_cache.get_or_compute(
+        operation, expr, lambda: sympy_pool.run(operation, expr, symbol, cancel_event=cancel_event))
+
+def run_solve(equation, symbol, cancel_event=None):
+    """
+    Solve equation = 0 through the result cache. Linear and quadratic polynomials
+    are answered inline by the closed-form tier; everything else goes to the pool,
+    including equations the parser left unevaluated (see cheap_to_evaluate).
+    """
+    def compute():
+        fast = solve_polynomial_fast(equation, symbol) if cheap_to_evaluate(equation) else None
+        return fast if fast is not None else sympy_pool.run('solve', equation, symbol, cancel_event=cancel_event)
+    return solve_cache.get_or_compute('solve', equation, compute)
+
+def run_solve_system(equations, symbols, cancel_event=None):
+    """Solve a system of equations through the result cache and the worker pool."""
+    return solve_cache.get_or_compute(
+        'solve_system', sp.Tuple(*equations),
+        lambda: sympy_pool.run('solve_system', tuple(equations), tuple(symbols), cancel_event=cancel_event))
+
+def solver_unavailable_payload(e):
+    """Structured payload for operations that timed out or were rejected by the pool."""
+    if isinstance(e, OperationTimeout):
+        return {
+            'error': f'The {e.operation} operation timed out after {e.timeout:g} seconds',
+            'timed_out': True,
+            'operation': e.operation,
+            'timeout': e.timeout
+        }, 504
+    return {'error': 'Solver is busy, please try again shortly', 'busy': True}, 503
+
+def detect_operation(query):
+    """
+    Decide what a /api/solve query asks for. Returns (operation, body) where body
+    is the query with its command word removed; operation is one of solve,
+    integrate, differentiate, factor, trig_range, trig or simplify.
+    """
+    query_lower = query.lower().strip()
+    if 'solve' in query_lower or '=' in query:
+        return 'solve', query.replace('solve', '').replace('Solve', '').strip()
+    if 'integrate' in query_lower or '∫' in query:
+        return 'integrate', query.replace('integrate', '').replace('Integrate', '').replace('∫', '').strip()
+    if 'differentiate' in query_lower or 'diff' in query_lower or 'derivative' in query_lower or "d/dx" in query_lower:
+        return 'differentiate', query.replace('differentiate', '').replace('Differentiate', '').replace('diff', '').replace('Diff', '').replace('derivative', '').replace('Derivative', '').replace('d/dx', '').strip()
+    if 'factor' in query_lower:
+        return 'factor', query.replace('factor', '').replace('Factor', '').strip()
+    if TRIG_RANGE_RE.fullmatch(query_lower):
+        return 'trig_range', query_lower
+    if TRIG_CONSTANT_RE.fullmatch(query_lower):
+        return 'trig', query_lower
+    return 'simplify', query
+
+def solve_query(query, cancel_event=None):
+    """
+    Dispatch a single math query (solve/integrate/differentiate/factor/trig/simplify).
+    Returns a (payload, status) tuple so it can serve both /api/solve and /api/solve/batch.
+    Setting cancel_event abandons the worker-pool call in flight (the payload is then an error).
+    """
     try:
-        data = request.json
-        query = data.get('query', '').strip()
+        query = query.strip()
         
         if not query:
-            return jsonify({'error': 'No query provided'}), 400
+            return {'error': 'No query provided'}, 400
         
         result = {
             'query': query,
@@ -415,105 +499,154 @@ def solve():
             'type': None
         }
         
-        query_lower = query.lower().strip()
-        x = sp.Symbol('x')
+        operation, body = detect_operation(query)
+        timing = {'parse_ms': 0.0}
+        
+        def parse(cleaned):
+            # Every SymPy parse in this request goes through the shared memoized parser
+            expr, elapsed_ms = expression_parser.parse_timed(cleaned)
+            timing['parse_ms'] += elapsed_ms
+            return expr
         
         # SOLVE: solve x^2 - 5*x + 6
-        if 'solve' in query_lower or '=' in query:
-            eq_str = query.replace('solve', '').replace('Solve', '').strip()
+        if operation == 'solve':
+            eq_str = body
             result['type'] = 'equation'
             
             try:
-                cleaned = clean_expression(eq_str)
-                if '=' in cleaned:
-                    lhs, rhs = cleaned.split('=')
-                    lhs_expr = parse_expr(lhs, transformations=(standard_transformations + (implicit_multiplication_application,)))
-                    rhs_expr = parse_expr(rhs, transformations=(standard_transformations + (implicit_multiplication_application,)))
-                    equation = lhs_expr - rhs_expr
+                def parse_equation(text):
+                    cleaned = clean_expression(text)
+                    if '=' in cleaned:
+                        lhs, rhs = cleaned.split('=')
+                        return cleaned, parse(lhs) - parse(rhs)
+                    return cleaned, parse(cleaned)
+                
+                parts = split_top_level(eq_str)
+                if len(parts) > 1:
+                    # SYSTEM: 2x+3y=5, x-y=1 (comma, semicolon or newline separated)
+                    result['type'] = 'system'
+                    parsed = [parse_equation(part) for part in parts]
+                    equations = [equation for _, equation in parsed]
+                    symbols = sorted(set().union(*(eq.free_symbols for eq in equations)), key=lambda s: s.name)
+                    solved = run_solve_system(equations, symbols, cancel_event)
+                    result['variables'] = solved['variables']
+                    result['steps'] = [f"Original system: {'; '.join(parts)}"]
+                    result['steps'] += [f"Equation {i}: {equation} = 0" for i, (_, equation) in enumerate(parsed, 1)]
+                    result['steps'].append(f"Unknowns: {', '.join(solved['variables'])}")
                 else:
-                    equation = parse_expr(cleaned, transformations=(standard_transformations + (implicit_multiplication_application,)))
+                    cleaned, equation = parse_equation(eq_str)
+                    variable = choose_variable(equation)
+                    solved = run_solve(equation, variable, cancel_event)
+                    result['variable'] = str(variable)
+                    result['steps'] = [
+                        f"Original equation: {eq_str}",
+                        f"Cleaned form: {cleaned}",
+                        f"Parsed: {equation} = 0",
+                        f"Solving for {variable}"
+                    ]
                 
-                solutions = sp.solve(equation, x)
-                result['solution'] = [str(sol.evalf() if sol.is_number else sol) for sol in solutions]
-                result['steps'] = [
-                    f"Original equation: {eq_str}",
-                    f"Cleaned form: {cleaned}",
-                    f"Parsed: {equation} = 0",
-                    f"Solutions: {result['solution']}"
-                ]
+                result['solution'] = solved['solutions']
+                result['solver'] = {
+                    'tier': solved['tier'],
+                    'classification': solved['classification'],
+                    'elapsed_ms': solved['elapsed_ms']
+                }
+                result['steps'].append(f"Equation type: {solved['classification']} (solved by {solved['tier']})")
+                if 'interval' in solved:
+                    low, high = solved['interval']
+                    result['solver'].update(interval=solved['interval'], complete=solved['complete'])
+                    result['steps'].append(f"Real roots searched in [{low:g}, {high:g}] only; there may be others outside it")
+                result['steps'].append(f"Solutions: {result['solution']}")
+            except (OperationTimeout, PoolBusy) as e:
+                return solver_unavailable_payload(e)
             except Exception as e:
-                return jsonify({'error': f'Error solving equation: {str(e)}'}), 400
+                return {'error': f'Error solving equation: {str(e)}'}, 400
                 
         # INTEGRATE: integrate x^2 * sin x
-        elif 'integrate' in query_lower or '∫' in query:
-            expr_str = query.replace('integrate', '').replace('Integrate', '').replace('∫', '').strip()
+        elif operation == 'integrate':
+            expr_str = body
             result['type'] = 'integration'
             
             try:
                 cleaned = clean_expression(expr_str)
-                expr = parse_expr(cleaned, transformations=(standard_transformations + (implicit_multiplication_application,)))
-                integral = sp.integrate(expr, x)
-                result['solution'] = str(integral)
+                expr = parse(cleaned)
+                variable = choose_variable(expr)
+                integral = run_sympy('integrate', expr, variable, cancel_event)
+                result['solution'] = integral
+                result['variable'] = str(variable)
                 result['steps'] = [
                     f"Original: {expr_str}",
                     f"Cleaned: {cleaned}",
                     f"Parsed: {expr}",
-                    f"Integrating with respect to x",
+                    f"Integrating with respect to {variable}",
                     f"Result: {integral} + C"
                 ]
+            except (OperationTimeout, PoolBusy) as e:
+                return solver_unavailable_payload(e)
             except Exception as e:
-                return jsonify({'error': f'Error integrating: {str(e)}'}), 400
+                return {'error': f'Error integrating: {str(e)}'}, 400
                 
         # DIFFERENTIATE: diff x^3 cos x
-        elif 'differentiate' in query_lower or 'diff' in query_lower or 'derivative' in query_lower or "d/dx" in query_lower:
-            expr_str = query.replace('differentiate', '').replace('Differentiate', '').replace('diff', '').replace('Diff', '').replace('derivative', '').replace('Derivative', '').replace('d/dx', '').strip()
+        elif operation == 'differentiate':
+            expr_str = body
             result['type'] = 'differentiation'
             
             try:
                 cleaned = clean_expression(expr_str)
-                expr = parse_expr(cleaned, transformations=(standard_transformations + (implicit_multiplication_application,)))
-                derivative = sp.diff(expr, x)
-                result['solution'] = str(derivative)
+                expr = parse(cleaned)
+                variable = choose_variable(expr)
+                derivative = run_sympy('differentiate', expr, variable, cancel_event)
+                result['solution'] = derivative
+                result['variable'] = str(variable)
                 result['steps'] = [
                     f"Original: {expr_str}",
                     f"Cleaned: {cleaned}",
                     f"Parsed: {expr}",
-                    f"Differentiating with respect to x",
+                    f"Differentiating with respect to {variable}",
                     f"Result: {derivative}"
                 ]
+            except (OperationTimeout, PoolBusy) as e:
+                return solver_unavailable_payload(e)
             except Exception as e:
-                return jsonify({'error': f'Error differentiating: {str(e)}'}), 400
+                return {'error': f'Error differentiating: {str(e)}'}, 400
         
         # FACTOR: factor x^2 - 9
-        elif 'factor' in query_lower:
-            expr_str = query.replace('factor', '').replace('Factor', '').strip()
+        elif operation == 'factor':
+            expr_str = body
             result['type'] = 'factorization'
             
             try:
                 cleaned = clean_expression(expr_str)
-                expr = parse_expr(cleaned, transformations=(standard_transformations + (implicit_multiplication_application,)))
-                factored = sp.factor(expr)
-                result['solution'] = str(factored)
+                expr = parse(cleaned)
+                factored = run_sympy('factor', expr, cancel_event=cancel_event)
+                result['solution'] = factored
                 result['steps'] = [
                     f"Original: {expr_str}",
                     f"Cleaned: {cleaned}",
                     f"Parsed: {expr}",
                     f"Factored: {factored}"
                 ]
+            except (OperationTimeout, PoolBusy) as e:
+                return solver_unavailable_payload(e)
             except Exception as e:
-                return jsonify({'error': f'Error factoring: {str(e)}'}), 400
-        
-        # TRIG FUNCTIONS: sin45, cos90, tan30, etc.
-        elif any(t in query_lower for t in ['sin', 'cos', 'tan']):
-            import re
-            for func in ['sin', 'cos', 'tan']:
-                match = re.search(rf'{func}\s*\(?\s*(\d+(?:\.\d+)?)\s*\)?', query_lower)
-                if match:
-                    angle_str = match.group(1)
-                    trig_result = handle_trig_constant(func, angle_str)
-                    if trig_result:
-                        trig_result['steps'] = [step for step in trig_result.get('steps', []) if step.strip()]
-                        return jsonify(trig_result)
+                return {'error': f'Error factoring: {str(e)}'}, 400
+        
+        # TRIG FUNCTIONS: sin45, cos90, tan30, etc. (a lone trig constant; anything
+        # larger such as "2*sin30 + 1" is evaluated by the numeric path below)
+        elif operation == 'trig_range':
+            try:
+                func_name, start, stop, step, unit = TRIG_RANGE_RE.fullmatch(body).groups()
+                return handle_trig_range(func_name, start, stop, step, 'radians' if unit else 'degrees'), 200
+            except ValueError as e:
+                return {'error': f'Invalid trig table: {str(e)}'}, 400
+        
+        elif operation == 'trig':
+            trig_match = TRIG_CONSTANT_RE.fullmatch(body)
+            trig_result = handle_trig_constant(trig_match.group(1), trig_match.group(2),
+                                               'radians' if trig_match.group(3) else 'degrees')
+            if trig_result:
+                trig_result['steps'] = [step for step in trig_result.get('steps', []) if step.strip()]
+                return trig_result, 200
         
         # DEFAULT: Simplify or evaluate
         else:
@@ -522,331 +655,715 @@ def solve():
             try:
                 cleaned = clean_expression(query)
                 
-                # Try to detect if it's a pure number expression (no x)
-                if 'x' not in cleaned.lower():
-                    # Try to evaluate numerically
-                    try:
-                        import math
-                        allowed_names = {
-                            'sin': math.sin, 'cos': math.cos, 'tan': math.tan,
-                            'sqrt': math.sqrt, 'log': math.log, 'exp': math.exp,
-                            'pi': math.pi, 'e': math.e,
-                            'asin': math.asin, 'acos': math.acos, 'atan': math.atan,
-                            'abs': abs, 'sinh': math.sinh, 'cosh': math.cosh, 'tanh': math.tanh
-                        }
-                        numerical_result = eval(cleaned, {"__builtins__": {}}, allowed_names)
-                        result['solution'] = str(float(numerical_result))
-                        result['steps'] = [
-                            f"Original: {query}",
-                            f"Cleaned: {cleaned}",
-                            f"Numerical Result: {numerical_result}"
-                        ]
-                    except:
-                        # Fall back to symbolic
-                        expr = parse_expr(cleaned, transformations=(standard_transformations + (implicit_multiplication_application,)))
-                        simplified = sp.simplify(expr)
-                        result['solution'] = str(simplified)
-                        result['steps'] = [
-                            f"Original: {query}",
-                            f"Cleaned: {cleaned}",
-                            f"Simplified: {simplified}"
-                        ]
+                # Variable-free input: compiled numeric evaluator, trig arguments in degrees
+                numerical_result = None
+                try:
+                    numerical_result = evaluate_constant(normalize_expression(query, degree_angles=False),
+                                                         angle_mode='degrees')
+                except ResultTooLarge as e:
+                    # Final: the SymPy paths below would evaluate the same number, inline and unbounded
+                    return {'error': f'Could not evaluate expression: {e}'}, 400
+                except (ValueError, ZeroDivisionError):
+                    numerical_result = None
+                
+                if isinstance(numerical_result, Fraction):
+                    result['solution'] = str(numerical_result)
+                    result['steps'] = [
+                        f"Original: {query}",
+                        f"Cleaned: {cleaned}",
+                        f"Exact Result: {numerical_result}"
+                    ]
+                    if numerical_result.denominator != 1:
+                        result['steps'].append(f"Decimal: {float(numerical_result)}")
+                elif numerical_result is not None:
+                    result['solution'] = str(numerical_result)
+                    result['steps'] = [
+                        f"Original: {query}",
+                        f"Cleaned: {cleaned}",
+                        f"Numerical Result: {numerical_result}"
+                    ]
                 else:
-                    # Contains x, do symbolic simplification
-                    expr = parse_expr(cleaned, transformations=(standard_transformations + (implicit_multiplication_application,)))
-                    simplified = sp.simplify(expr)
-                    result['solution'] = str(simplified)
+                    # Symbolic simplification (parsed once, memoized across requests)
+                    expr = parse(cleaned)
+                    simplified = run_sympy('simplify', expr, cancel_event=cancel_event)
+                    result['solution'] = simplified
                     result['steps'] = [
                         f"Original: {query}",
                         f"Cleaned: {cleaned}",
                         f"Simplified: {simplified}"
                     ]
+            except (OperationTimeout, PoolBusy) as e:
+                return solver_unavailable_payload(e)
             except Exception as e:
-                # Last resort: try sympify
+                # Last resort: try sympify (unevaluated here; the worker evaluates it under the timeout)
                 try:
-                    sympified = sp.sympify(query, evaluate=True)
-                    result['solution'] = str(sympified)
+                    sympified = run_sympy('evaluate', sp.sympify(query, evaluate=False), cancel_event=cancel_event)
+                    result['solution'] = sympified
                     result['steps'] = [f"Input: {query}", f"Result: {sympified}"]
+                except (OperationTimeout, PoolBusy) as unavailable:
+                    return solver_unavailable_payload(unavailable)
                 except:
-                    return jsonify({'error': f'Could not parse expression: {str(e)}'}), 400
+                    return {'error': f'Could not parse expression: {str(e)}'}, 400
         
-        return jsonify(result)
+        result['timing'] = {'parse_ms': round(timing['parse_ms'], 3)}
+        return result, 200
+    
+    except Exception as e:
+        return {'error': f'Unexpected error: {str(e)}'}, 500
+
+def solve_steps(query):
+    """
+    Generate (event, data) pairs for /api/solve/stream. Normalization and parse
+    steps are emitted as soon as they are computed, and engine steps are relayed
+    from the worker pool while it works. The same worker task then computes the
+    answer, which goes into the solve cache, so the final event (the payload
+    /api/solve returns) is built from it rather than from a second solve.
+    """
+    started = time.perf_counter()
+    
+    def step(data):
+        return 'step', {**data, 'elapsed_ms': round((time.perf_counter() - started) * 1000, 3)}
+    
+    query = query.strip() if isinstance(query, str) else ''
+    if not query:
+        yield 'result', {'error': 'No query provided', 'status': 400}
+        return
+    
+    operation, body = detect_operation(query)
+    yield step({'stage': 'detect', 'text': f'Operation: {operation}'})
+    
+    if operation in EXPLAINERS and len(split_top_level(body)) == 1:
+        try:
+            cleaned = clean_expression(body)
+            yield step({'stage': 'normalize', 'text': f'Cleaned form: {cleaned}'})
+            
+            if operation == 'solve' and '=' in cleaned:
+                lhs, rhs = cleaned.split('=')
+                expr = expression_parser.parse(lhs) - expression_parser.parse(rhs)
+                yield step({'stage': 'parse', 'text': f'Parsed: {expr} = 0'})
+            else:
+                expr = expression_parser.parse(cleaned)
+                yield step({'stage': 'parse', 'text': f'Parsed: {expr}'})
+            
+            # Calculator-style input is answered by the numeric evaluator; there is nothing to explain
+            if operation != 'simplify' or expr.free_symbols:
+                variable = choose_variable(expr)
+                # solve_query below looks the answer up under the same (operation, expr) key
+                with_result = solve_cache.get(operation, expr) is None
+                # Closed explicitly when the client disconnects mid-stream, which frees the worker at once
+                with closing(sympy_pool.run_stream('explain', operation, expr, variable, with_result)) as engine:
+                    while True:
+                        try:
+                            engine_step = next(engine)
+                        except StopIteration as done:
+                            if with_result:
+                                solve_cache.put(operation, expr, done.value)
+                            break
+                        yield step(engine_step)
+        except (OperationTimeout, PoolBusy) as e:
+            payload, status = solver_unavailable_payload(e)
+            yield step({'stage': 'timeout' if isinstance(e, OperationTimeout) else 'busy', 'text': payload['error']})
+            yield 'result', {**payload, 'status': status}
+            return
+        except Exception as e:
+            yield step({'stage': 'note', 'text': f'Step details unavailable: {str(e)}'})
     
+    payload, status = solve_query(query)
+    yield 'result', {**payload, 'status': status}
+
+@app.route('/api/solve', methods=['POST'])
+def solve():
+    data = request.json or {}
+    payload, status = solve_query(data.get('query', ''))
+    response = jsonify(payload)
+    if status == 503:
+        response.headers['Retry-After'] = '1'
+    return response, status
+
+@app.route('/api/solve/batch', methods=['POST'])
+def solve_batch():
+    """
+    Solve many queries in one request. Identical queries are evaluated once and
+    fanned out over the SymPy worker pool; results come back in input order, or
+    as NDJSON lines in completion order when "stream" is set.
+    """
+    try:
+        data = request.json or {}
+        queries = data.get('queries')
+        
+        if not isinstance(queries, list) or not queries:
+            return jsonify({'error': 'queries must be a non-empty list'}), 400
+        
+        if len(queries) > SOLVE_BATCH_MAX_ITEMS:
+            return jsonify({'error': f'A batch may contain at most {SOLVE_BATCH_MAX_ITEMS} queries'}), 400
+        
+        # Map each distinct query to every input position it appears at
+        positions = {}
+        for index, query in enumerate(queries):
+            key = query.strip() if isinstance(query, str) else ''
+            positions.setdefault(key, []).append(index)
+        
+        # Set when a streaming client goes away, so its queued and in-flight solves stop holding workers
+        cancelled = threading.Event()
+        futures = {batch_executor.submit(solve_query, key, cancelled): key for key in positions}
+        
+        def item(index, payload, status):
+            return {'index': index, 'query': queries[index], 'status': status, **payload}
+        
+        if data.get('stream'):
+            def generate():
+                try:
+                    for future in as_completed(futures):
+                        payload, status = future.result()
+                        for index in positions[futures[future]]:
+                            yield json.dumps(item(index, payload, status)) + '\n'
+                finally:
+                    # Reached early only when the response is closed before the last line (client disconnect)
+                    cancelled.set()
+                    for future in futures:
+                        future.cancel()
+            return Response(generate(), mimetype='application/x-ndjson')
+        
+        results = [None] * len(queries)
+        for future, key in futures.items():
+            payload, status = future.result()
+            for index in positions[key]:
+                results[index] = item(index, payload, status)
+        
+        return jsonify({
+            'results': results,
+            'total': len(queries),
+            'unique': len(positions),
+            'errors': sum(1 for r in results if r['status'] != 200)
+        }), 200
     except Exception as e:
-        return jsonify({'error': f'Unexpected error: {str(e)}'}), 500
+        return jsonify({'error': str(e)}), 500
 
-@app.route('/api/plot', methods=['POST'])
+@app.route('/api/solve/stream', methods=['GET', 'POST'])
+def solve_stream():
+    """
+    Server-Sent Events variant of /api/solve: "step" events arrive while the
+    engine works, followed by one "result" event with the full solution.
+    GET takes ?query= so it can be used directly from EventSource.
+    """
+    if request.method == 'POST':
+        query = (request.json or {}).get('query', '')
+    else:
+        query = request.args.get('query', '')
+    
+    def generate():
+        for event, data in solve_steps(query):
+            yield f'event: {event}\ndata: {json.dumps(data)}\n\n'
+    
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/admin/solve-cache', methods=['GET'])
+def get_solve_cache_stats():
+    """Get solve-result cache hit/miss counters - requires admin key."""
+    if not verify_admin_key(request):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    return jsonify({**solve_cache.stats(), 'pool': sympy_pool.stats(), 'parser': expression_parser.stats()}), 200
+
+@app.route('/api/admin/plot-cache', methods=['GET'])
+def get_plot_cache_stats():
+    """Get rendered-plot cache hit/miss counters - requires admin key."""
+    if not verify_admin_key(request):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    return jsonify({**plot_cache.stats(), 'compiler': plot_compiler.stats(), 'tiles': tile_prefetcher.stats()}), 200
+
+@app.route('/api/admin/database', methods=['GET'])
+def get_database_stats():
+    """Get connection-pool, transaction and quiz-grading counters - requires admin key."""
+    if not verify_admin_key(request):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    return jsonify({**database.stats(), 'answer_keys': answer_keys.stats(), 'submissions': submission_writer.stats()}), 200
+
+def cached_response(body, etag, mimetype='application/json', headers=None, cache_control=None):
+    """Response for a content-addressed render: revalidatable by ETag, cacheable by browsers and proxies."""
+    response = Response(body, mimetype=mimetype, headers=headers)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control or f'public, max-age={PLOT_CACHE_MAX_AGE}'
+    return response
+
+def not_modified(etag, cache_control=None):
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control or f'public, max-age={PLOT_CACHE_MAX_AGE}'
+    return response
+
+def replay_render(render_id, image_id=None):
+    """
+    Cached response for render_id, or None when it has to be rendered. A JSON
+    body that links to /api/render/<image_id> is only reused while that image
+    is still stored.
+    """
+    if image_id is not None and image_id not in plot_cache:
+        return None
+    cached = plot_cache.get(render_id)
+    if cached is None:
+        return None
+    return cached_response(cached[0], render_id, *cached[1:])
+
+def image_options(data):
+    """
+    (image_format, inline) request options for endpoints that return an image. Raises ValueError.
+    Images are inline by default: an /api/render URL only resolves while the render is
+    still cached, so clients opt into URLs with inline=false and must handle a 404.
+    """
+    image_format = data.get('image_format', 'png')
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"image_format must be one of: {', '.join(IMAGE_FORMATS)}")
+    return image_format, str(data.get('inline', 'true')).lower() in ('1', 'true', 'yes')
+
+def image_reference(image_id, body, mimetype, inline):
+    """The 'image' field of a response: a data: URL when inline, else the /api/render URL."""
+    return data_url(body, mimetype) if inline else f'/api/render/{image_id}'
+
+def publish_image(fig, image_id, image_format, dpi, inline):
+    """Encode a drawn figure, store it under its content address and return its image reference."""
+    body, mimetype = render_image(fig, image_format, dpi)
+    plot_cache.put(image_id, body, mimetype)
+    return image_reference(image_id, body, mimetype, inline)
+
+@app.route('/api/render/<render_id>', methods=['GET'])
+def get_render(render_id):
+    """Serve a stored image (PNG, thumbnail or SVG) by its content address."""
+    cache_control = f'public, max-age={RENDER_MAX_AGE}, immutable'
+    if not re.fullmatch(r'[0-9a-f]{64}', render_id):
+        return jsonify({'error': 'Render not found'}), 404
+    if request.if_none_match.contains(render_id):
+        return not_modified(render_id, cache_control)
+    
+    cached = plot_cache.get(render_id)
+    if cached is None:
+        return jsonify({'error': 'Render not found or expired; request the plot again'}), 404
+    body, mimetype, headers = cached
+    return cached_response(body, render_id, mimetype, headers, cache_control)
+
+def style_plot_axes(ax, title, x_label=None):
+    """Grid, zero axes, labels and legend shared by every /api/plot figure."""
+    # Add coordinate grid with axes
+    ax.grid(True, alpha=0.4, linestyle='--', linewidth=0.7)
+    ax.axhline(y=0, color='k', linewidth=0.8, alpha=0.5)
+    ax.axvline(x=0, color='k', linewidth=0.8, alpha=0.5)
+    
+    # Add axis labels
+    if x_label:
+        ax.set_xlabel(x_label, fontsize=12, fontweight='bold')
+    ax.set_ylabel('y (Value)', fontsize=12, fontweight='bold')
+    ax.set_title(title, fontsize=14, fontweight='bold', pad=15)
+    
+    # Add tick marks
+    ax.tick_params(which='major', labelsize=10)
+    ax.grid(True, which='major', alpha=0.3)
+    ax.grid(True, which='minor', alpha=0.1)
+    ax.legend()
+
+@app.route('/api/plot', methods=['GET', 'POST'])
 def plot():
+    """
+    Plot a function of x. POST takes a JSON body; GET takes the same fields as
+    query parameters so browsers and proxies can cache and revalidate the result.
+    format=data skips rendering and returns the sampled points instead
+    (encoding: base64 Float32 in JSON, binary octet-stream, or json arrays).
+    Otherwise 'image' is a data: URL for image_format png, svg or thumb
+    (inline=false returns an /api/render URL instead). Curves are sampled adaptively within a point budget (max_points).
+    curves=[...] overlays several function, parametric and polar curves instead of expr.
+    """
     try:
-        data = request.json
+        data = (request.json or {}) if request.method == 'POST' else request.args
         expr_str = data.get('expr', 'sin(x)').strip()
         x_from = data.get('from', None)
         x_to = data.get('to', None)
         mode = data.get('mode', 'degrees')
+        output_format = data.get('format', 'png')
+        encoding = data.get('encoding', 'base64')
+        try:
+            point_budget = max(16, min(int(data.get('max_points', PLOT_POINT_BUDGET)), PLOT_POINT_BUDGET))
+            x_from = None if x_from is None or x_from == '' else float(x_from)
+            x_to = None if x_to is None or x_to == '' else float(x_to)
+            if not all(math.isfinite(bound) for bound in (x_from, x_to) if bound is not None):
+                raise ValueError
+        except (ValueError, TypeError, OverflowError):
+            return jsonify({'error': 'max_points must be an integer, and from and to finite numbers'}), 400
+        
+        if output_format not in ('png', 'data'):
+            return jsonify({'error': "format must be 'png' or 'data'"}), 400
+        if output_format == 'data' and encoding not in PLOT_DATA_ENCODINGS:
+            return jsonify({'error': f"encoding must be one of: {', '.join(PLOT_DATA_ENCODINGS)}"}), 400
+        try:
+            image_format, inline = image_options(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         # Set defaults if empty
-        if x_from is None or x_from == '' or x_from == 0:
+        if x_from is None or x_from == 0:
             x_from = 0 if mode == 'degrees' else 0
-        else:
-            x_from = float(x_from)
             
-        if x_to is None or x_to == '' or x_to == 0:
+        if x_to is None or x_to == 0:
             x_to = 360 if mode == 'degrees' else (2 * np.pi)
-        else:
-            x_to = float(x_to)
+        
+        # Several curves (functions of x, parametric, polar) drawn together
+        curve_specs = data.get('curves')
+        if curve_specs:
+            if isinstance(curve_specs, str):
+                try:
+                    curve_specs = json.loads(curve_specs)
+                except ValueError:
+                    return jsonify({'error': 'curves must be a JSON list'}), 400
+            return plot_overlay(curve_specs, (float(x_from), float(x_to)), mode, output_format, encoding, point_budget,
+                                image_format, inline)
         
         if not expr_str:
             return jsonify({'error': 'Please enter a mathematical expression.'}), 400
         
-        # Process input: add spaces around operators for better parsing
-        expr_str = expr_str.replace('sin ', 'sin(').replace('cos ', 'cos(').replace('tan ', 'tan(')
-        
-        # Handle implicit multiplication: 3x -> 3*x, 2(x+1) -> 2*(x+1), etc.
-        expr_processed = ''
-        for i, char in enumerate(expr_str):
-            expr_processed += char
-            if i < len(expr_str) - 1:
-                curr = char
-                next_char = expr_str[i+1]
-                # Add * between: digit-letter, digit-paren, paren-letter, )-(, )-digit
-                if (curr.isdigit() and next_char.isalpha()) or \
-                   (curr.isdigit() and next_char == '(') or \
-                   (curr.isalpha() and next_char == '(') or \
-                   (curr == ')' and next_char == '(') or \
-                   (curr == ')' and next_char.isdigit()):
-                    expr_processed += '*'
-        
-        expr_str = expr_processed
+        # Normalize input: ^ to **, sin x to sin(x), implicit multiplication
+        expr_str = normalize_expression(expr_str, degree_angles=False, space_multiplies=True)
+        
+        # Identical renders share one cache entry; the key doubles as the ETag
+        plot_inputs = ('plot', expr_str, float(x_from), float(x_to), mode, point_budget)
+        image_id = None
+        if output_format == 'data':
+            render_id = render_key(*plot_inputs, 'data', encoding)
+        else:
+            render_id = render_key(*plot_inputs, 'png', image_format, inline, PLOT_FIGSIZE, PLOT_DPI)
+            image_id = render_key(*plot_inputs, 'image', image_format, PLOT_FIGSIZE, PLOT_DPI)
+        if request.if_none_match.contains(render_id):
+            return not_modified(render_id)
+        cached = replay_render(render_id, None if inline else image_id)
+        if cached is not None:
+            return cached
+        
+        # Compile once (cached); anything outside the whitelist is rejected here
+        try:
+            compiled = plot_compiler.compile(expr_str, ('x',))
+        except ValueError:
+            return jsonify({'error': 'Invalid expression. Please check your function.'}), 400
         
         # Detect if this is a single value (no 'x' variable) or a function
-        is_single_value = 'x' not in expr_str.lower()
+        is_single_value = compiled.is_constant
         
-        # Calculate single value if applicable
+        # Calculate single value if applicable (trig arguments follow the angle mode)
         single_result = None
         if is_single_value:
             try:
-                allowed_single = {
-                    'sin': lambda v: np.sin(np.radians(v)) if mode == 'degrees' else np.sin(v),
-                    'cos': lambda v: np.cos(np.radians(v)) if mode == 'degrees' else np.cos(v),
-                    'tan': lambda v: np.tan(np.radians(v)) if mode == 'degrees' else np.tan(v),
-                    'sqrt': np.sqrt,
-                    'log': np.log,
-                    'exp': np.exp,
-                    'pi': np.pi,
-                    'e': np.e,
-                    'abs': abs,
-                    'asin': np.arcsin,
-                    'acos': np.arccos,
-                    'atan': np.arctan
-                }
-                single_result = eval(expr_str, {"__builtins__": {}}, allowed_single)
+                single_result = float(plot_compiler.compile(expr_str, (), 'degrees' if mode == 'degrees' else 'radians')())
             except Exception as e:
                 return jsonify({'error': f'Invalid expression. Please check your function.'}), 400
         
         # For single values, use a tiny range (2 points)
+        y_limits = None
         if is_single_value:
             x_display = np.array([0, 1])
             y_vals = np.array([float(single_result), float(single_result)])
             x_axis_label = 'Range'
+            sampling = {'points': 2, 'evaluations': 1, 'breaks': 0}
         else:
-            # Create x values for display
-            x_display = np.linspace(x_from, x_to, 500)
-            
-            # Prepare x_eval based on mode
-            if mode == 'degrees':
-                x_eval = np.radians(x_display)
-                x_axis_label = 'x (Degrees)'
-            else:
-                x_eval = x_display
-                x_axis_label = 'x (Radians)'
+            x_axis_label = 'x (Degrees)' if mode == 'degrees' else 'x (Radians)'
             
-            # Define allowed functions and constants
-            allowed = {
-                'sin': np.sin,
-                'cos': np.cos,
-                'tan': np.tan,
-                'sqrt': np.sqrt,
-                'log': np.log,
-                'exp': np.exp,
-                'pi': np.pi,
-                'e': np.e,
-                'x': x_eval,
-                'abs': np.abs,
-                'asin': np.arcsin,
-                'acos': np.arccos,
-                'atan': np.arctan
-            }
+            def f(x_vals):
+                # x is sampled in display units; trig functions take radians
+                return compiled(np.radians(x_vals) if mode == 'degrees' else x_vals)
             
-            # Evaluate function
+            # Evaluate function: refined where the curve bends, broken at poles and jumps
             try:
-                y_vals = eval(expr_str, {"__builtins__": {}}, allowed)
+                curve = adaptive_sampling.sample(f, x_from, x_to, budget=point_budget)
             except:
                 return jsonify({'error': 'Invalid expression. Please check your function.'}), 400
-        
-        # Create plot
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        if is_single_value:
-            # For single values, show a horizontal line with dot
-            ax.axhline(y=float(single_result), color='b', linewidth=2, linestyle='--', label=f'Value: {float(single_result):.6f}')
-            ax.plot(0.5, float(single_result), 'ro', markersize=12, label='Result', zorder=5)
-            ax.set_xlim(-0.5, 1.5)
-        else:
-            ax.plot(x_display, y_vals, 'b-', linewidth=2.5, label='f(x)')
-        
-        # Add coordinate grid with axes
-        ax.grid(True, alpha=0.4, linestyle='--', linewidth=0.7)
-        ax.axhline(y=0, color='k', linewidth=0.8, alpha=0.5)
-        ax.axvline(x=0, color='k', linewidth=0.8, alpha=0.5)
-        
-        # Add axis labels
-        if not is_single_value:
-            ax.set_xlabel(x_axis_label, fontsize=12, fontweight='bold')
-        ax.set_ylabel('y (Value)', fontsize=12, fontweight='bold')
-        title_suffix = f' ({mode.capitalize()} Mode)' if not is_single_value else ''
-        ax.set_title(f'Graph of {expr_str}{title_suffix}', fontsize=14, fontweight='bold', pad=15)
-        
-        # Add tick marks
-        ax.tick_params(which='major', labelsize=10)
-        ax.grid(True, which='major', alpha=0.3)
-        ax.grid(True, which='minor', alpha=0.1)
-        ax.legend()
-        
-        plt.tight_layout()
-        
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-        buf.seek(0)
-        img_base64 = base64.b64encode(buf.read()).decode('utf-8')
-        plt.close()
+            x_display, y_vals, y_limits = curve.x, curve.y, curve.y_limits
+            sampling = {'points': len(curve.x), 'evaluations': curve.evaluations, 'breaks': curve.breaks}
+        
+        # Client-side drawing: return the samples, no matplotlib involved
+        if output_format == 'data':
+            meta = {'expression': expr_str, 'mode': mode, 'x_label': x_axis_label, 'sampling': sampling}
+            if y_limits is not None:
+                meta['y_limits'] = list(y_limits)
+            if single_result is not None:
+                meta['single_value'] = float(single_result)
+            body, mimetype, headers = encode_samples(x_display, y_vals, encoding, meta)
+            plot_cache.put(render_id, body, mimetype, headers)
+            return cached_response(body, render_id, mimetype, headers)
+        
+        # Create plot on a pooled figure (no pyplot state, safe across request threads)
+        with figure_pool.axes(PLOT_FIGSIZE, PLOT_DPI) as (fig, ax):
+            if is_single_value:
+                # For single values, show a horizontal line with dot
+                ax.axhline(y=float(single_result), color='b', linewidth=2, linestyle='--', label=f'Value: {float(single_result):.6f}')
+                ax.plot(0.5, float(single_result), 'ro', markersize=12, label='Result', zorder=5)
+                ax.set_xlim(-0.5, 1.5)
+            else:
+                ax.plot(x_display, y_vals, 'b-', linewidth=2.5, label='f(x)')
+                if y_limits is not None:
+                    ax.set_ylim(*y_limits)
+            
+            title_suffix = f' ({mode.capitalize()} Mode)' if not is_single_value else ''
+            style_plot_axes(ax, f'Graph of {expr_str}{title_suffix}', None if is_single_value else x_axis_label)
+            
+            image = publish_image(fig, image_id, image_format, PLOT_DPI, inline)
         
         response = {
-            'image': f'data:image/png;base64,{img_base64}',
+            'image': image,
+            'image_format': image_format,
             'expression': expr_str,
-            'mode': mode
+            'mode': mode,
+            'sampling': sampling
         }
         
         if single_result is not None:
             response['single_value'] = float(single_result)
         
-        return jsonify(response)
+        body = json.dumps(response).encode('utf-8')
+        plot_cache.put(render_id, body)
+        return cached_response(body, render_id)
+    
+    except Exception as e:
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+
+def plot_overlay(curve_specs, x_range, mode, output_format, encoding, point_budget, image_format, inline):
+    """
+    Draw several curves in one figure. Curves sharing a parameter range are
+    sampled on one adaptive grid; the point budget applies per grid.
+    """
+    try:
+        specs = plot_curves.parse_specs(curve_specs, x_range, mode)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    image_id = None
+    if output_format == 'data':
+        render_id = render_key('plot-overlay', specs, mode, point_budget, 'data', encoding)
+    else:
+        render_id = render_key('plot-overlay', specs, mode, point_budget, 'png', image_format, inline, PLOT_FIGSIZE, PLOT_DPI)
+        image_id = render_key('plot-overlay', specs, mode, point_budget, 'image', image_format, PLOT_FIGSIZE, PLOT_DPI)
+    if request.if_none_match.contains(render_id):
+        return not_modified(render_id)
+    cached = replay_render(render_id, None if inline else image_id)
+    if cached is not None:
+        return cached
+    
+    try:
+        curves, y_limits = plot_curves.build_curves(specs, mode, point_budget, plot_compiler)
+    except ValueError:
+        return jsonify({'error': 'Invalid expression. Please check your curves.'}), 400
+    summary = [{'type': c.kind, 'label': c.label,
+                'sampling': {'points': len(c.x), 'evaluations': c.evaluations, 'breaks': c.breaks}} for c in curves]
+    
+    if output_format == 'data':
+        meta = {'mode': mode, 'sampling': [item['sampling'] for item in summary]}
+        if y_limits is not None:
+            meta['y_limits'] = list(y_limits)
+        body, mimetype, headers = encode_curves(curves, encoding, meta)
+        plot_cache.put(render_id, body, mimetype, headers)
+        return cached_response(body, render_id, mimetype, headers)
+    
+    with figure_pool.axes(PLOT_FIGSIZE, PLOT_DPI) as (fig, ax):
+        for curve in curves:
+            ax.plot(curve.x, curve.y, linewidth=2.5, label=curve.label)
+        if y_limits is not None:
+            ax.set_ylim(*y_limits)
+        
+        only_functions = all(c.kind == 'function' for c in curves)
+        if not any(c.kind == 'function' for c in curves):
+            # Parametric and polar shapes are only recognizable without distortion
+            ax.set_aspect('equal', adjustable='datalim')
+        x_label = ('x (Degrees)' if mode == 'degrees' else 'x (Radians)') if only_functions else 'x'
+        labels = ', '.join(c.label for c in curves)
+        title = f'Graph of {labels}' if len(labels) <= 60 else f'Graph of {len(curves)} curves'
+        style_plot_axes(ax, f'{title} ({mode.capitalize()} Mode)', x_label)
+        
+        image = publish_image(fig, image_id, image_format, PLOT_DPI, inline)
+    
+    body = json.dumps({'image': image, 'image_format': image_format, 'mode': mode, 'curves': summary}).encode('utf-8')
+    plot_cache.put(render_id, body)
+    return cached_response(body, render_id)
+
+def tile_key(expr_str, mode, zoom, index, encoding):
+    return render_key('plot-tile', expr_str, mode, zoom, index, plot_tiles.TILE_POINTS, encoding)
+
+def build_tile(expr_str, mode, zoom, index, encoding):
+    """Sample, encode and store one tile. Returns its (body, mimetype, headers)."""
+    compiled = plot_compiler.compile(expr_str, ('x',))
+    
+    def f(x_vals):
+        return compiled(np.radians(x_vals) if mode == 'degrees' else x_vals)
+    
+    curve = plot_tiles.sample_tile(f, zoom, index, mode)
+    meta = {
+        'expression': expr_str,
+        'mode': mode,
+        'zoom': zoom,
+        'index': index,
+        'x_range': list(plot_tiles.tile_bounds(zoom, index, mode)),
+        'sampling': {'points': len(curve.x), 'evaluations': curve.evaluations, 'breaks': curve.breaks}
+    }
+    if curve.y_limits is not None:
+        meta['y_limits'] = list(curve.y_limits)
+    body, mimetype, headers = encode_samples(curve.x, curve.y, encoding, meta)
+    plot_cache.put(tile_key(expr_str, mode, zoom, index, encoding), body, mimetype, headers)
+    return body, mimetype, headers
+
+@app.route('/api/plot/tiles/<int(signed=True):zoom>/<int(signed=True):index>', methods=['GET'])
+def plot_tile(zoom, index):
+    """
+    Sampled points of one x-tile of a curve (see plot_tiles for the tiling).
+    Query parameters: expr, mode, encoding as for format=data, and prefetch=0
+    to skip computing the neighbouring tiles in the background.
+    """
+    try:
+        expr_str = request.args.get('expr', '').strip()
+        mode = request.args.get('mode', 'degrees')
+        encoding = request.args.get('encoding', 'base64')
+        prefetch = request.args.get('prefetch', '1').lower() not in ('0', 'false', 'no')
+        
+        if not expr_str:
+            return jsonify({'error': 'Please enter a mathematical expression.'}), 400
+        if mode not in plot_tiles.BASE_SPAN:
+            return jsonify({'error': "mode must be 'degrees' or 'radians'"}), 400
+        if encoding not in PLOT_DATA_ENCODINGS:
+            return jsonify({'error': f"encoding must be one of: {', '.join(PLOT_DATA_ENCODINGS)}"}), 400
+        try:
+            plot_tiles.tile_bounds(zoom, index, mode)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        expr_str = normalize_expression(expr_str, degree_angles=False, space_multiplies=True)
+        try:
+            plot_compiler.compile(expr_str, ('x',))
+        except ValueError:
+            return jsonify({'error': 'Invalid expression. Please check your function.'}), 400
+        
+        # Queue the tiles a pan or zoom-in will ask for next while this one is served
+        if prefetch:
+            for z, i in plot_tiles.neighbours(zoom, index):
+                if tile_key(expr_str, mode, z, i, encoding) not in plot_cache:
+                    tile_prefetcher.prefetch((expr_str, mode, z, i, encoding),
+                                             lambda z=z, i=i: build_tile(expr_str, mode, z, i, encoding))
+        
+        tile_id = tile_key(expr_str, mode, zoom, index, encoding)
+        if request.if_none_match.contains(tile_id):
+            return not_modified(tile_id)
+        cached = replay_render(tile_id)
+        if cached is not None:
+            return cached
+        body, mimetype, headers = build_tile(expr_str, mode, zoom, index, encoding)
+        return cached_response(body, tile_id, mimetype, headers)
     
     except Exception as e:
         return jsonify({'error': f'An error occurred: {str(e)}'}), 500
 
 @app.route('/api/geometry', methods=['POST'])
 def geometry():
+    """
+    Analyze and draw one shape command (see geometry_engine.parse_command):
+    polygons, regular n-gons, rectangles, quadrilaterals, circles, sectors
+    and cube/cylinder/cone/sphere solids.
+    """
     try:
         data = request.json
         command = data.get('command', '').lower().strip()
+        try:
+            image_format, inline = image_options(data)
+            shape = geometry_engine.parse_command(command)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         result = {
-            'shape': None,
-            'properties': {},
-            'image': None
+            'shape': geometry_engine.shape_name(shape),
+            'properties': geometry_engine.properties(shape),
+            'image': None,
+            'image_format': image_format
         }
         
-        if 'triangle' in command:
-            parts = command.replace('triangle', '').strip().split()
-            if len(parts) >= 3:
-                a, b, c = float(parts[0]), float(parts[1]), float(parts[2])
-                
-                if a + b > c and b + c > a and a + c > b:
-                    s = (a + b + c) / 2
-                    area = math.sqrt(s * (s - a) * (s - b) * (s - c))
-                    perimeter = a + b + c
-                    
-                    angle_A = math.degrees(math.acos((b**2 + c**2 - a**2) / (2 * b * c)))
-                    angle_B = math.degrees(math.acos((a**2 + c**2 - b**2) / (2 * a * c)))
-                    angle_C = 180 - angle_A - angle_B
-                    
-                    result['shape'] = 'triangle'
-                    result['properties'] = {
-                        'sides': [a, b, c],
-                        'area': round(area, 2),
-                        'perimeter': round(perimeter, 2),
-                        'angles': [round(angle_A, 2), round(angle_B, 2), round(angle_C, 2)]
-                    }
-                    
-                    fig, ax = plt.subplots(figsize=(8, 8))
-                    
-                    x1, y1 = 0, 0
-                    x2, y2 = c, 0
-                    x3 = (c**2 + b**2 - a**2) / (2 * c)
-                    y3 = math.sqrt(b**2 - x3**2)
-                    
-                    triangle = patches.Polygon([(x1, y1), (x2, y2), (x3, y3)], fill=True, alpha=0.3, edgecolor='blue', linewidth=2)
-                    ax.add_patch(triangle)
-                    
-                    ax.plot([x1, x2, x3, x1], [y1, y2, y3, y1], 'bo-', markersize=8)
-                    
-                    ax.text((x1+x2)/2, (y1+y2)/2 - 0.3, f'{c}', ha='center', fontsize=12)
-                    ax.text((x2+x3)/2 + 0.3, (y2+y3)/2, f'{a}', ha='center', fontsize=12)
-                    ax.text((x1+x3)/2 - 0.3, (y1+y3)/2, f'{b}', ha='center', fontsize=12)
-                    
-                    ax.set_aspect('equal')
-                    ax.grid(True, alpha=0.3)
-                    ax.set_title(f'Triangle: sides = {a}, {b}, {c}', fontsize=14)
-                    
-                    buf = io.BytesIO()
-                    plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-                    buf.seek(0)
-                    img_base64 = base64.b64encode(buf.read()).decode('utf-8')
-                    plt.close()
-                    
-                    result['image'] = f'data:image/png;base64,{img_base64}'
-                else:
-                    return jsonify({'error': 'Invalid triangle: sides do not satisfy triangle inequality'}), 400
-            else:
-                return jsonify({'error': 'Triangle requires 3 side lengths'}), 400
-                
-        elif 'circle' in command:
-            parts = command.replace('circle', '').strip().split()
-            if len(parts) >= 1:
-                radius = float(parts[0])
-                
-                area = math.pi * radius ** 2
-                circumference = 2 * math.pi * radius
-                
-                result['shape'] = 'circle'
-                result['properties'] = {
-                    'radius': radius,
-                    'area': round(area, 2),
-                    'circumference': round(circumference, 2),
-                    'diameter': round(2 * radius, 2)
-                }
-                
-                fig, ax = plt.subplots(figsize=(8, 8))
-                circle = patches.Circle((0, 0), radius, fill=True, alpha=0.3, edgecolor='blue', linewidth=2)
-                ax.add_patch(circle)
-                
-                ax.plot([0, radius], [0, 0], 'r-', linewidth=2)
-                ax.plot(0, 0, 'ro', markersize=8)
-                ax.text(radius/2, 0.2, f'r = {radius}', ha='center', fontsize=12)
-                
-                ax.set_aspect('equal')
-                ax.grid(True, alpha=0.3)
-                ax.set_xlim(-radius*1.5, radius*1.5)
-                ax.set_ylim(-radius*1.5, radius*1.5)
-                ax.set_title(f'Circle: radius = {radius}', fontsize=14)
-                
-                buf = io.BytesIO()
-                plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-                buf.seek(0)
-                img_base64 = base64.b64encode(buf.read()).decode('utf-8')
-                plt.close()
-                
-                result['image'] = f'data:image/png;base64,{img_base64}'
-            else:
-                return jsonify({'error': 'Circle requires a radius'}), 400
+        # Drawings are content-addressed by their inputs; an identical shape reuses the stored image
+        image_id = render_key('geometry', result['shape'], shape, image_format, GEOMETRY_FIGSIZE, GEOMETRY_DPI)
+        cached = plot_cache.get(image_id)
+        if cached is not None:
+            result['image'] = image_reference(image_id, cached[0], cached[1], inline)
         else:
-            return jsonify({'error': 'Unknown geometry command. Use "triangle 3 4 5" or "circle 7"'}), 400
+            with figure_pool.axes(GEOMETRY_FIGSIZE, GEOMETRY_DPI, GEOMETRY_MARGINS) as (fig, ax):
+                draw_shape(ax, shape, result['properties'])
+                result['image'] = publish_image(fig, image_id, image_format, GEOMETRY_DPI, inline)
         
         return jsonify(result)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/geometry/batch', methods=['POST'])
+def geometry_batch():
+    """
+    Analyze many shape commands with one vectorized property pass. render='sheet'
+    adds a single grid image of every shape; render='pdf' streams a multi-page
+    PDF worksheet instead of JSON. Without rendering, "stream" returns NDJSON.
+    """
+    try:
+        data = request.json or {}
+        commands = data.get('commands')
+        render = data.get('render', 'none')
+        
+        if not isinstance(commands, list) or not commands:
+            return jsonify({'error': 'commands must be a non-empty list'}), 400
+        if len(commands) > GEOMETRY_BATCH_MAX_ITEMS:
+            return jsonify({'error': f'A batch may contain at most {GEOMETRY_BATCH_MAX_ITEMS} commands'}), 400
+        if render not in ('none', 'sheet', 'pdf'):
+            return jsonify({'error': "render must be 'none', 'sheet' or 'pdf'"}), 400
+        try:
+            columns = int(data.get('columns', geometry_sheets.DEFAULT_COLUMNS))
+            if not 1 <= columns <= geometry_sheets.MAX_COLUMNS:
+                raise ValueError(f'columns must be between 1 and {geometry_sheets.MAX_COLUMNS}')
+            image_format, inline = image_options(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        results = [None] * len(commands)
+        parsed = []
+        for index, command in enumerate(commands):
+            try:
+                parsed.append((index, geometry_engine.parse_command(command if isinstance(command, str) else '')))
+            except ValueError as e:
+                results[index] = {'index': index, 'command': command, 'status': 400, 'error': str(e)}
+        
+        shapes = [shape for _, shape in parsed]
+        for (index, shape), props in zip(parsed, geometry_engine.properties_many(shapes)):
+            results[index] = {'index': index, 'command': commands[index], 'status': 200,
+                              'shape': geometry_engine.shape_name(shape), 'properties': props}
+        errors = [r for r in results if r['status'] != 200]
+        
+        # A worksheet is only useful complete, so drawing requires every command to parse
+        if render != 'none' and errors:
+            return jsonify({'error': 'Some commands could not be parsed', 'results': errors}), 400
+        props = [results[index]['properties'] for index, _ in parsed]
+        
+        if render == 'pdf':
+            return Response(geometry_sheets.pdf_pages(shapes, props, title=data.get('title')), mimetype='application/pdf',
+                            headers={'Content-Disposition': 'attachment; filename="geometry-worksheet.pdf"',
+                                     'X-Accel-Buffering': 'no'})
+        
+        if render == 'none' and data.get('stream'):
+            return Response((json.dumps(r) + '\n' for r in results), mimetype='application/x-ndjson')
+        
+        response = {'results': results, 'total': len(commands), 'errors': len(errors)}
+        if render == 'sheet':
+            if len(shapes) > geometry_sheets.SHEET_MAX_CELLS:
+                return jsonify({'error': f'A sheet holds at most {geometry_sheets.SHEET_MAX_CELLS} shapes; use render=pdf for more'}), 400
+            image_id = render_key('geometry-sheet', [[geometry_engine.shape_name(s), s] for s in shapes], columns,
+                                  image_format, geometry_sheets.CELL_SIZE, geometry_sheets.SHEET_DPI)
+            cached = plot_cache.get(image_id)
+            if cached is not None:
+                response['image'] = image_reference(image_id, cached[0], cached[1], inline)
+            else:
+                fig = geometry_sheets.sheet_figure(shapes, props, columns)
+                response['image'] = publish_image(fig, image_id, image_format, geometry_sheets.SHEET_DPI, inline)
+            response['image_format'] = image_format
+        return jsonify(response), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/ocr', methods=['POST'])
 def ocr():
     try:
@@ -1066,20 +1583,14 @@ def create_quiz():
         questions = data.get('questions', [])
         admin_email = request.headers.get('X-Admin-Key')
         
-        conn = sqlite3.connect(DATABASE)
-        c = conn.cursor()
-        c.execute('INSERT INTO quizzes (title, description, created_by) VALUES (?, ?, ?)',
-                 (title, description, admin_email))
-        quiz_id = c.lastrowid
-        
-        for q in questions:
-            c.execute('''INSERT INTO quiz_questions 
-                        (quiz_id, question_text, option_a, option_b, option_c, option_d, correct_answer)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)''',
-                     (quiz_id, q['text'], q['a'], q['b'], q['c'], q['d'], q['correct']))
-        
-        conn.commit()
-        conn.close()
+        with database.transaction() as c:
+            quiz_id = c.execute('INSERT INTO quizzes (title, description, created_by, question_count) VALUES (?, ?, ?, ?)',
+                                (title, description, admin_email, len(questions))).lastrowid
+            c.executemany('''INSERT INTO quiz_questions 
+                             (quiz_id, question_text, option_a, option_b, option_c, option_d, correct_answer)
+                             VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                          [(quiz_id, q['text'], q['a'], q['b'], q['c'], q['d'], q['correct']) for q in questions])
+        answer_keys.invalidate(quiz_id)
         
         return jsonify({'success': True, 'quiz_id': quiz_id}), 201
     except Exception as e:
@@ -1087,21 +1598,12 @@ def create_quiz():
 
 @app.route('/api/admin/quizzes', methods=['GET'])
 def get_admin_quizzes():
-    """Get all quizzes - requires admin key."""
+    """Get quizzes a page at a time (filters: created_by, since, until) - requires admin key."""
     if not verify_admin_key(request):
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        conn = sqlite3.connect(DATABASE)
-        c = conn.cursor()
-        c.execute('''SELECT q.id, q.title, q.description, q.created_by, q.created_at, COUNT(qq.id) as q_count
-                     FROM quizzes q
-                     LEFT JOIN quiz_questions qq ON q.id = qq.quiz_id
-                     GROUP BY q.id ORDER BY q.created_at DESC''')
-        quizzes = [{'id': row[0], 'title': row[1], 'description': row[2], 'created_by': row[3], 
-                   'created_at': row[4], 'question_count': row[5]} for row in c.fetchall()]
-        conn.close()
-        return jsonify({'quizzes': quizzes}), 200
+        return admin_list_response(admin_lists.QUIZZES, 'quizzes')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1112,13 +1614,12 @@ def delete_quiz(quiz_id):
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        conn = sqlite3.connect(DATABASE)
-        c = conn.cursor()
-        c.execute('DELETE FROM quiz_questions WHERE quiz_id = ?', (quiz_id,))
-        c.execute('DELETE FROM quiz_submissions WHERE quiz_id = ?', (quiz_id,))
-        c.execute('DELETE FROM quizzes WHERE id = ?', (quiz_id,))
-        conn.commit()
-        conn.close()
+        with database.transaction() as c:
+            analytics.record_quiz_deleted(c, quiz_id)
+            c.execute('DELETE FROM quiz_questions WHERE quiz_id = ?', (quiz_id,))
+            c.execute('DELETE FROM quiz_submissions WHERE quiz_id = ?', (quiz_id,))
+            c.execute('DELETE FROM quizzes WHERE id = ?', (quiz_id,))
+        answer_keys.invalidate(quiz_id)
         return jsonify({'success': True}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1127,12 +1628,9 @@ def delete_quiz(quiz_id):
 def get_quizzes_for_users():
     """Get available quizzes for users."""
     try:
-        conn = sqlite3.connect(DATABASE)
-        c = conn.cursor()
-        c.execute('SELECT id, title, description, created_at FROM quizzes ORDER BY created_at DESC')
+        rows = database.query('SELECT id, title, description, created_at FROM quizzes ORDER BY created_at DESC')
         quizzes = [{'id': row[0], 'title': row[1], 'description': row[2], 'created_at': row[3]} 
-                  for row in c.fetchall()]
-        conn.close()
+                  for row in rows]
         return jsonify({'quizzes': quizzes}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1141,20 +1639,17 @@ def get_quizzes_for_users():
 def get_quiz_details(quiz_id):
     """Get quiz details with questions."""
     try:
-        conn = sqlite3.connect(DATABASE)
-        c = conn.cursor()
-        c.execute('SELECT id, title, description FROM quizzes WHERE id = ?', (quiz_id,))
-        quiz_row = c.fetchone()
-        
-        if not quiz_row:
-            return jsonify({'error': 'Quiz not found'}), 404
-        
-        c.execute('''SELECT id, question_text, option_a, option_b, option_c, option_d
-                     FROM quiz_questions WHERE quiz_id = ? ORDER BY id''', (quiz_id,))
+        with database.connection() as c:
+            quiz_row = c.execute('SELECT id, title, description FROM quizzes WHERE id = ?', (quiz_id,)).fetchone()
+            
+            if not quiz_row:
+                return jsonify({'error': 'Quiz not found'}), 404
+            
+            rows = c.execute('''SELECT id, question_text, option_a, option_b, option_c, option_d
+                                FROM quiz_questions WHERE quiz_id = ? ORDER BY id''', (quiz_id,)).fetchall()
         questions = [{'id': row[0], 'text': row[1], 'options': {'a': row[2], 'b': row[3], 'c': row[4], 'd': row[5]}}
-                    for row in c.fetchall()]
+                    for row in rows]
         
-        conn.close()
         return jsonify({
             'id': quiz_row[0],
             'title': quiz_row[1],
@@ -1176,40 +1671,32 @@ def submit_quiz():
         # Validation
         if not quiz_id or not user_email:
             return jsonify({'error': 'Missing quiz_id or user_email'}), 400
+        # Checked here rather than left to the INSERT, which is shared with other students' submissions
+        if not isinstance(user_email, str) or not user_email.strip():
+            return jsonify({'error': 'user_email must be a non-empty string'}), 400
         
         if not responses:
             return jsonify({'error': 'No answers provided'}), 400
+        if not isinstance(responses, dict):
+            return jsonify({'error': 'responses must be an object of question id to answer'}), 400
         
-        conn = sqlite3.connect(DATABASE)
-        c = conn.cursor()
-        
-        # Verify quiz exists
-        c.execute('SELECT id FROM quizzes WHERE id = ?', (quiz_id,))
-        if not c.fetchone():
-            conn.close()
+        # Verify quiz exists; the answer key comes from the cache after the first submission
+        try:
+            quiz_id = int(quiz_id)
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Quiz not found'}), 404
+        answer_key = answer_keys.get(database, quiz_id)
+        if answer_key is None:
             return jsonify({'error': 'Quiz not found'}), 404
         
         # Calculate score
-        score = 0
-        for qid_str, answer in responses.items():
-            try:
-                qid = int(qid_str)
-                c.execute('SELECT correct_answer FROM quiz_questions WHERE id = ? AND quiz_id = ?', (qid, quiz_id))
-                result = c.fetchone()
-                if result and result[0] == answer:
-                    score += 1
-            except (ValueError, TypeError) as e:
-                conn.close()
-                return jsonify({'error': f'Invalid question ID: {qid_str}'}), 400
-        
-        import json
-        c.execute('''INSERT INTO quiz_submissions (quiz_id, user_email, responses, score)
-                     VALUES (?, ?, ?, ?)''',
-                 (quiz_id, user_email, json.dumps(responses), score))
-        
-        conn.commit()
-        submission_id = c.lastrowid
-        conn.close()
+        try:
+            grade = grade_responses(answer_key, responses)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        score = grade.score
+        
+        submission_id = submission_writer.submit(quiz_id, user_email, json.dumps(responses), grade)
         
         return jsonify({'success': True, 'score': score, 'submission_id': submission_id, 'total_questions': len(responses)}), 201
     except Exception as e:
@@ -1219,24 +1706,12 @@ def submit_quiz():
 
 @app.route('/api/admin/quiz-submissions', methods=['GET'])
 def get_quiz_submissions():
-    """Get all quiz submissions - requires admin key."""
+    """Get quiz submissions a page at a time (filters: quiz_id, user_email, since, until) - requires admin key."""
     if not verify_admin_key(request):
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        conn = sqlite3.connect(DATABASE)
-        c = conn.cursor()
-        c.execute('''SELECT qs.id, q.title, qs.user_email, qs.score, qs.submitted_at,
-                     (SELECT COUNT(*) FROM quiz_questions WHERE quiz_id = q.id) as total_questions
-                     FROM quiz_submissions qs
-                     JOIN quizzes q ON qs.quiz_id = q.id
-                     ORDER BY qs.submitted_at DESC''')
-        
-        submissions = [{'id': row[0], 'quiz_title': row[1], 'user_email': row[2], 'score': row[3],
-                       'total': row[5], 'submitted_at': row[4]} for row in c.fetchall()]
-        conn.close()
-        
-        return jsonify({'submissions': submissions}), 200
+        return admin_list_response(admin_lists.SUBMISSIONS, 'submissions')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1247,28 +1722,24 @@ def get_submission_details(submission_id):
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        conn = sqlite3.connect(DATABASE)
-        c = conn.cursor()
-        
-        c.execute('''SELECT qs.quiz_id, qs.user_email, qs.responses, qs.score, q.title
-                     FROM quiz_submissions qs
-                     JOIN quizzes q ON qs.quiz_id = q.id
-                     WHERE qs.id = ?''', (submission_id,))
-        
-        row = c.fetchone()
-        if not row:
-            return jsonify({'error': 'Submission not found'}), 404
-        
-        import json
-        quiz_id, user_email, responses_json, score, quiz_title = row
+        with database.connection() as c:
+            row = c.execute('''SELECT qs.quiz_id, qs.user_email, qs.responses, qs.score, q.title
+                               FROM quiz_submissions qs
+                               JOIN quizzes q ON qs.quiz_id = q.id
+                               WHERE qs.id = ?''', (submission_id,)).fetchone()
+            
+            if not row:
+                return jsonify({'error': 'Submission not found'}), 404
+            
+            quiz_id, user_email, responses_json, score, quiz_title = row
+            
+            # Get all questions with correct answers
+            question_rows = c.execute('''SELECT id, question_text, option_a, option_b, option_c, option_d, correct_answer
+                                         FROM quiz_questions WHERE quiz_id = ? ORDER BY id''', (quiz_id,)).fetchall()
         responses = json.loads(responses_json)
         
-        # Get all questions with correct answers
-        c.execute('''SELECT id, question_text, option_a, option_b, option_c, option_d, correct_answer
-                     FROM quiz_questions WHERE quiz_id = ? ORDER BY id''', (quiz_id,))
-        
         questions = []
-        for q_row in c.fetchall():
+        for q_row in question_rows:
             qid, text, a, b, c_opt, d, correct = q_row
             selected = responses.get(str(qid), None)
             questions.append({
@@ -1280,8 +1751,6 @@ def get_submission_details(submission_id):
                 'is_correct': selected == correct
             })
         
-        conn.close()
-        
         return jsonify({
             'submission_id': submission_id,
             'quiz_title': quiz_title,
@@ -1293,38 +1762,57 @@ def get_submission_details(submission_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-if __name__ == '__main__':
-    app.run(debug=False, host='0.0.0.0', port=5000)
-
 @app.route('/api/admin/stats', methods=['GET'])
 def get_admin_stats():
-    """Get admin statistics and analytics - requires admin key."""
+    """Get admin statistics from the precomputed rollups - requires admin key."""
     if not verify_admin_key(request):
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        conn = sqlite3.connect(DATABASE)
-        c = conn.cursor()
-        
-        c.execute('SELECT COUNT(*) FROM users')
-        total_users = c.fetchone()[0]
-        
-        c.execute('SELECT COUNT(*) FROM feedback')
-        total_feedback = c.fetchone()[0]
-        
-        c.execute('SELECT COUNT(*) FROM feedback WHERE resolved = 1')
-        resolved_feedback = c.fetchone()[0]
-        
-        conn.close()
+        with database.connection() as c:
+            totals = analytics.totals(c)
         
         return jsonify({
-            'total_users': total_users,
-            'total_feedback': total_feedback,
-            'resolved_feedback': resolved_feedback
+            'total_users': totals['users'],
+            'total_feedback': totals['feedback'],
+            'resolved_feedback': totals['resolved_feedback'],
+            'total_submissions': totals['submissions'],
+            'active_users_today': totals['active_users_today']
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/admin/dashboard', methods=['GET'])
+def get_admin_dashboard():
+    """
+    Quiz performance dashboard from the precomputed rollups - requires admin key.
+    Daily activity for the last `days` days (default 30), per-quiz averages,
+    and, with quiz_id, per-question difficulty for that quiz.
+    """
+    if not verify_admin_key(request):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        try:
+            days = int(request.args.get('days', 30))
+            quiz_id = int(request.args['quiz_id']) if request.args.get('quiz_id') else None
+        except ValueError:
+            return jsonify({'error': 'days and quiz_id must be integers'}), 400
+        if not 1 <= days <= 366:
+            return jsonify({'error': 'days must be between 1 and 366'}), 400
+        
+        with database.connection() as c:
+            dashboard = {
+                'totals': analytics.totals(c),
+                'daily': analytics.daily(c, days),
+                'quizzes': analytics.quiz_performance(c)
+            }
+            if quiz_id is not None:
+                dashboard['questions'] = analytics.question_difficulty(c, quiz_id)
+        return jsonify(dashboard), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/admin/users/<int:user_id>', methods=['DELETE'])
 def delete_user(user_id):
     """Delete a user - requires admin key."""
@@ -1332,11 +1820,9 @@ def delete_user(user_id):
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        conn = sqlite3.connect(DATABASE)
-        c = conn.cursor()
-        c.execute('DELETE FROM users WHERE id = ?', (user_id,))
-        conn.commit()
-        conn.close()
+        with database.transaction() as c:
+            deleted = c.execute('DELETE FROM users WHERE id = ?', (user_id,)).rowcount
+            analytics.record_users_deleted(c, deleted)
         return jsonify({'success': True, 'message': 'User deleted'}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1349,14 +1835,17 @@ def update_feedback(feedback_id):
     
     try:
         data = request.json
-        resolved = data.get('resolved', False)
+        resolved = 1 if data.get('resolved', False) else 0
         
-        conn = sqlite3.connect(DATABASE)
-        c = conn.cursor()
-        c.execute('UPDATE feedback SET resolved = ? WHERE id = ?', (resolved, feedback_id))
-        conn.commit()
-        conn.close()
+        with database.transaction() as c:
+            row = c.execute('SELECT resolved FROM feedback WHERE id = ?', (feedback_id,)).fetchone()
+            c.execute('UPDATE feedback SET resolved = ? WHERE id = ?', (resolved, feedback_id))
+            if row is not None:
+                analytics.record_feedback_resolved(c, resolved - (row[0] == 1))
         
         return jsonify({'success': True, 'message': 'Feedback updated'}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+if __name__ == '__main__':
+    app.run(debug=False, host='0.0.0.0', port=5000)
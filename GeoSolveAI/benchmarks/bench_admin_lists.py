@@ -0,0 +1,91 @@
+"""
+Admin submission lists over a large table: whole-table fetchall vs keyset pages and chunked export.
+
+Fills a temporary database with quiz submissions, then compares
+  - the old list (every row fetched into dicts) against one keyset page,
+    both at the head of the list and deep into it (vs LIMIT/OFFSET),
+  - peak Python memory of exporting every row: fetchall-then-serialize vs
+    admin_lists.iter_rows streamed through export_lines.
+Run from the GeoSolveAI directory:
+    python benchmarks/bench_admin_lists.py
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import Database
+import admin_lists
+import migrations
+
+SUBMISSIONS = 300_000
+QUIZZES = 50
+PAGE = 100
+DEEP_PAGE = 2000
+
+OLD_LIST = '''SELECT qs.id, q.title, qs.user_email, qs.score, qs.submitted_at, q.question_count
+              FROM quiz_submissions qs JOIN quizzes q ON qs.quiz_id = q.id
+              ORDER BY qs.submitted_at DESC'''
+
+
+def populate(database, seed=11):
+    rng = random.Random(seed)
+    with database.transaction() as c:
+        c.executemany('INSERT INTO quizzes (title, created_by, question_count) VALUES (?, ?, 20)',
+                      [(f'Quiz {k}', 'admin') for k in range(QUIZZES)])
+        c.executemany('''INSERT INTO quiz_submissions (quiz_id, user_email, responses, score, submitted_at)
+                         VALUES (?, ?, '{"1": "a", "2": "c"}', ?, datetime('2025-01-01', ? || ' seconds'))''',
+                      [(rng.randint(1, QUIZZES), f'student{rng.randrange(5000)}@school.test', rng.randrange(21), k)
+                       for k in range(SUBMISSIONS)])
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        database = Database(os.path.join(directory, 'lists.db'))
+        migrations.migrate(database)
+        populate(database)
+        lst = admin_lists.SUBMISSIONS
+
+        _, whole = timed(lambda: [dict(row) for row in database.query(OLD_LIST)])
+        (rows, cursor), head = timed(lambda: admin_lists.page(database, lst, {}, None, PAGE))
+
+        # Walk to the deep page once for its cursor, then time only the last hop
+        for _ in range(DEEP_PAGE - 1):
+            rows, cursor = admin_lists.page(database, lst, {}, cursor, PAGE)
+        _, keyset_deep = timed(lambda: admin_lists.page(database, lst, {}, cursor, PAGE))
+        _, offset_deep = timed(lambda: database.query(f'{OLD_LIST} LIMIT {PAGE} OFFSET {DEEP_PAGE * PAGE}'))
+
+        whole_peak = peak_memory(lambda: [json.dumps(dict(row)) + '\n' for row in database.query(OLD_LIST)])
+        stream_peak = peak_memory(lambda: sum(1 for _ in admin_lists.export_lines(
+            admin_lists.iter_rows(database, lst, {}), 'ndjson', lst.columns)))
+        database.close()
+
+    print(f'{SUBMISSIONS} submissions, pages of {PAGE}')
+    print(f'whole list            {whole * 1000:8.1f} ms')
+    print(f'first keyset page     {head * 1000:8.2f} ms')
+    print(f'page {DEEP_PAGE}: OFFSET {offset_deep * 1000:8.2f} ms   keyset {keyset_deep * 1000:6.2f} ms')
+    print(f'NDJSON export peak memory: fetchall {whole_peak / 2**20:6.1f} MB   '
+          f'streamed {stream_peak / 2**20:5.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Write load on the app database: a fresh sqlite3.connect per request vs the pooled WAL Database.
+
+Several threads each submit feedback (one INSERT per request) while a reader
+thread lists it, as /api/feedback and /api/admin/feedback do, against a
+temporary database file. "per-request" opens, writes, commits and closes a
+default-configured connection per request, as the routes used to; "pooled"
+goes through db.Database. Reports writes/sec, p50/p99 write latency and
+failed writes. Run from the GeoSolveAI directory:
+    python benchmarks/bench_db.py
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import Database
+
+THREADS = 8
+WRITES_PER_THREAD = 250
+SCHEMA = '''CREATE TABLE feedback
+            (id INTEGER PRIMARY KEY AUTOINCREMENT,
+             user_email TEXT NOT NULL,
+             message TEXT NOT NULL,
+             resolved INTEGER DEFAULT 0,
+             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)'''
+INSERT = 'INSERT INTO feedback (user_email, message) VALUES (?, ?)'
+LIST = 'SELECT id, user_email, message, created_at FROM feedback ORDER BY created_at DESC LIMIT 50'
+
+
+def per_request_write(path, params):
+    conn = sqlite3.connect(path)
+    c = conn.cursor()
+    c.execute(INSERT, params)
+    conn.commit()
+    conn.close()
+
+
+def per_request_read(path):
+    conn = sqlite3.connect(path)
+    conn.execute(LIST).fetchall()
+    conn.close()
+
+
+def run(write, read):
+    latencies = []
+    failures = []
+    done = threading.Event()
+    lock = threading.Lock()
+
+    def writer(worker):
+        local = []
+        for k in range(WRITES_PER_THREAD):
+            start = time.perf_counter()
+            try:
+                write((f'student{worker}@example.com', f'feedback {k}'))
+            except sqlite3.OperationalError:
+                with lock:
+                    failures.append(k)
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    def reader():
+        while not done.is_set():
+            try:
+                read()
+            except sqlite3.OperationalError:
+                pass
+
+    threads = [threading.Thread(target=writer, args=(w,)) for w in range(THREADS)]
+    poller = threading.Thread(target=reader)
+    start = time.perf_counter()
+    poller.start()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    poller.join()
+    latencies.sort()
+    return {
+        'writes_per_sec': len(latencies) / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99)] * 1000,
+        'failed': len(failures)
+    }
+
+
+def fresh_database(directory, name):
+    path = os.path.join(directory, name)
+    conn = sqlite3.connect(path)
+    conn.execute(SCHEMA)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = fresh_database(directory, 'per_request.db')
+        results = {'per-request': run(lambda p: per_request_write(path, p), lambda: per_request_read(path))}
+
+        database = Database(fresh_database(directory, 'pooled.db'))
+        results['pooled'] = run(lambda p: database.execute(INSERT, p), lambda: database.query(LIST))
+        database.close()
+
+    print(f'{THREADS} writer threads x {WRITES_PER_THREAD} feedback inserts, one reader polling the list')
+    for name, r in results.items():
+        print(f'{name:12s} {r["writes_per_sec"]:8.0f} writes/s   p50 {r["p50_ms"]:7.2f} ms   '
+              f'p99 {r["p99_ms"]:7.2f} ms   failed {r["failed"]}')
+
+
+if __name__ == '__main__':
+    main()
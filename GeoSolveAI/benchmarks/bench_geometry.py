@@ -0,0 +1,58 @@
+"""
+Geometry properties for a worksheet of shapes: one call per shape vs one vectorized pass.
+
+Builds a mixed worksheet (triangles, rectangles, hexagons, pentagon-shaped
+polygons, circles, cones) and times geometry_engine.properties() per shape
+against properties_many() over the whole list. Run from the GeoSolveAI directory:
+    python benchmarks/bench_geometry.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from geometry_engine import parse_command, properties, properties_many
+
+SHEET_SIZES = (100, 500)
+REPEATS = 5
+
+
+def worksheet(size, seed=1):
+    rng = random.Random(seed)
+    commands = []
+    for k in range(size):
+        a, b = rng.randint(3, 9), rng.randint(3, 9)
+        commands.append([
+            f'triangle {a} {b} {rng.randint(abs(a - b) + 1, a + b - 1)}',
+            f'rectangle {a} {b}',
+            f'hexagon {a}',
+            f'polygon 0,0 {a},0 {a},{b} {a / 2},{b + 2} 0,{b}',
+            f'circle {a}',
+            f'cone {a} {b}'
+        ][k % 6])
+    return [parse_command(c) for c in commands]
+
+
+def best_of(func):
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    for size in SHEET_SIZES:
+        shapes = worksheet(size)
+        assert [properties(s) for s in shapes] == properties_many(shapes)
+        single = best_of(lambda: [properties(s) for s in shapes])
+        batch = best_of(lambda: properties_many(shapes))
+        print(f'{size:4d} shapes: per-shape {single * 1000:7.1f} ms   one pass {batch * 1000:6.1f} ms   '
+              f'speedup {single / batch:4.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Micro-benchmark: single-pass normalize_expression vs the old regex/`+=` clean_expression.
+
+Run from the GeoSolveAI directory:
+    python benchmarks/bench_normalizer.py
+"""
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from expression_normalizer import normalize_expression
+
+
+def legacy_clean_expression(expr_str):
+    """The previous clean_expression implementation, kept here only for comparison."""
+    expr = expr_str.strip()
+    expr = expr.replace('^', '**')
+    functions = ['sin', 'cos', 'tan', 'log', 'exp', 'sqrt', 'abs', 'asin', 'acos', 'atan', 'sinh', 'cosh', 'tanh']
+    for func in functions:
+        pattern = rf'\b{func}(\d+(?:\.\d+)?)\b'
+        for match in re.finditer(pattern, expr):
+            expr = expr[:match.start()] + f'{func}(radians({match.group(1)}))' + expr[match.end():]
+    for func in functions:
+        expr = re.sub(rf'{func}\s+(?![\(\[])', f'{func}(', expr)
+    expr_processed = ''
+    for i, char in enumerate(expr):
+        expr_processed += char
+        if i < len(expr) - 1:
+            curr = char
+            next_char = expr[i + 1]
+            if ((curr.isdigit() or curr == ')') and (next_char.isalpha() or next_char == '(')) or \
+               (curr.isalpha() and next_char == '(' and not curr.isspace()) or \
+               (curr == ')' and (next_char == '(' or next_char.isdigit())):
+                if expr_processed[-2:] != '* ':
+                    expr_processed += '*'
+    return ' '.join(expr_processed.split())
+
+
+CASES = {
+    'short': 'x^2-5x+6',
+    'medium': '3x^2 + 2(x+1)(x-1) - sin(x) + cos(2x) - sqrt(x)',
+    'long': ' + '.join(f'{k}x^{k} + sin({k}x) * cos(x+{k})' for k in range(1, 200)),
+}
+
+
+def main():
+    for name, expr in CASES.items():
+        number = 2000 if name != 'long' else 50
+        old = timeit.timeit(lambda: legacy_clean_expression(expr), number=number) / number
+        new = timeit.timeit(lambda: normalize_expression(expr), number=number) / number
+        print(f'{name:>6} ({len(expr):5d} chars): legacy {old * 1e6:9.1f} us   '
+              f'single-pass {new * 1e6:9.1f} us   speedup {old / new:5.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Query plans and timings of the quiz/feedback queries before and after the index migrations.
+
+Fills a temporary database with quizzes, questions, feedback and submissions,
+then times each hot query at schema version 1 (tables only, correlated
+COUNT(*) per submission) and at the latest version (secondary indexes,
+denormalized quizzes.question_count). Finally it asserts with EXPLAIN QUERY
+PLAN that every query at the latest version is served by its index, so a
+dropped index or a query that no longer matches it fails loudly. Run from the
+GeoSolveAI directory:
+    python benchmarks/bench_queries.py
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import Database
+import migrations
+
+QUIZZES = 100
+QUESTIONS_PER_QUIZ = 20
+SUBMISSIONS = 50_000
+FEEDBACK = 20_000
+REPEATS = 5
+# Stop repeating a query once it has taken this long in total (the unindexed ones are slow)
+TIME_BUDGET = 1.0
+
+QUIZ_ID = QUIZZES // 2
+SUBMISSION_ID = SUBMISSIONS // 2
+EMAIL = 'student7@school.test'
+
+# name: (query before the migrations, query after, params, index the latter must use)
+QUERIES = {
+    'quiz questions': (
+        '''SELECT id, question_text, option_a, option_b, option_c, option_d
+           FROM quiz_questions WHERE quiz_id = ? ORDER BY id''',
+        None, (QUIZ_ID,), 'idx_quiz_questions_quiz'),
+    'answer key': (
+        '''SELECT qq.id, qq.correct_answer FROM quizzes q
+           LEFT JOIN quiz_questions qq ON qq.quiz_id = q.id WHERE q.id = ? ORDER BY qq.id''',
+        None, (QUIZ_ID,), 'idx_quiz_questions_quiz'),
+    'admin quiz list': (
+        '''SELECT q.id, q.title, q.description, q.created_by, q.created_at, COUNT(qq.id) as q_count
+           FROM quizzes q LEFT JOIN quiz_questions qq ON q.id = qq.quiz_id
+           GROUP BY q.id ORDER BY q.created_at DESC''',
+        '''SELECT id, title, description, created_by, created_at, question_count
+           FROM quizzes ORDER BY created_at DESC''', (), 'idx_quizzes_created'),
+    'latest submissions': (
+        '''SELECT qs.id, q.title, qs.user_email, qs.score, qs.submitted_at,
+           (SELECT COUNT(*) FROM quiz_questions WHERE quiz_id = q.id) as total_questions
+           FROM quiz_submissions qs JOIN quizzes q ON qs.quiz_id = q.id
+           ORDER BY qs.submitted_at DESC LIMIT 100''',
+        '''SELECT qs.id, q.title, qs.user_email, qs.score, qs.submitted_at, q.question_count
+           FROM quiz_submissions qs JOIN quizzes q ON qs.quiz_id = q.id
+           ORDER BY qs.submitted_at DESC LIMIT 100''', (), 'idx_quiz_submissions_submitted'),
+    'submissions of a quiz': (
+        '''SELECT id, user_email, score, submitted_at FROM quiz_submissions
+           WHERE quiz_id = ? ORDER BY submitted_at DESC''',
+        None, (QUIZ_ID,), 'idx_quiz_submissions_quiz'),
+    'submissions of a student': (
+        '''SELECT id, quiz_id, score, submitted_at FROM quiz_submissions
+           WHERE user_email = ? ORDER BY submitted_at DESC''',
+        None, (EMAIL,), 'idx_quiz_submissions_user'),
+    'submission details': (
+        '''SELECT id, question_text, option_a, option_b, option_c, option_d, correct_answer
+           FROM quiz_questions WHERE quiz_id = (SELECT quiz_id FROM quiz_submissions WHERE id = ?) ORDER BY id''',
+        None, (SUBMISSION_ID,), 'idx_quiz_questions_quiz'),
+    'resolved feedback count': (
+        'SELECT COUNT(*) FROM feedback WHERE resolved = 1', None, (), 'idx_feedback_resolved'),
+}
+
+
+def populate(database, seed=5):
+    rng = random.Random(seed)
+    with database.transaction() as c:
+        c.executemany('INSERT INTO quizzes (title, created_by, created_at) VALUES (?, ?, ?)',
+                      [(f'Quiz {k}', 'admin', f'2025-01-01 00:{k // 60:02d}:{k % 60:02d}') for k in range(QUIZZES)])
+        c.executemany('''INSERT INTO quiz_questions
+                         (quiz_id, question_text, option_a, option_b, option_c, option_d, correct_answer)
+                         VALUES (?, ?, '1', '2', '3', '4', ?)''',
+                      [(q, f'Q{k}', 'abcd'[k % 4]) for q in range(1, QUIZZES + 1) for k in range(QUESTIONS_PER_QUIZ)])
+        c.executemany('''INSERT INTO quiz_submissions (quiz_id, user_email, responses, score, submitted_at)
+                         VALUES (?, ?, '{}', ?, datetime('2025-01-01', ? || ' seconds'))''',
+                      [(rng.randint(1, QUIZZES), f'student{rng.randrange(5000)}@school.test',
+                        rng.randrange(QUESTIONS_PER_QUIZ + 1), k) for k in range(SUBMISSIONS)])
+        c.executemany('INSERT INTO feedback (user_email, message, resolved) VALUES (?, ?, ?)',
+                      [(f'student{k}@school.test', 'message', k % 3 == 0) for k in range(FEEDBACK)])
+
+
+def best_of(conn, sql, params):
+    times = []
+    while len(times) < REPEATS and sum(times) < TIME_BUDGET:
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        database = Database(os.path.join(directory, 'queries.db'))
+        migrations.migrate(database, target=1)
+        populate(database)
+        with database.connection() as conn:
+            before = {name: best_of(conn, old, params) for name, (old, _, params, _) in QUERIES.items()}
+
+        migrations.migrate(database)
+        with database.connection() as conn:
+            conn.execute('ANALYZE')
+            after = {name: best_of(conn, new or old, params) for name, (old, new, params, _) in QUERIES.items()}
+            failures = [(name, migrations.explain(conn, new or old, params))
+                        for name, (old, new, params, index) in QUERIES.items()
+                        if not migrations.uses_index(conn, new or old, params, index)]
+        database.close()
+
+    print(f'{SUBMISSIONS} submissions, {QUIZZES} quizzes x {QUESTIONS_PER_QUIZ} questions, {FEEDBACK} feedback rows')
+    for name in QUERIES:
+        print(f'{name:26s} before {before[name] * 1000:8.2f} ms   after {after[name] * 1000:7.2f} ms   '
+              f'speedup {before[name] / after[name]:7.1f}x')
+    for name, plan in failures:
+        print(f'NOT INDEXED: {name}: {plan}')
+    assert not failures, 'query plans regressed'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+A class submitting a quiz at the bell: per-answer SELECTs vs the cached answer key and group commit.
+
+Creates a 50-question quiz in a temporary database and has 300 students submit
+it from a pool of request threads. "per-answer" grades with one SELECT per
+response and commits each submission on its own, as /api/quiz-submit used to;
+"answer key" grades against quiz_scoring's cached key and writes through the
+SubmissionWriter. Run from the GeoSolveAI directory:
+    python benchmarks/bench_quiz.py
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import Database
+from quiz_scoring import AnswerKeyCache, SubmissionWriter, score
+
+QUESTIONS = 50
+STUDENTS = 300
+THREADS = 16
+
+
+def setup(path):
+    database = Database(path)
+    with database.transaction() as c:
+        c.execute('CREATE TABLE quizzes (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL)')
+        c.execute('''CREATE TABLE quiz_questions
+                     (id INTEGER PRIMARY KEY AUTOINCREMENT, quiz_id INTEGER NOT NULL,
+                      question_text TEXT NOT NULL, correct_answer TEXT NOT NULL)''')
+        c.execute('''CREATE TABLE quiz_submissions
+                     (id INTEGER PRIMARY KEY AUTOINCREMENT, quiz_id INTEGER NOT NULL, user_email TEXT NOT NULL,
+                      responses TEXT NOT NULL, score INTEGER,
+                      submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+        quiz_id = c.execute("INSERT INTO quizzes (title) VALUES ('Bell quiz')").lastrowid
+        c.executemany('INSERT INTO quiz_questions (quiz_id, question_text, correct_answer) VALUES (?, ?, ?)',
+                      [(quiz_id, f'Q{k}', 'abcd'[k % 4]) for k in range(QUESTIONS)])
+        ids = [row[0] for row in c.execute('SELECT id FROM quiz_questions ORDER BY id')]
+    return database, quiz_id, ids
+
+
+def submissions(ids, seed=3):
+    rng = random.Random(seed)
+    return [(f'student{s}@school.test', {str(qid): rng.choice('abcd') for qid in ids}) for s in range(STUDENTS)]
+
+
+def per_answer(database, quiz_id):
+    def submit(email, responses):
+        with database.connection() as c:
+            c.execute('SELECT id FROM quizzes WHERE id = ?', (quiz_id,)).fetchone()
+            points = 0
+            for qid_str, answer in responses.items():
+                result = c.execute('SELECT correct_answer FROM quiz_questions WHERE id = ? AND quiz_id = ?',
+                                   (int(qid_str), quiz_id)).fetchone()
+                if result and result[0] == answer:
+                    points += 1
+        database.execute('INSERT INTO quiz_submissions (quiz_id, user_email, responses, score) VALUES (?, ?, ?, ?)',
+                         (quiz_id, email, json.dumps(responses), points))
+        return points
+    return submit
+
+
+def answer_key(database, quiz_id):
+    keys = AnswerKeyCache()
+    writer = SubmissionWriter(database)
+
+    def submit(email, responses):
+        points = score(keys.get(database, quiz_id), responses)
+        writer.submit(quiz_id, email, json.dumps(responses), points)
+        return points
+    submit.writer = writer
+    return submit
+
+
+def run(submit, load):
+    latencies = []
+
+    def one(item):
+        start = time.perf_counter()
+        points = submit(*item)
+        latencies.append(time.perf_counter() - start)
+        return points
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(THREADS) as pool:
+        scores = list(pool.map(one, load))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return scores, elapsed, latencies[int(len(latencies) * 0.99)]
+
+
+def main():
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, make in (('per-answer', per_answer), ('answer key', answer_key)):
+            database, quiz_id, ids = setup(os.path.join(directory, name.replace(' ', '_') + '.db'))
+            submit = make(database, quiz_id)
+            results[name] = run(submit, submissions(ids))
+            if hasattr(submit, 'writer'):
+                print(f'group commit: {submit.writer.stats()}')
+            database.close()
+
+    assert results['per-answer'][0] == results['answer key'][0]
+    print(f'{STUDENTS} students x {QUESTIONS} questions from {THREADS} threads')
+    for name, (_, elapsed, p99) in results.items():
+        print(f'{name:11s} {STUDENTS / elapsed:7.0f} submissions/s   total {elapsed * 1000:7.1f} ms   '
+              f'p99 {p99 * 1000:6.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Throughput benchmark: pyplot per-request figures vs the pooled Figure/FigureCanvasAgg renderer.
+
+Renders the /api/plot figure for sin(x) over 0..360 degrees, single-threaded and
+from several threads (pyplot is serialized with a lock there, as it is not
+thread-safe). Run from the GeoSolveAI directory:
+    python benchmarks/bench_rendering.py
+"""
+import io
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+from rendering import figure_pool, render_png
+
+X = np.linspace(0, 360, 500)
+Y = np.sin(np.radians(X))
+RENDERS = 60
+THREADS = 4
+
+_pyplot_lock = threading.Lock()
+
+
+def draw(ax):
+    ax.plot(X, Y, 'b-', linewidth=2.5, label='f(x)')
+    ax.grid(True, alpha=0.4, linestyle='--', linewidth=0.7)
+    ax.axhline(y=0, color='k', linewidth=0.8, alpha=0.5)
+    ax.axvline(x=0, color='k', linewidth=0.8, alpha=0.5)
+    ax.set_xlabel('x (Degrees)', fontsize=12, fontweight='bold')
+    ax.set_ylabel('y (Value)', fontsize=12, fontweight='bold')
+    ax.set_title('Graph of sin(x) (Degrees Mode)', fontsize=14, fontweight='bold', pad=15)
+    ax.legend()
+
+
+def render_pyplot():
+    """The previous plot() rendering path."""
+    with _pyplot_lock:
+        fig, ax = plt.subplots(figsize=(10, 6))
+        draw(ax)
+        plt.tight_layout()
+        buf = io.BytesIO()
+        plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
+        plt.close()
+        return buf.getvalue()
+
+
+def render_pooled():
+    with figure_pool.axes((10, 6), 100) as (fig, ax):
+        draw(ax)
+        return render_png(fig, 100)
+
+
+def throughput(render, threads):
+    render()  # warm up (font cache, pooled figure)
+    start = time.perf_counter()
+    if threads == 1:
+        for _ in range(RENDERS):
+            render()
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(lambda _: render(), range(RENDERS)))
+    return RENDERS / (time.perf_counter() - start)
+
+
+def main():
+    for threads in (1, THREADS):
+        old = throughput(render_pyplot, threads)
+        new = throughput(render_pooled, threads)
+        print(f'{threads} thread(s): pyplot {old:6.1f} renders/s   pooled {new:6.1f} renders/s   '
+              f'speedup {new / old:4.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Accuracy vs. evaluation count: adaptive sampling vs the old fixed 500-point linspace.
+
+For each function the sampled polyline is compared with a dense reference
+(200k points); the error is the largest vertical deviation in pixels of a
+600 px tall plot clipped to the curve's typical range. "false lines" counts
+segments drawn straight across a pole. The last column is how many uniform
+points are needed to match the adaptive error. Run from the GeoSolveAI directory:
+    python benchmarks/bench_sampling.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from adaptive_sampling import _robust_range, sample
+
+PLOT_HEIGHT_PX = 600
+REFERENCE_POINTS = 200_000
+
+FUNCTIONS = {
+    'sin(x)': (np.sin, 0, 2 * np.pi),
+    'x**2 - 3': (lambda x: x ** 2 - 3, -5, 5),
+    'exp(x)': (np.exp, 0, 10),
+    'sqrt(x)': (np.sqrt, -2, 4),
+    'sin(50x)': (lambda x: np.sin(50 * x), 0, 2 * np.pi),
+    'tan(x)': (np.tan, 0, 2 * np.pi),
+    '1/x': (lambda x: 1 / x, -5, 4),
+}
+
+
+def counting(f):
+    calls = {'n': 0}
+
+    def wrapped(x):
+        calls['n'] += np.size(x)
+        return f(x)
+    return wrapped, calls
+
+
+def pixel_error(xs, ys, f, start, stop):
+    """Max vertical deviation (px) from the reference over the visible, continuous parts."""
+    with np.errstate(all='ignore'):
+        ref_x = np.linspace(start, stop, REFERENCE_POINTS)
+        ref_y = f(ref_x)
+        low, high = _robust_range(f(np.linspace(start, stop, 65)))
+        span = (high - low) or 1.0
+        low, high = low - 0.25 * span, high + 0.25 * span
+        interp = np.interp(ref_x, xs, ys)
+        # Compare only where the reference is visible and the polyline is not broken
+        segment = np.clip(np.searchsorted(xs, ref_x) - 1, 0, len(xs) - 2)
+        ok = np.isfinite(ref_y) & np.isfinite(ys[segment]) & np.isfinite(ys[segment + 1])
+        ok &= (ref_y > low) & (ref_y < high)
+        diff = np.abs(np.clip(interp, low, high) - np.clip(ref_y, low, high))
+    return float(diff[ok].max()) / (high - low) * PLOT_HEIGHT_PX if ok.any() else 0.0
+
+
+def false_lines(xs, ys):
+    """Segments that jump across a pole (sign flip with a huge change) instead of breaking."""
+    with np.errstate(invalid='ignore'):
+        finite = np.isfinite(ys)
+        low, high = _robust_range(ys[finite]) if finite.sum() > 1 else (0, 1)
+        jump = np.abs(np.diff(ys)) > 10 * ((high - low) or 1.0)
+        flip = np.sign(ys[:-1]) * np.sign(ys[1:]) < 0
+    return int(np.sum(jump & flip))
+
+
+def uniform_points_to_match(f, start, stop, target):
+    n = 64
+    while n < 1_000_000:
+        xs = np.linspace(start, stop, n)
+        with np.errstate(all='ignore'):
+            ys = f(xs)
+        if pixel_error(xs, ys, f, start, stop) <= target:
+            return n
+        n *= 2
+    return None
+
+
+def main():
+    print(f"{'function':>10} | {'uniform-500 err px':>18} {'false lines':>11} | "
+          f"{'adaptive evals':>14} {'err px':>7} {'breaks':>6} | {'uniform pts for same err':>24}")
+    for name, (f, start, stop) in FUNCTIONS.items():
+        xs = np.linspace(start, stop, 500)
+        with np.errstate(all='ignore'):
+            ys = f(xs)
+        fixed_err = pixel_error(xs, ys, f, start, stop)
+
+        wrapped, calls = counting(f)
+        curve = sample(wrapped, start, stop)
+        adaptive_err = pixel_error(curve.x, curve.y, f, start, stop)
+        match = uniform_points_to_match(f, start, stop, max(adaptive_err, 0.5))
+        print(f'{name:>10} | {fixed_err:18.2f} {false_lines(xs, ys):11d} | '
+              f'{calls["n"]:14d} {adaptive_err:7.2f} {curve.breaks:6d} | {match if match else ">1e6":>24}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Admin stats and dashboard: scanning the base tables vs reading the analytics rollups.
+
+Fills a temporary database (via the migrations, so the rollups are backfilled
+exactly as on a live upgrade), then times
+  - the old /api/admin/stats (three COUNT(*) scans) vs analytics.totals(),
+  - the dashboard computed live with GROUP BY over submissions vs the rollup reads,
+and checks that both give the same numbers. Run from the GeoSolveAI directory:
+    python benchmarks/bench_stats.py
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import Database
+import analytics
+import migrations
+
+USERS = 50_000
+FEEDBACK = 50_000
+QUIZZES = 40
+QUESTIONS_PER_QUIZ = 20
+SUBMISSIONS = 200_000
+REPEATS = 5
+
+LIVE_QUIZ_AVERAGES = '''SELECT quiz_id, COUNT(*), SUM(score) FROM quiz_submissions GROUP BY quiz_id'''
+LIVE_DAILY = '''SELECT date(submitted_at) AS day, COUNT(*), COUNT(DISTINCT user_email)
+                FROM quiz_submissions WHERE submitted_at > date('now', '-30 days') GROUP BY day'''
+
+
+def populate(database, seed=13):
+    rng = random.Random(seed)
+    with database.transaction() as c:
+        c.executemany("INSERT INTO users (name, email, password, created_at) VALUES (?, ?, 'x', datetime('now', ?))",
+                      [(f'Student {k}', f'student{k}@school.test', f'-{rng.randrange(90 * 86400)} seconds')
+                       for k in range(USERS)])
+        c.executemany("INSERT INTO feedback (user_email, message, resolved, created_at) VALUES (?, 'm', ?, datetime('now', ?))",
+                      [(f'student{k}@school.test', rng.random() < 0.4, f'-{rng.randrange(90 * 86400)} seconds')
+                       for k in range(FEEDBACK)])
+        c.executemany("INSERT INTO quizzes (title, created_by) VALUES (?, 'admin')",
+                      [(f'Quiz {k}',) for k in range(QUIZZES)])
+        c.executemany('''INSERT INTO quiz_questions
+                         (quiz_id, question_text, option_a, option_b, option_c, option_d, correct_answer)
+                         VALUES (?, 'Q', '1', '2', '3', '4', ?)''',
+                      [(q, 'abcd'[k % 4]) for q in range(1, QUIZZES + 1) for k in range(QUESTIONS_PER_QUIZ)])
+        submissions = []
+        for _ in range(SUBMISSIONS):
+            quiz_id = rng.randint(1, QUIZZES)
+            first = (quiz_id - 1) * QUESTIONS_PER_QUIZ + 1
+            responses = {str(first + k): rng.choice('abcd') for k in range(QUESTIONS_PER_QUIZ)}
+            score = sum(answer == 'abcd'[(int(qid) - first) % 4] for qid, answer in responses.items())
+            submissions.append((quiz_id, f'student{rng.randrange(USERS)}@school.test', json.dumps(responses), score,
+                                f'-{rng.randrange(90 * 86400)} seconds'))
+        c.executemany('''INSERT INTO quiz_submissions (quiz_id, user_email, responses, score, submitted_at)
+                         VALUES (?, ?, ?, ?, datetime('now', ?))''', submissions)
+
+
+def best_of(func):
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def old_stats(conn):
+    return (conn.execute('SELECT COUNT(*) FROM users').fetchone()[0],
+            conn.execute('SELECT COUNT(*) FROM feedback').fetchone()[0],
+            conn.execute('SELECT COUNT(*) FROM feedback WHERE resolved = 1').fetchone()[0])
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        database = Database(os.path.join(directory, 'stats.db'))
+        migrations.migrate(database, target=3)
+        populate(database)
+        start = time.perf_counter()
+        migrations.migrate(database)
+        backfill = time.perf_counter() - start
+
+        with database.connection() as conn:
+            scanned, scan_time = best_of(lambda: old_stats(conn))
+            totals, rollup_time = best_of(lambda: analytics.totals(conn))
+            assert scanned == (totals['users'], totals['feedback'], totals['resolved_feedback'])
+
+            live, live_time = best_of(lambda: (conn.execute(LIVE_QUIZ_AVERAGES).fetchall(),
+                                               conn.execute(LIVE_DAILY).fetchall()))
+            rolled, dashboard_time = best_of(lambda: (analytics.quiz_performance(conn), analytics.daily(conn, 30)))
+            assert sorted((q, n) for q, n, _ in live[0]) == sorted((q['quiz_id'], q['submissions']) for q in rolled[0])
+        database.close()
+
+    print(f'{USERS} users, {FEEDBACK} feedback, {SUBMISSIONS} submissions; rollup backfill {backfill:.1f} s')
+    print(f'stats      COUNT(*) scans {scan_time * 1000:8.2f} ms   rollups {rollup_time * 1000:6.3f} ms')
+    print(f'dashboard  live GROUP BY  {live_time * 1000:8.2f} ms   rollups {dashboard_time * 1000:6.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
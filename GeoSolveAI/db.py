@@ -0,0 +1,147 @@
+"""
+Pooled SQLite access for the application database (users, feedback, quizzes).
+
+Opening a connection per request pays for the open, the PRAGMAs and SQL
+compilation every time, and with the default rollback journal a writer locks
+out every reader, which is where "database is locked" came from under load.
+Connections here are opened once, tuned (WAL journal, synchronous=NORMAL, a
+larger page cache, memory-mapped reads, a busy timeout) and handed back to a
+pool after each request, so each connection's prepared-statement cache
+survives across requests too. Writes go through transaction(), which takes
+the write lock up front (BEGIN IMMEDIATE) and commits or rolls back on exit.
+"""
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class DatabaseBusy(sqlite3.OperationalError):
+    """The write lock could not be taken within the busy timeout."""
+
+
+class Database:
+    """
+    A pool of tuned connections to one SQLite file. Connections are checked
+    out per use rather than pinned to threads, since the development server
+    starts a new thread per request; up to pool_size idle connections are kept,
+    and any extra opened under a burst are closed when returned.
+    """
+
+    def __init__(self, path, pool_size=8, busy_timeout_ms=5000, cache_size_kib=16 * 1024,
+                 mmap_size=64 * 1024 * 1024, statement_cache=256):
+        self.path = path
+        self.pool_size = pool_size
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cache_size_kib = cache_size_kib
+        self.mmap_size = mmap_size
+        self.statement_cache = statement_cache
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.reused = 0
+        self.discarded = 0
+        self.transactions = 0
+        self.rollbacks = 0
+        self.busy = 0
+
+    def _connect(self):
+        # isolation_level=None: the sqlite3 module never opens transactions implicitly,
+        # transaction() issues BEGIN IMMEDIATE itself
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None,
+                               check_same_thread=False, cached_statements=self.statement_cache)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode = WAL')
+        # In WAL mode NORMAL only syncs at checkpoints; a power loss can drop the last
+        # commits but never corrupts the database
+        conn.execute('PRAGMA synchronous = NORMAL')
+        conn.execute(f'PRAGMA cache_size = {-int(self.cache_size_kib)}')
+        conn.execute(f'PRAGMA mmap_size = {int(self.mmap_size)}')
+        conn.execute(f'PRAGMA busy_timeout = {int(self.busy_timeout_ms)}')
+        conn.execute('PRAGMA temp_store = MEMORY')
+        with self._lock:
+            self.opened += 1
+        return conn
+
+    def _release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            keep = self._idle.qsize() < self.pool_size
+        except sqlite3.Error:
+            # A connection that cannot even roll back is not worth keeping
+            keep = False
+        if keep:
+            self._idle.put(conn)
+        else:
+            conn.close()
+            with self._lock:
+                self.discarded += 1
+
+    @contextmanager
+    def connection(self):
+        """Check out a pooled connection for the duration of the with block."""
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock:
+                self.reused += 1
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """Run the with block as one write transaction: committed on success, rolled back on error."""
+        with self.connection() as conn:
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+            except sqlite3.OperationalError as e:
+                if 'locked' in str(e) or 'busy' in str(e):
+                    with self._lock:
+                        self.busy += 1
+                    raise DatabaseBusy(str(e)) from e
+                raise
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                with self._lock:
+                    self.rollbacks += 1
+                raise
+            conn.commit()
+            with self._lock:
+                self.transactions += 1
+
+    def query(self, sql, params=()):
+        """All rows of a read query, as sqlite3.Row objects."""
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def query_one(self, sql, params=()):
+        """First row of a read query, or None."""
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchone()
+
+    def execute(self, sql, params=()):
+        """Run one write statement in its own transaction. Returns the cursor (lastrowid, rowcount)."""
+        with self.transaction() as conn:
+            return conn.execute(sql, params)
+
+    def close(self):
+        """Close every idle connection."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def stats(self):
+        with self._lock:
+            return {
+                'opened': self.opened, 'reused': self.reused, 'discarded': self.discarded,
+                'idle': self._idle.qsize(), 'pool_size': self.pool_size,
+                'transactions': self.transactions, 'rollbacks': self.rollbacks, 'busy': self.busy
+            }
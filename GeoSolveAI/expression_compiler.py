@@ -0,0 +1,165 @@
+"""
+Compile plot expressions into vectorized callables, once per expression.
+
+Normalized input is parsed with Python's ast module and checked against the
+same whitelist as the numeric evaluator (numbers, arithmetic, the usual math
+functions, pi, e and the declared variables) - attribute access, subscripts,
+comprehensions and arbitrary names are rejected before anything runs. The
+checked tree becomes a lambda over NumPy ufuncs, or a numexpr program when
+numexpr is installed and every function is one it supports. Compiled
+callables are kept in a bounded LRU keyed by (expression, variables, angle
+mode), so PNG, data and tile requests for the same curve share one compile.
+"""
+import ast
+import copy
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from numeric_eval import UnsupportedExpression, validate
+
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+
+def _deg_in(func):
+    return lambda v: func(np.radians(v))
+
+
+_COMMON = {
+    'sqrt': np.sqrt, 'log': np.log, 'exp': np.exp, 'abs': np.abs,
+    'sinh': np.sinh, 'cosh': np.cosh, 'tanh': np.tanh,
+    'asin': np.arcsin, 'acos': np.arccos, 'atan': np.arctan,
+    'pi': np.pi, 'e': np.e
+}
+
+# Trig inputs follow the plot's angle mode; inverse functions always return radians
+NAMESPACES = {
+    'radians': {**_COMMON, 'sin': np.sin, 'cos': np.cos, 'tan': np.tan},
+    'degrees': {**_COMMON, 'sin': _deg_in(np.sin), 'cos': _deg_in(np.cos), 'tan': _deg_in(np.tan)}
+}
+
+# numexpr spellings of the whitelisted functions (everything it supports natively)
+_NUMEXPR_FUNCTIONS = {
+    'sin': 'sin', 'cos': 'cos', 'tan': 'tan', 'sqrt': 'sqrt', 'log': 'log', 'exp': 'exp',
+    'abs': 'abs', 'sinh': 'sinh', 'cosh': 'cosh', 'tanh': 'tanh',
+    'asin': 'arcsin', 'acos': 'arccos', 'atan': 'arctan'
+}
+
+
+class _FloatLiterals(ast.NodeTransformer):
+    """Make every numeric literal a float."""
+
+    def visit_Constant(self, node):
+        # Integer literals would mean exact big-int arithmetic in Python ("9**9**9" never finishes)
+        # and integer arithmetic in numexpr (1/2 == 0, overflowing powers)
+        try:
+            return ast.Constant(float(node.value))
+        except OverflowError:
+            raise UnsupportedExpression('Number too large') from None
+
+
+class _NumexprRewriter(_FloatLiterals):
+    """Rename functions to numexpr's spelling and inline pi/e."""
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        node.func = ast.Name(id=_NUMEXPR_FUNCTIONS[node.func.id], ctx=ast.Load())
+        return node
+
+    def visit_Name(self, node):
+        if node.id in ('pi', 'e'):
+            return ast.Constant(float(NAMESPACES['radians'][node.id]))
+        return node
+
+
+class CompiledExpression:
+    """A validated expression compiled to a vectorized callable over its variables."""
+
+    __slots__ = ('source', 'variables', 'used_variables', 'backend', '_func')
+
+    def __init__(self, source, variables, used_variables, backend, func):
+        self.source = source
+        self.variables = variables
+        self.used_variables = used_variables
+        self.backend = backend
+        self._func = func
+
+    def __call__(self, *arrays):
+        with np.errstate(all='ignore'):
+            return self._func(*arrays)
+
+    @property
+    def is_constant(self):
+        return not self.used_variables
+
+
+def _numpy_callable(tree, variables, angle_mode):
+    args = ast.arguments(posonlyargs=[], args=[ast.arg(arg=name) for name in variables], kwonlyargs=[],
+                         kw_defaults=[], defaults=[])
+    body = _FloatLiterals().visit(copy.deepcopy(tree)).body
+    lam = ast.Expression(body=ast.Lambda(args=args, body=body))
+    code = compile(ast.fix_missing_locations(lam), '<plot-expression>', 'eval')
+    return eval(code, {'__builtins__': {}, **NAMESPACES[angle_mode]})
+
+
+def _numexpr_callable(tree, variables):
+    source = ast.unparse(_NumexprRewriter().visit(copy.deepcopy(tree)))
+    program = numexpr.NumExpr(source, signature=[(name, np.float64) for name in variables])
+    return lambda *arrays: program(*(np.asarray(a, dtype=np.float64) for a in arrays))
+
+
+def compile_expression(expr_str, variables=('x',), angle_mode='radians'):
+    """Validate and compile expr_str. Raises UnsupportedExpression for anything off the whitelist."""
+    variables = tuple(variables)
+    tree, used, _ = validate(expr_str, variables)
+    # numexpr only pays off over arrays and only handles radian trig natively
+    if numexpr is not None and angle_mode == 'radians' and used:
+        try:
+            return CompiledExpression(expr_str, variables, used, 'numexpr', _numexpr_callable(tree, variables))
+        except (KeyError, SyntaxError, ValueError, TypeError):
+            pass
+    return CompiledExpression(expr_str, variables, used, 'numpy', _numpy_callable(tree, variables, angle_mode))
+
+
+class ExpressionCompiler:
+    """Bounded LRU of compiled plot expressions."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def compile(self, expr_str, variables=('x',), angle_mode='radians'):
+        """Return the compiled callable for an expression, compiling it on first use."""
+        key = (expr_str, tuple(variables), angle_mode)
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+
+        compiled = compile_expression(expr_str, variables, angle_mode)
+        with self._lock:
+            self._entries[key] = compiled
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return compiled
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'backend': 'numexpr' if numexpr is not None else 'numpy'
+            }
+
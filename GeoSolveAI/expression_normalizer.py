@@ -0,0 +1,182 @@
+"""
+Single-pass tokenizer/normalizer for user-typed math expressions.
+
+One compiled regex splits the input into tokens, and one linear walk over the
+tokens does everything clean_expression and plot() used to do with repeated
+regex passes and character-by-character string rebuilding:
+
+- "^" is rewritten to "**"
+- degree angles such as "sin45" become "sin(pi*45/180)"
+- functions written without parentheses ("sin x", "cos 30", "sqrt16") get them
+- implicit multiplication is made explicit ("3x" -> "3*x", "2(x+1)" -> "2*(x+1)")
+- runs of whitespace collapse to a single space
+"""
+import re
+
+FUNCTIONS = frozenset(['sin', 'cos', 'tan', 'log', 'exp', 'sqrt', 'abs', 'asin', 'acos', 'atan', 'sinh', 'cosh', 'tanh'])
+
+# Functions whose bare numeric argument ("sin45") is read as an angle in degrees
+DEGREE_FUNCTIONS = frozenset(['sin', 'cos', 'tan'])
+
+_TOKEN_RE = re.compile(r'''
+    (?P<ws>\s+)
+  | (?P<number>\d+(?:\.\d+)?|\.\d+)
+  | (?P<name>[A-Za-z_]+)
+  | (?P<pow>\*\*|\^)
+  | (?P<open>[(\[])
+  | (?P<close>[)\]])
+  | (?P<op>.)
+''', re.VERBOSE)
+
+# Kinds of token that can end a value (and so may need an implicit "*" after them)
+_VALUE_END = ('number', 'symbol', 'close')
+
+
+def tokenize(expr_str):
+    """Split an expression into (kind, text) tokens."""
+    tokens = []
+    for m in _TOKEN_RE.finditer(expr_str):
+        kind = m.lastgroup
+        text = m.group()
+        if kind == 'name' and text not in FUNCTIONS:
+            kind = 'symbol'
+        elif kind == 'name':
+            kind = 'func'
+        tokens.append((kind, text))
+    return tokens
+
+
+def _needs_star(prev, kind):
+    """Implicit multiplication rules for two adjacent tokens."""
+    if prev in ('number', 'close'):
+        return kind in ('symbol', 'func', 'open') or (prev == 'close' and kind == 'number')
+    if prev == 'symbol':
+        return kind == 'open'
+    return False
+
+
+def _continues_term(tokens, j):
+    """True if the token at j extends the current argument term (exponent or juxtaposition)."""
+    if j >= len(tokens):
+        return False
+    kind = tokens[j][0]
+    if kind == 'ws':
+        return j + 1 < len(tokens) and tokens[j + 1][0] == 'pow'
+    return kind in ('pow', 'number', 'symbol', 'func', 'open')
+
+
+def normalize_expression(expr_str, degree_angles=True, space_multiplies=False):
+    """
+    Normalize an expression for SymPy parsing or NumPy evaluation in one linear pass.
+    With degree_angles=False, "sin45" becomes "sin(45)" and the caller handles units.
+    With space_multiplies=True, "x**2 sin(x)" becomes "x**2*sin(x)" (needed for plain eval).
+    """
+    tokens = tokenize(expr_str.strip())
+    out = []
+    prev = None
+    depth = 0
+    auto_close = []  # paren depths opened by an inserted "(" that still need closing
+    i = 0
+    n = len(tokens)
+
+    while i < n:
+        kind, text = tokens[i]
+
+        if kind == 'ws':
+            nxt = tokens[i + 1][0] if i + 1 < n else None
+            if space_multiplies and prev in _VALUE_END and nxt in ('number', 'symbol', 'func', 'open'):
+                out.append('*')
+            else:
+                out.append(' ')
+            i += 1
+            continue
+
+        adjacent = i > 0 and tokens[i - 1][0] != 'ws'
+        if adjacent and _needs_star(prev, kind):
+            out.append('*')
+
+        if kind == 'func':
+            nxt = tokens[i + 1] if i + 1 < n else None
+            if nxt and nxt[0] == 'number':
+                # Bare numeric argument glued to the name: sin45, sqrt16
+                if degree_angles and text in DEGREE_FUNCTIONS:
+                    out.append(f'{text}(pi*{nxt[1]}/180)')
+                else:
+                    out.append(f'{text}({nxt[1]})')
+                prev = 'close'
+                i += 2
+            else:
+                j = i + 1
+                while j < n and tokens[j][0] == 'ws':
+                    j += 1
+                out.append(text)
+                if j >= n:
+                    prev = 'symbol'
+                    i = j
+                    continue
+                if tokens[j][0] == 'open':
+                    prev = 'func'
+                    i = j
+                    continue
+                # sin x, cos 30: open a paren that closes after the argument term
+                out.append('(')
+                depth += 1
+                auto_close.append(depth)
+                prev = 'func'
+                i = j
+                if tokens[j][0] == 'op' and tokens[j][1] in ('+', '-'):
+                    out.append(tokens[j][1])
+                    i += 1
+                continue
+        elif kind == 'pow':
+            out.append('**')
+            prev = 'op'
+            i += 1
+            continue
+        elif kind == 'open':
+            out.append(text)
+            depth += 1
+            prev = 'open'
+            i += 1
+            continue
+        elif kind == 'close':
+            out.append(text)
+            depth -= 1
+            prev = 'close'
+            i += 1
+        elif kind == 'op':
+            out.append(text)
+            prev = 'op'
+            i += 1
+            continue
+        else:
+            out.append(text)
+            prev = kind
+            i += 1
+
+        # A value just ended; close any auto-inserted parens whose argument is complete
+        while auto_close and auto_close[-1] == depth and not _continues_term(tokens, i):
+            out.append(')')
+            auto_close.pop()
+            depth -= 1
+            prev = 'close'
+
+    out.extend(')' * len(auto_close))
+    return ''.join(out)
+
+
+def split_top_level(text, separators=',;\n'):
+    """Split a system like "2x+3y=5, x-y=1" on separators outside any parentheses."""
+    parts = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(text):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif depth == 0 and char in separators:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [part.strip() for part in parts if part.strip()]
@@ -0,0 +1,133 @@
+"""
+Shared SymPy parser for normalized expressions.
+
+The transformation tuple is built once at import, and a bounded LRU memo maps
+normalized input strings to parsed SymPy expressions (which are immutable, so
+sharing them between requests is safe). Every parse reports how long it took.
+
+Parsing runs on the request thread, so it never evaluates anything that could
+be expensive: input is parsed with evaluate=False, and the tree is evaluated
+inline only when that is known to be cheap (no constant power beyond the exact
+arithmetic caps, no factorial-like functions of constants). Anything else is
+returned unevaluated, and evaluate() runs inside a worker-pool task, under
+its timeout. A parse that still took long is not memoized.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+
+import sympy as sp
+from sympy.core.parameters import evaluate as evaluation
+from sympy.parsing.sympy_parser import parse_expr, standard_transformations, implicit_multiplication_application
+
+from numeric_eval import MAX_EXACT_BITS, MAX_EXACT_EXPONENT
+
+TRANSFORMATIONS = standard_transformations + (implicit_multiplication_application,)
+
+# Parses slower than this are not memoized, so the memo cannot pin pathological results
+SLOW_PARSE_SECONDS = 0.1
+
+# Functions whose evaluation at a constant stays symbolic or is a bounded numeric step
+# (sin(1) stays sin(1)); factorial, gamma and friends are absent on purpose
+_CHEAP_FUNCTIONS = (
+    sp.sin, sp.cos, sp.tan, sp.cot, sp.sec, sp.csc, sp.asin, sp.acos, sp.atan,
+    sp.sinh, sp.cosh, sp.tanh, sp.exp, sp.log, sp.Abs, sp.sign
+)
+
+
+def evaluate(expr):
+    """Rebuild an expression parsed with evaluate=False as if it had been evaluated."""
+    if not expr.args:
+        return expr
+    return expr.func(*(evaluate(arg) for arg in expr.args))
+
+
+def _cheap_power(base, exponent):
+    if not (base.is_number and exponent.is_number):
+        return True
+    # Constant powers only as literal ** literal, sized like numeric_eval's exact arithmetic
+    if not (base.is_Atom and exponent.is_Atom):
+        return False
+    if not exponent.is_Rational:
+        return True
+    if abs(exponent) > MAX_EXACT_EXPONENT:
+        return False
+    if base.is_Rational and base != 0:
+        return abs(exponent) * math.log2(max(abs(base.p), base.q)) <= MAX_EXACT_BITS
+    return True
+
+
+def cheap_to_evaluate(expr):
+    """Whether evaluate(expr) is safe to run on a request thread."""
+    for node in sp.preorder_traversal(expr):
+        if node.is_Pow:
+            if not _cheap_power(*node.args):
+                return False
+        elif node.is_Function and node.is_number and not isinstance(node, _CHEAP_FUNCTIONS):
+            return False
+    return True
+
+
+class ExpressionParser:
+    """parse_expr with prebuilt transformations and a bounded memo."""
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.deferred = 0
+        self.slow = 0
+        self.parse_seconds = 0.0
+
+    def parse_timed(self, cleaned):
+        """
+        Parse a normalized expression string; return (expr, elapsed_ms). expr is
+        evaluated unless that could be expensive (see cheap_to_evaluate), in which
+        case it comes back unevaluated.
+        """
+        start = time.perf_counter()
+        with self._lock:
+            expr = self._memo.get(cleaned)
+            if expr is not None:
+                self._memo.move_to_end(cleaned)
+                self.hits += 1
+        if expr is None:
+            # evaluate=False alone still runs function calls such as factorial(3000000)
+            with evaluation(False):
+                expr = parse_expr(cleaned, transformations=TRANSFORMATIONS, evaluate=False)
+            deferred = not cheap_to_evaluate(expr)
+            if not deferred:
+                expr = evaluate(expr)
+            slow = time.perf_counter() - start > SLOW_PARSE_SECONDS
+            with self._lock:
+                self.misses += 1
+                self.deferred += deferred
+                self.slow += slow
+                if not slow:
+                    self._memo[cleaned] = expr
+                    if len(self._memo) > self.max_entries:
+                        self._memo.popitem(last=False)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.parse_seconds += elapsed
+        return expr, elapsed * 1000
+
+    def parse(self, cleaned):
+        """Parse a normalized expression string."""
+        return self.parse_timed(cleaned)[0]
+
+    def stats(self):
+        with self._lock:
+            parses = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'deferred': self.deferred,
+                'slow': self.slow,
+                'entries': len(self._memo),
+                'max_entries': self.max_entries,
+                'avg_parse_ms': round(self.parse_seconds * 1000 / parses, 4) if parses else 0.0
+            }
@@ -0,0 +1,154 @@
+"""
+Drawing of geometry_engine shapes onto a matplotlib Axes.
+
+Flat shapes are drawn to scale with their side lengths labelled; solids are
+drawn as simple oblique/elliptical sketches with their dimensions. Callers
+supply the axes (a pooled figure or one cell of a sheet), so nothing here
+creates figures or touches pyplot.
+"""
+import numpy as np
+import matplotlib.patches as patches
+
+from geometry_engine import (
+    Circle, Cone, Cube, Cylinder, Sector, Sphere, Triangle, Rectangle, RegularPolygon,
+    POLYGON_TYPES, shape_name, vertices
+)
+
+FILL = {'fill': True, 'alpha': 0.3, 'edgecolor': 'blue', 'linewidth': 2}
+
+
+def title(shape):
+    """Short description used as the drawing's title."""
+    if isinstance(shape, Triangle):
+        return f'Triangle: sides = {shape.a}, {shape.b}, {shape.c}'
+    if isinstance(shape, Circle):
+        return f'Circle: radius = {shape.radius}'
+    if isinstance(shape, Rectangle):
+        return f'Rectangle: {shape.width:g} x {shape.height:g}'
+    if isinstance(shape, RegularPolygon):
+        return f'Regular {shape.sides}-gon: side = {shape.side_length:g}'
+    if isinstance(shape, POLYGON_TYPES):
+        return f'{shape_name(shape).capitalize()}: {len(shape.vertices)} vertices'
+    if isinstance(shape, Sector):
+        return f'Sector: radius = {shape.radius:g}, angle = {shape.angle:g}°'
+    dims = ', '.join(f'{field} = {value:g}' for field, value in zip(shape._fields, shape))
+    return f'{shape_name(shape).capitalize()}: {dims}'
+
+
+def _draw_polygon(ax, shape, props, fontsize):
+    verts = vertices(shape)
+    ax.add_patch(patches.Polygon(verts, **FILL))
+    closed = np.vstack([verts, verts[:1]])
+    ax.plot(closed[:, 0], closed[:, 1], 'bo-', markersize=8 * fontsize / 12)
+
+    # Side lengths at the edge midpoints, nudged away from the centroid
+    centroid = np.array(props['centroid'])
+    offset = 0.06 * np.ptp(verts, axis=0).max()
+    for start, end in zip(verts, np.roll(verts, -1, axis=0)):
+        length = round(float(np.linalg.norm(end - start)), 2)
+        mid = (start + end) / 2
+        outward = mid - centroid
+        outward = outward / (np.linalg.norm(outward) or 1.0)
+        ax.text(*(mid + offset * outward), f'{length:g}', ha='center', va='center', fontsize=fontsize)
+
+
+def _draw_circle(ax, shape, fontsize):
+    r = shape.radius
+    ax.add_patch(patches.Circle((0, 0), r, **FILL))
+    ax.plot([0, r], [0, 0], 'r-', linewidth=2)
+    ax.plot(0, 0, 'ro', markersize=8 * fontsize / 12)
+    ax.text(r / 2, 0.04 * r, f'r = {r}', ha='center', va='bottom', fontsize=fontsize)
+    ax.set_xlim(-r * 1.5, r * 1.5)
+    ax.set_ylim(-r * 1.5, r * 1.5)
+
+
+def _draw_sector(ax, shape, fontsize):
+    r, angle = shape
+    ax.add_patch(patches.Wedge((0, 0), r, 0, angle, **FILL))
+    ax.plot(0, 0, 'ro', markersize=8 * fontsize / 12)
+    half = np.radians(angle / 2)
+    ax.text(0.35 * r * np.cos(half), 0.35 * r * np.sin(half), f'{angle:g}°', ha='center', va='center', fontsize=fontsize)
+    ax.text(r / 2, -0.04 * r, f'r = {r:g}', ha='center', va='top', fontsize=fontsize)
+
+
+def _ellipse(ax, centre, width, height, **style):
+    ax.add_patch(patches.Ellipse(centre, width, height, fill=False, edgecolor='blue', linewidth=2, **style))
+
+
+def _draw_cube(ax, shape, fontsize):
+    s = shape.side
+    depth = np.array([0.4, 0.3]) * s
+    front = np.array([(0, 0), (s, 0), (s, s), (0, s)])
+    back = front + depth
+    ax.add_patch(patches.Polygon(front, **FILL))
+    ax.add_patch(patches.Polygon([front[3], front[2], back[2], back[3]], **{**FILL, 'alpha': 0.2}))
+    ax.add_patch(patches.Polygon([front[1], back[1], back[2], front[2]], **{**FILL, 'alpha': 0.15}))
+    # Hidden edges meet at the back-bottom-left corner
+    for end in (back[1], back[3], front[0]):
+        ax.plot(*zip(back[0], end), 'b--', linewidth=1, alpha=0.6)
+    ax.text(s / 2, -0.06 * s, f'{s:g}', ha='center', va='top', fontsize=fontsize)
+
+
+def _draw_cylinder(ax, shape, fontsize):
+    r, h = shape
+    ax.add_patch(patches.Rectangle((-r, 0), 2 * r, h, fill=True, alpha=0.3, edgecolor='none'))
+    ax.plot([-r, -r], [0, h], 'b-', linewidth=2)
+    ax.plot([r, r], [0, h], 'b-', linewidth=2)
+    _ellipse(ax, (0, h), 2 * r, 0.5 * r)
+    ax.add_patch(patches.Arc((0, 0), 2 * r, 0.5 * r, theta1=180, theta2=360, edgecolor='blue', linewidth=2))
+    ax.add_patch(patches.Arc((0, 0), 2 * r, 0.5 * r, theta1=0, theta2=180, edgecolor='blue', linewidth=1, linestyle='--'))
+    ax.plot([0, r], [h, h], 'r-', linewidth=2)
+    ax.text(r / 2, h + 0.05 * r, f'r = {r:g}', ha='center', va='bottom', fontsize=fontsize)
+    ax.text(r * 1.08, h / 2, f'h = {h:g}', ha='left', va='center', fontsize=fontsize)
+
+
+def _draw_cone(ax, shape, fontsize):
+    r, h = shape
+    ax.add_patch(patches.Polygon([(-r, 0), (r, 0), (0, h)], **{**FILL, 'edgecolor': 'none'}))
+    ax.plot([-r, 0, r], [0, h, 0], 'b-', linewidth=2)
+    ax.add_patch(patches.Arc((0, 0), 2 * r, 0.5 * r, theta1=180, theta2=360, edgecolor='blue', linewidth=2))
+    ax.add_patch(patches.Arc((0, 0), 2 * r, 0.5 * r, theta1=0, theta2=180, edgecolor='blue', linewidth=1, linestyle='--'))
+    ax.plot([0, 0], [0, h], 'r--', linewidth=1)
+    ax.plot([0, r], [0, 0], 'r-', linewidth=2)
+    ax.text(r / 2, 0.03 * h, f'r = {r:g}', ha='center', va='bottom', fontsize=fontsize)
+    ax.text(0.04 * r, h / 2, f'h = {h:g}', ha='left', va='center', fontsize=fontsize)
+
+
+def _draw_sphere(ax, shape, fontsize):
+    r = shape.radius
+    ax.add_patch(patches.Circle((0, 0), r, **FILL))
+    ax.add_patch(patches.Arc((0, 0), 2 * r, 0.5 * r, theta1=180, theta2=360, edgecolor='blue', linewidth=1.5))
+    ax.add_patch(patches.Arc((0, 0), 2 * r, 0.5 * r, theta1=0, theta2=180, edgecolor='blue', linewidth=1, linestyle='--'))
+    ax.plot([0, r], [0, 0], 'r-', linewidth=2)
+    ax.plot(0, 0, 'ro', markersize=6 * fontsize / 12)
+    ax.text(r / 2, 0.04 * r, f'r = {r:g}', ha='center', va='bottom', fontsize=fontsize)
+    ax.set_xlim(-r * 1.3, r * 1.3)
+    ax.set_ylim(-r * 1.3, r * 1.3)
+
+
+_DRAWERS = {
+    Circle: _draw_circle, Sector: _draw_sector, Cube: _draw_cube,
+    Cylinder: _draw_cylinder, Cone: _draw_cone, Sphere: _draw_sphere
+}
+
+
+def draw_shape(ax, shape, props, fontsize=12, axes=True):
+    """
+    Draw a shape (with its computed properties) onto ax, titled and to scale.
+    axes=False leaves out the frame, ticks and grid (worksheet cells).
+    """
+    if isinstance(shape, POLYGON_TYPES):
+        _draw_polygon(ax, shape, props, fontsize)
+    else:
+        _DRAWERS[type(shape)](ax, shape, fontsize)
+    ax.set_aspect('equal')
+    if isinstance(shape, POLYGON_TYPES + (Sector, Cube, Cylinder, Cone)):
+        ax.margins(0.12)
+        ax.autoscale_view()
+    if axes:
+        ax.grid(True, alpha=0.3)
+        ax.set_title(title(shape), fontsize=fontsize + 2)
+    else:
+        ax.set_axis_off()
+        # A fixed title position skips measuring the (hidden) tick labels at draw time
+        ax.set_title(title(shape), fontsize=fontsize + 2, y=1.02)
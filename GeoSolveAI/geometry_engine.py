@@ -0,0 +1,335 @@
+"""
+Shape model, command parsing and vectorized properties for /api/geometry.
+
+Each shape is a small immutable record (a namedtuple of plain numbers), so it
+can be hashed, cached and used in render keys directly. Flat polygons
+(triangles, rectangles, quadrilaterals, regular n-gons, arbitrary polygons)
+are reduced to vertex arrays; properties_many() stacks every polygon with the
+same vertex count into one (shapes, vertices, 2) array and computes area
+(shoelace), perimeter, interior angles, centroid and diagonals for the whole
+stack at once. Circles, sectors and solids are grouped by type and evaluated
+with array formulas the same way, so a worksheet of hundreds of shapes costs
+a handful of NumPy passes rather than one Python computation per shape.
+"""
+import re
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+# Properties are rounded like the original /api/geometry responses
+DECIMALS = 2
+MAX_POLYGON_VERTICES = 64
+
+
+class GeometryError(ValueError):
+    """A shape command that cannot be parsed or describes an impossible shape."""
+
+
+Triangle = namedtuple('Triangle', ['a', 'b', 'c'])
+Rectangle = namedtuple('Rectangle', ['width', 'height'])
+Quadrilateral = namedtuple('Quadrilateral', ['vertices'])
+Polygon = namedtuple('Polygon', ['vertices'])
+RegularPolygon = namedtuple('RegularPolygon', ['sides', 'side_length'])
+Circle = namedtuple('Circle', ['radius'])
+Sector = namedtuple('Sector', ['radius', 'angle'])
+Cube = namedtuple('Cube', ['side'])
+Cylinder = namedtuple('Cylinder', ['radius', 'height'])
+Cone = namedtuple('Cone', ['radius', 'height'])
+Sphere = namedtuple('Sphere', ['radius'])
+
+SHAPE_NAMES = OrderedDict([
+    (Triangle, 'triangle'), (Rectangle, 'rectangle'), (Quadrilateral, 'quadrilateral'),
+    (Polygon, 'polygon'), (RegularPolygon, 'regular_polygon'), (Circle, 'circle'), (Sector, 'sector'),
+    (Cube, 'cube'), (Cylinder, 'cylinder'), (Cone, 'cone'), (Sphere, 'sphere')
+])
+POLYGON_TYPES = (Triangle, Rectangle, Quadrilateral, Polygon, RegularPolygon)
+SOLID_TYPES = (Cube, Cylinder, Cone, Sphere)
+
+# Named regular polygons: "hexagon 2" is a regular 6-gon with side 2
+_NAMED_NGONS = {'pentagon': 5, 'hexagon': 6, 'heptagon': 7, 'octagon': 8, 'nonagon': 9, 'decagon': 10}
+
+_NUMBER = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:e[-+]?\d+)?')
+_WORD = re.compile(r'[a-z_]+')
+
+
+def shape_name(shape):
+    return SHAPE_NAMES[type(shape)]
+
+
+def _positive(values, message):
+    if any(v <= 0 for v in values):
+        raise GeometryError(message)
+    return values
+
+
+def _points(numbers, kind, count=None):
+    if len(numbers) % 2:
+        raise GeometryError(f'{kind.capitalize()} vertices must be x,y pairs')
+    points = tuple(zip(numbers[0::2], numbers[1::2]))
+    if count is not None and len(points) != count:
+        raise GeometryError(f'{kind.capitalize()} requires {count} vertices as x,y pairs')
+    if not 3 <= len(points) <= MAX_POLYGON_VERTICES:
+        raise GeometryError(f'{kind.capitalize()} requires 3 to {MAX_POLYGON_VERTICES} vertices as x,y pairs')
+    if abs(_shoelace(np.array(points, dtype=float)[None])[0]) < 1e-12:
+        raise GeometryError(f'{kind.capitalize()} vertices must not all lie on one line')
+    return points
+
+
+def parse_command(command):
+    """
+    Parse a shape command such as 'triangle 3 4 5', 'hexagon 2', 'polygon 0,0 4,0 4,3'
+    or 'cone 3 4'. Returns a shape record; raises GeometryError.
+    """
+    text = command.lower().strip()
+    words = _WORD.findall(text)
+    kind = next((w for w in words if w in _PARSERS or w in _NAMED_NGONS), None)
+    if kind is None:
+        raise GeometryError('Unknown geometry command. Use e.g. "triangle 3 4 5", "circle 7", "rectangle 4 6", '
+                            '"hexagon 2", "polygon 0,0 4,0 4,3", "sector 5 60" or "cone 3 4"')
+    numbers = [float(n) for n in _NUMBER.findall(text)]
+    if kind in _NAMED_NGONS:
+        if not numbers:
+            raise GeometryError(f'{kind.capitalize()} requires a side length')
+        return RegularPolygon(_NAMED_NGONS[kind], *_positive(numbers[:1], 'Side length must be positive'))
+    return _PARSERS[kind](numbers)
+
+
+def _parse_triangle(numbers):
+    if len(numbers) < 3:
+        raise GeometryError('Triangle requires 3 side lengths')
+    a, b, c = _positive(numbers[:3], 'Triangle sides must be positive')
+    if not (a + b > c and b + c > a and a + c > b):
+        raise GeometryError('Invalid triangle: sides do not satisfy triangle inequality')
+    return Triangle(a, b, c)
+
+
+def _parse_rectangle(numbers):
+    if len(numbers) < 2:
+        raise GeometryError('Rectangle requires a width and a height')
+    return Rectangle(*_positive(numbers[:2], 'Rectangle sides must be positive'))
+
+
+def _parse_square(numbers):
+    if not numbers:
+        raise GeometryError('Square requires a side length')
+    side, = _positive(numbers[:1], 'Side length must be positive')
+    return Rectangle(side, side)
+
+
+def _parse_regular(numbers):
+    if len(numbers) < 2 or numbers[0] != int(numbers[0]) or not 3 <= numbers[0] <= MAX_POLYGON_VERTICES:
+        raise GeometryError(f'Regular polygon requires a number of sides (3-{MAX_POLYGON_VERTICES}) and a side length')
+    return RegularPolygon(int(numbers[0]), *_positive(numbers[1:2], 'Side length must be positive'))
+
+
+def _parse_circle(numbers):
+    if not numbers:
+        raise GeometryError('Circle requires a radius')
+    return Circle(*_positive(numbers[:1], 'Radius must be positive'))
+
+
+def _parse_sector(numbers):
+    if len(numbers) < 2:
+        raise GeometryError('Sector requires a radius and an angle in degrees')
+    radius, angle = _positive(numbers[:2], 'Sector radius and angle must be positive')
+    if angle > 360:
+        raise GeometryError('Sector angle must be at most 360 degrees')
+    return Sector(radius, angle)
+
+
+def _parse_solid(shape_type, required):
+    def parse(numbers):
+        name = SHAPE_NAMES[shape_type]
+        if len(numbers) < len(shape_type._fields):
+            raise GeometryError(f'{name.capitalize()} requires {required}')
+        return shape_type(*_positive(numbers[:len(shape_type._fields)], f'{name.capitalize()} dimensions must be positive'))
+    return parse
+
+
+_PARSERS = {
+    'triangle': _parse_triangle,
+    'rectangle': _parse_rectangle,
+    'rect': _parse_rectangle,
+    'square': _parse_square,
+    'quadrilateral': lambda numbers: Quadrilateral(_points(numbers, 'quadrilateral', 4)),
+    'quad': lambda numbers: Quadrilateral(_points(numbers, 'quadrilateral', 4)),
+    'polygon': lambda numbers: Polygon(_points(numbers, 'polygon')),
+    'ngon': _parse_regular,
+    'regular': _parse_regular,
+    'circle': _parse_circle,
+    'sector': _parse_sector,
+    'cube': _parse_solid(Cube, 'a side length'),
+    'cylinder': _parse_solid(Cylinder, 'a radius and a height'),
+    'cone': _parse_solid(Cone, 'a radius and a height'),
+    'sphere': _parse_solid(Sphere, 'a radius')
+}
+
+
+def vertices(shape):
+    """(n, 2) vertex array of a flat polygon (given polygons keep their own vertex order)."""
+    if isinstance(shape, Triangle):
+        a, b, c = shape
+        # Side c on the x axis, the apex above it (vertex i is opposite side i of a, b, c)
+        x3 = (c ** 2 + b ** 2 - a ** 2) / (2 * c)
+        return np.array([(0.0, 0.0), (c, 0.0), (x3, np.sqrt(max(b ** 2 - x3 ** 2, 0.0)))])
+    if isinstance(shape, Rectangle):
+        w, h = shape
+        return np.array([(0.0, 0.0), (w, 0.0), (w, h), (0.0, h)])
+    if isinstance(shape, RegularPolygon):
+        n, side = shape
+        circumradius = side / (2 * np.sin(np.pi / n))
+        # Flat bottom edge, centred on the origin
+        angles = -np.pi / 2 - np.pi / n + 2 * np.pi * np.arange(n) / n
+        return circumradius * np.column_stack([np.cos(angles), np.sin(angles)])
+    if isinstance(shape, (Quadrilateral, Polygon)):
+        return np.array(shape.vertices, dtype=float)
+    raise TypeError(f'{shape_name(shape)} has no vertices')
+
+
+def _shoelace(verts):
+    """Signed areas of a (m, n, 2) stack of polygons (positive when counter-clockwise)."""
+    x, y = verts[..., 0], verts[..., 1]
+    return (x * np.roll(y, -1, axis=1) - np.roll(x, -1, axis=1) * y).sum(axis=1) / 2
+
+
+def polygon_properties(verts):
+    """
+    Properties of a stack of polygons with the same vertex count, shape (m, n, 2).
+    Returns a dict of arrays: area, perimeter, sides (m, n), angles (m, n, degrees),
+    centroid (m, 2) and diagonals (m, n * (n - 3) / 2).
+    """
+    n = verts.shape[1]
+    following = np.roll(verts, -1, axis=1)
+    edges = following - verts
+    sides = np.linalg.norm(edges, axis=2)
+
+    cross = verts[..., 0] * following[..., 1] - following[..., 0] * verts[..., 1]
+    signed_area = cross.sum(axis=1) / 2
+    centroid = ((verts + following) * cross[..., None]).sum(axis=1) / (6 * signed_area[:, None])
+
+    # Interior angle at vertex k from the turn between the incoming and outgoing edge;
+    # turning against the polygon's orientation makes the vertex reflex
+    incoming = np.roll(edges, 1, axis=1)
+    turn_cross = incoming[..., 0] * edges[..., 1] - incoming[..., 1] * edges[..., 0]
+    turn_dot = (incoming * edges).sum(axis=2)
+    turn = np.arctan2(turn_cross * np.sign(signed_area)[:, None], turn_dot)
+    angles = np.degrees(np.pi - turn)
+
+    i, j = np.triu_indices(n, k=2)
+    keep = ~((i == 0) & (j == n - 1))
+    diagonals = np.linalg.norm(verts[:, i[keep]] - verts[:, j[keep]], axis=2)
+
+    return {
+        'area': np.abs(signed_area),
+        'perimeter': sides.sum(axis=1),
+        'sides': sides,
+        'angles': angles,
+        'centroid': centroid,
+        'diagonals': diagonals
+    }
+
+
+def _round(values):
+    # Adding 0.0 turns the -0.0 that rounding tiny negatives produces into 0.0
+    return (np.round(values, DECIMALS) + 0.0).tolist()
+
+
+def _circle_formulas(params):
+    r, = params
+    return {'radius': r, 'area': np.pi * r ** 2, 'circumference': 2 * np.pi * r, 'diameter': 2 * r}
+
+
+def _sector_formulas(params):
+    r, angle = params
+    theta = np.radians(angle)
+    arc = r * theta
+    return {
+        'radius': r, 'angle': angle, 'area': r ** 2 * theta / 2, 'arc_length': arc,
+        'perimeter': np.where(angle >= 360, arc, arc + 2 * r), 'chord': 2 * r * np.sin(theta / 2)
+    }
+
+
+def _cube_formulas(params):
+    s, = params
+    return {'side': s, 'volume': s ** 3, 'surface_area': 6 * s ** 2,
+            'face_diagonal': s * np.sqrt(2), 'space_diagonal': s * np.sqrt(3)}
+
+
+def _cylinder_formulas(params):
+    r, h = params
+    return {'radius': r, 'height': h, 'volume': np.pi * r ** 2 * h,
+            'lateral_area': 2 * np.pi * r * h, 'surface_area': 2 * np.pi * r * (r + h)}
+
+
+def _cone_formulas(params):
+    r, h = params
+    slant = np.hypot(r, h)
+    return {'radius': r, 'height': h, 'slant_height': slant, 'volume': np.pi * r ** 2 * h / 3,
+            'lateral_area': np.pi * r * slant, 'surface_area': np.pi * r * (r + slant)}
+
+
+def _sphere_formulas(params):
+    r, = params
+    return {'radius': r, 'volume': 4 / 3 * np.pi * r ** 3, 'surface_area': 4 * np.pi * r ** 2,
+            'diameter': 2 * r}
+
+
+_FORMULAS = {
+    Circle: _circle_formulas, Sector: _sector_formulas, Cube: _cube_formulas,
+    Cylinder: _cylinder_formulas, Cone: _cone_formulas, Sphere: _sphere_formulas
+}
+# Inputs echoed back exactly rather than rounded
+_EXACT_FIELDS = {'radius', 'angle', 'side', 'height'}
+
+
+def _polygon_extras(shape):
+    if isinstance(shape, Triangle):
+        return {'sides': list(shape)}
+    if isinstance(shape, Rectangle):
+        return {'width': shape.width, 'height': shape.height}
+    if isinstance(shape, RegularPolygon):
+        n, side = shape
+        return {
+            'side_count': n, 'side_length': side,
+            'apothem': round(float(side / (2 * np.tan(np.pi / n))), DECIMALS),
+            'circumradius': round(float(side / (2 * np.sin(np.pi / n))), DECIMALS)
+        }
+    return {}
+
+
+def properties_many(shapes):
+    """Properties of every shape, in order. Shapes are grouped so each group is one vectorized pass."""
+    results = [None] * len(shapes)
+
+    polygon_groups = OrderedDict()
+    formula_groups = OrderedDict()
+    for position, shape in enumerate(shapes):
+        if isinstance(shape, POLYGON_TYPES):
+            verts = vertices(shape)
+            polygon_groups.setdefault(len(verts), []).append((position, shape, verts))
+        else:
+            formula_groups.setdefault(type(shape), []).append((position, shape))
+
+    for group in polygon_groups.values():
+        verts = np.stack([verts for _, _, verts in group])
+        # Round each stacked array once; rows are then plain Python lists
+        columns = {name: _round(values) for name, values in polygon_properties(verts).items()}
+        columns['vertices'] = _round(verts)
+        for row, (position, shape, _) in enumerate(group):
+            results[position] = {name: values[row] for name, values in columns.items()}
+            results[position].update(_polygon_extras(shape))
+
+    for shape_type, group in formula_groups.items():
+        params = np.array([shape for _, shape in group], dtype=float).T
+        columns = {name: _round(values) for name, values in _FORMULAS[shape_type](params).items()}
+        for row, (position, shape) in enumerate(group):
+            results[position] = {
+                name: (getattr(shape, name) if name in _EXACT_FIELDS else values[row])
+                for name, values in columns.items()
+            }
+    return results
+
+
+def properties(shape):
+    """Properties of a single shape."""
+    return properties_many([shape])[0]
@@ -0,0 +1,110 @@
+"""
+Composite renders for /api/geometry/batch: many shapes on one figure.
+
+Drawing every shape on its own 8x8 figure and encoding it separately repeats
+figure setup, rasterization and base64 work per shape. Here all shapes share
+one figure instead: a grid image for a sheet, or one page layout that is
+cleared and redrawn for each page of a PDF. PDF pages are handed out as they
+are written, so the response can stream while later pages are still drawn
+(fonts and the cross-reference table follow the last page).
+"""
+import io
+import math
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+
+from geometry_drawing import draw_shape
+
+DEFAULT_COLUMNS = 4
+MAX_COLUMNS = 8
+# Inches per grid cell in a sheet image
+CELL_SIZE = 3.0
+SHEET_DPI = 100
+SHEET_MAX_CELLS = 64
+CELL_FONTSIZE = 8
+# US Letter portrait, rows x columns of shapes per page
+PAGE_SIZE = (8.5, 11)
+PAGE_GRID = (3, 2)
+
+
+def _reset_cell(ax):
+    """Remove the previous page's drawing; ax.clear() would also rebuild the (unused) axis ticks."""
+    for artist in [*ax.patches, *ax.lines, *ax.texts]:
+        artist.remove()
+    ax.ignore_existing_data_limits = True
+    ax.set_autoscale_on(True)
+
+
+def _draw_cells(axes, shapes, props):
+    for ax, shape, shape_props in zip(axes, shapes, props):
+        ax.set_visible(True)
+        # Worksheet cells show the figure only; tick layout would be most of a cell's draw time
+        draw_shape(ax, shape, shape_props, fontsize=CELL_FONTSIZE, axes=False)
+    for ax in axes[len(shapes):]:
+        ax.set_visible(False)
+
+
+def sheet_figure(shapes, props, columns=DEFAULT_COLUMNS):
+    """One Agg figure with every shape in a grid cell. Raises ValueError above SHEET_MAX_CELLS."""
+    if len(shapes) > SHEET_MAX_CELLS:
+        raise ValueError(f'A sheet holds at most {SHEET_MAX_CELLS} shapes; use render=pdf for more')
+    columns = min(columns, len(shapes))
+    rows = math.ceil(len(shapes) / columns)
+    fig = Figure(figsize=(columns * CELL_SIZE, rows * CELL_SIZE), dpi=SHEET_DPI)
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(rows, columns, squeeze=False).ravel()
+    fig.subplots_adjust(left=0.05, right=0.97, bottom=0.04, top=0.95, wspace=0.3, hspace=0.35)
+    _draw_cells(axes, shapes, props)
+    return fig
+
+
+class _ChunkWriter(io.RawIOBase):
+    """Write-only file that hands back what was written since the last drain()."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        # PdfPages records object offsets through tell(); it never seeks
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def pdf_pages(shapes, props, grid=PAGE_GRID, title=None):
+    """Yield the bytes of a multi-page PDF worksheet, chunk by chunk as pages are written."""
+    rows, columns = grid
+    per_page = rows * columns
+    out = _ChunkWriter()
+    fig = Figure(figsize=PAGE_SIZE)
+    axes = fig.subplots(rows, columns, squeeze=False).ravel()
+    fig.subplots_adjust(left=0.08, right=0.95, bottom=0.05, top=0.92, wspace=0.3, hspace=0.35)
+    heading = fig.suptitle(title or '', fontsize=14, fontweight='bold')
+
+    with PdfPages(out, metadata={'Title': title or 'Geometry worksheet', 'CreationDate': None}) as pdf:
+        pages = max(1, math.ceil(len(shapes) / per_page))
+        for page in range(pages):
+            for ax in axes:
+                _reset_cell(ax)
+            start = page * per_page
+            _draw_cells(axes, shapes[start:start + per_page], props[start:start + per_page])
+            if title:
+                heading.set_text(f'{title} ({page + 1}/{pages})' if pages > 1 else title)
+            pdf.savefig(fig)
+            yield out.drain()
+    yield out.drain()
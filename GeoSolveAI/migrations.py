@@ -0,0 +1,207 @@
+"""
+Versioned schema migrations for the application database.
+
+Each migration is a function registered with @migration(version, name) and
+runs in its own write transaction together with its row in
+schema_migrations, so a failed migration leaves the database at the previous
+version and a restart picks up where it stopped. Several workers starting at
+once serialize on the transaction and re-check the version inside it, so
+every migration runs exactly once. Add new migrations at the end with the
+next version number; never edit one that has shipped.
+
+explain() and uses_index() read EXPLAIN QUERY PLAN, for checking that hot
+queries are served by the indexes added here (see benchmarks/bench_queries.py).
+"""
+
+MIGRATIONS = []
+
+
+def migration(version, name):
+    def register(func):
+        assert not MIGRATIONS or version == MIGRATIONS[-1][0] + 1, 'migrations must be numbered consecutively'
+        MIGRATIONS.append((version, name, func))
+        return func
+    return register
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+
+
+@migration(1, 'base tables')
+def _base_tables(c):
+    # IF NOT EXISTS: databases created by the old init_db() adopt this as their first version
+    c.execute('''CREATE TABLE IF NOT EXISTS users
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  name TEXT NOT NULL,
+                  email TEXT UNIQUE NOT NULL,
+                  password TEXT NOT NULL,
+                  phone TEXT,
+                  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+
+    c.execute('''CREATE TABLE IF NOT EXISTS feedback
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  user_email TEXT NOT NULL,
+                  message TEXT NOT NULL,
+                  resolved INTEGER DEFAULT 0,
+                  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    # Early databases predate the resolved flag, and CREATE TABLE IF NOT EXISTS never added it
+    if 'resolved' not in _columns(c, 'feedback'):
+        c.execute('ALTER TABLE feedback ADD COLUMN resolved INTEGER DEFAULT 0')
+
+    c.execute('''CREATE TABLE IF NOT EXISTS quizzes
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  title TEXT NOT NULL,
+                  description TEXT,
+                  created_by TEXT NOT NULL,
+                  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+
+    c.execute('''CREATE TABLE IF NOT EXISTS quiz_questions
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  quiz_id INTEGER NOT NULL,
+                  question_text TEXT NOT NULL,
+                  option_a TEXT NOT NULL,
+                  option_b TEXT NOT NULL,
+                  option_c TEXT NOT NULL,
+                  option_d TEXT NOT NULL,
+                  correct_answer TEXT NOT NULL,
+                  FOREIGN KEY(quiz_id) REFERENCES quizzes(id))''')
+
+    c.execute('''CREATE TABLE IF NOT EXISTS quiz_submissions
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  quiz_id INTEGER NOT NULL,
+                  user_email TEXT NOT NULL,
+                  responses TEXT NOT NULL,
+                  score INTEGER,
+                  submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                  FOREIGN KEY(quiz_id) REFERENCES quizzes(id))''')
+
+
+@migration(2, 'secondary indexes')
+def _indexes(c):
+    # Questions of a quiz in id order; covers the answer-key query outright
+    c.execute('CREATE INDEX IF NOT EXISTS idx_quiz_questions_quiz ON quiz_questions (quiz_id, id, correct_answer)')
+    # Newest-first submission lists, overall, per quiz and per student
+    c.execute('CREATE INDEX IF NOT EXISTS idx_quiz_submissions_submitted ON quiz_submissions (submitted_at, id)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_quiz_submissions_quiz ON quiz_submissions (quiz_id, submitted_at, id)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_quiz_submissions_user ON quiz_submissions (user_email, submitted_at, id)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_feedback_created ON feedback (created_at, id)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_feedback_resolved ON feedback (resolved, created_at, id)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_users_created ON users (created_at, id)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_quizzes_created ON quizzes (created_at, id)')
+
+
+@migration(3, 'quizzes.question_count')
+def _question_count(c):
+    # Denormalized so quiz and submission lists need no per-row COUNT(*) over quiz_questions;
+    # questions are only ever written together with their quiz in create_quiz
+    c.execute('ALTER TABLE quizzes ADD COLUMN question_count INTEGER NOT NULL DEFAULT 0')
+    c.execute('''UPDATE quizzes SET question_count =
+                 (SELECT COUNT(*) FROM quiz_questions WHERE quiz_id = quizzes.id)''')
+
+
+@migration(4, 'analytics rollups')
+def _analytics_rollups(c):
+    # Maintained incrementally by analytics.py from here on; backfilled once from the base tables
+    c.execute('''CREATE TABLE stats_totals
+                 (name TEXT PRIMARY KEY,
+                  value INTEGER NOT NULL DEFAULT 0)''')
+    c.execute('''CREATE TABLE stats_daily
+                 (day TEXT PRIMARY KEY,
+                  registrations INTEGER NOT NULL DEFAULT 0,
+                  feedback INTEGER NOT NULL DEFAULT 0,
+                  submissions INTEGER NOT NULL DEFAULT 0,
+                  score_total INTEGER NOT NULL DEFAULT 0,
+                  active_users INTEGER NOT NULL DEFAULT 0)''')
+    c.execute('''CREATE TABLE stats_active_users
+                 (day TEXT NOT NULL,
+                  user_email TEXT NOT NULL,
+                  PRIMARY KEY (day, user_email)) WITHOUT ROWID''')
+    c.execute('''CREATE TABLE stats_quiz
+                 (quiz_id INTEGER PRIMARY KEY,
+                  submissions INTEGER NOT NULL DEFAULT 0,
+                  score_total INTEGER NOT NULL DEFAULT 0)''')
+    c.execute('''CREATE TABLE stats_question
+                 (question_id INTEGER PRIMARY KEY,
+                  quiz_id INTEGER NOT NULL,
+                  attempts INTEGER NOT NULL DEFAULT 0,
+                  correct INTEGER NOT NULL DEFAULT 0)''')
+    c.execute('CREATE INDEX idx_stats_question_quiz ON stats_question (quiz_id)')
+
+    c.execute('''INSERT INTO stats_totals (name, value)
+                 SELECT 'users', COUNT(*) FROM users
+                 UNION ALL SELECT 'feedback', COUNT(*) FROM feedback
+                 UNION ALL SELECT 'resolved_feedback', COUNT(*) FROM feedback WHERE resolved = 1
+                 UNION ALL SELECT 'submissions', COUNT(*) FROM quiz_submissions''')
+    c.execute('''INSERT INTO stats_daily (day, registrations, feedback, submissions, score_total)
+                 SELECT day, SUM(registrations), SUM(feedback), SUM(submissions), SUM(score_total) FROM
+                   (SELECT date(created_at) AS day, 1 AS registrations, 0 AS feedback, 0 AS submissions,
+                           0 AS score_total FROM users
+                    UNION ALL SELECT date(created_at), 0, 1, 0, 0 FROM feedback
+                    UNION ALL SELECT date(submitted_at), 0, 0, 1, COALESCE(score, 0) FROM quiz_submissions)
+                 WHERE day IS NOT NULL GROUP BY day''')
+    c.execute('''INSERT INTO stats_active_users (day, user_email)
+                 SELECT date(created_at), email FROM users WHERE created_at IS NOT NULL
+                 UNION SELECT date(created_at), user_email FROM feedback WHERE created_at IS NOT NULL
+                 UNION SELECT date(submitted_at), user_email FROM quiz_submissions WHERE submitted_at IS NOT NULL''')
+    c.execute('''UPDATE stats_daily SET active_users =
+                 (SELECT COUNT(*) FROM stats_active_users a WHERE a.day = stats_daily.day)''')
+    c.execute('''INSERT INTO stats_quiz (quiz_id, submissions, score_total)
+                 SELECT quiz_id, COUNT(*), SUM(COALESCE(score, 0)) FROM quiz_submissions GROUP BY quiz_id''')
+    # Per-question tallies from the stored responses ({"question id": "answer"} JSON). CROSS JOIN
+    # pins the loop order so each submission's JSON is parsed once, then questions are found by id
+    c.execute('''INSERT INTO stats_question (question_id, quiz_id, attempts, correct)
+                 SELECT qq.id, qq.quiz_id, COUNT(*), SUM(r.value = qq.correct_answer)
+                 FROM quiz_submissions qs
+                 CROSS JOIN json_each(qs.responses) r
+                 CROSS JOIN quiz_questions qq
+                 WHERE json_valid(qs.responses) AND qq.id = CAST(r.key AS INTEGER) AND qq.quiz_id = qs.quiz_id
+                 GROUP BY qq.id''')
+
+
+def current_version(conn):
+    c = conn.execute('''SELECT name FROM sqlite_master
+                        WHERE type = 'table' AND name = 'schema_migrations' ''')
+    if c.fetchone() is None:
+        return 0
+    return conn.execute('SELECT COALESCE(MAX(version), 0) FROM schema_migrations').fetchone()[0]
+
+
+def migrate(database, target=None):
+    """Apply every pending migration up to target (default: all). Returns the versions applied."""
+    with database.transaction() as c:
+        c.execute('''CREATE TABLE IF NOT EXISTS schema_migrations
+                     (version INTEGER PRIMARY KEY,
+                      name TEXT NOT NULL,
+                      applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    applied = []
+    for version, name, func in MIGRATIONS:
+        if target is not None and version > target:
+            break
+        with database.transaction() as c:
+            if current_version(c) >= version:
+                continue
+            func(c)
+            c.execute('INSERT INTO schema_migrations (version, name) VALUES (?, ?)', (version, name))
+        applied.append(version)
+    return applied
+
+
+def explain(conn, sql, params=()):
+    """The detail lines of EXPLAIN QUERY PLAN for sql, e.g. 'SEARCH qs USING INDEX ...'."""
+    return [row[-1] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params)]
+
+
+def uses_index(conn, sql, params=(), index=None):
+    """
+    Whether sql runs without a full table scan or temporary sort, and, if
+    index is given, whether the plan uses that index. Walking an index in
+    order (SCAN ... USING INDEX) is accepted: that is how ordered lists read.
+    """
+    plan = explain(conn, sql, params)
+    for line in plan:
+        if line.startswith('SCAN') and 'INDEX' not in line:
+            return False
+        if 'USE TEMP B-TREE' in line:
+            return False
+    return index is None or any(index in line for line in plan)
@@ -0,0 +1,202 @@
+"""
+Fast evaluator for variable-free (calculator-style) expressions.
+
+Expressions are parsed with Python's ast module, checked against a whitelist
+(numbers, + - * / ** %, the usual math functions, pi and e) and compiled once;
+compiled forms are cached per expression string. Pure rational arithmetic is
+evaluated exactly with Fraction, everything else with floats. Trig arguments
+follow the same convention as handle_trig_constant: degrees by default.
+"""
+import ast
+import math
+from fractions import Fraction
+from functools import lru_cache
+
+# Largest exponent accepted for exact arithmetic, so "9**9**9" cannot hang a worker
+MAX_EXACT_EXPONENT = 4096
+# Largest exact result (bits of numerator or denominator): chained powers such as
+# "((2**4096)**4096)**8" stay under MAX_EXACT_EXPONENT at every step but not in size.
+# About 4200 decimal digits, inside Python's default int-to-str conversion limit
+MAX_EXACT_BITS = 14000
+
+
+class UnsupportedExpression(ValueError):
+    """The expression is not a plain numeric expression this evaluator can handle."""
+
+
+class ResultTooLarge(UnsupportedExpression):
+    """
+    Exact arithmetic would exceed MAX_EXACT_EXPONENT or MAX_EXACT_BITS. Final for
+    callers: any other engine (SymPy included) would compute the same huge number.
+    """
+
+
+def _bits(value):
+    return max(value.numerator.bit_length(), value.denominator.bit_length())
+
+
+def _log2_size(value):
+    return math.log2(max(abs(value.numerator), value.denominator))
+
+
+def _checked_pow(base, exponent):
+    if isinstance(exponent, Fraction):
+        if exponent.denominator != 1:
+            base, exponent = float(base), float(exponent)
+        elif abs(exponent) > MAX_EXACT_EXPONENT:
+            raise ResultTooLarge('Exponent too large for exact evaluation')
+        else:
+            exponent = int(exponent)
+            # Size of the result estimated before computing it: bits(base ** n) ~ n * log2(base)
+            if isinstance(base, Fraction) and base and abs(exponent) * _log2_size(base) > MAX_EXACT_BITS:
+                raise ResultTooLarge('Result too large for exact evaluation')
+    result = base ** exponent
+    if isinstance(result, complex):
+        raise UnsupportedExpression('Result is not a real number')
+    return result
+
+
+def _deg_in(func):
+    return lambda v: func(math.radians(v))
+
+
+def _deg_out(func):
+    return lambda v: math.degrees(func(v))
+
+
+_COMMON = {
+    'sqrt': math.sqrt, 'log': math.log, 'exp': math.exp, 'abs': abs,
+    'sinh': math.sinh, 'cosh': math.cosh, 'tanh': math.tanh,
+    'pi': math.pi, 'e': math.e
+}
+
+NAMESPACES = {
+    'radians': {
+        **_COMMON,
+        'sin': math.sin, 'cos': math.cos, 'tan': math.tan,
+        'asin': math.asin, 'acos': math.acos, 'atan': math.atan
+    },
+    'degrees': {
+        **_COMMON,
+        'sin': _deg_in(math.sin), 'cos': _deg_in(math.cos), 'tan': _deg_in(math.tan),
+        'asin': _deg_out(math.asin), 'acos': _deg_out(math.acos), 'atan': _deg_out(math.atan)
+    }
+}
+
+_EVAL_NAMESPACES = {mode: dict(names, _F=Fraction, _pow=_checked_pow) for mode, names in NAMESPACES.items()}
+
+_FUNCTION_NAMES = frozenset(name for name, value in NAMESPACES['radians'].items() if callable(value))
+_CONSTANT_NAMES = frozenset(['pi', 'e'])
+_BINOPS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod)
+_UNARYOPS = (ast.UAdd, ast.USub)
+
+
+class _Validator(ast.NodeVisitor):
+    """Reject anything outside the whitelist and note whether the tree is purely rational."""
+
+    def __init__(self, variables=()):
+        self.variables = frozenset(variables)
+        self.rational = True
+        self.used_variables = set()
+
+    def generic_visit(self, node):
+        raise UnsupportedExpression(f'Unsupported syntax: {type(node).__name__}')
+
+    def visit_Expression(self, node):
+        self.visit(node.body)
+
+    def visit_BinOp(self, node):
+        if not isinstance(node.op, _BINOPS):
+            raise UnsupportedExpression(f'Unsupported operator: {type(node.op).__name__}')
+        self.visit(node.left)
+        self.visit(node.right)
+
+    def visit_UnaryOp(self, node):
+        if not isinstance(node.op, _UNARYOPS):
+            raise UnsupportedExpression(f'Unsupported operator: {type(node.op).__name__}')
+        self.visit(node.operand)
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise UnsupportedExpression('Only numeric constants are allowed')
+
+    def visit_Name(self, node):
+        if node.id in self.variables:
+            self.used_variables.add(node.id)
+        elif node.id not in _CONSTANT_NAMES:
+            raise UnsupportedExpression(f'Unknown name: {node.id}')
+        self.rational = False
+
+    def visit_Call(self, node):
+        if not isinstance(node.func, ast.Name) or node.func.id not in _FUNCTION_NAMES:
+            raise UnsupportedExpression('Unsupported function call')
+        if node.keywords or len(node.args) != 1:
+            raise UnsupportedExpression('Functions take exactly one argument')
+        self.rational = False
+        self.visit(node.args[0])
+
+
+def validate(expr_str, variables=()):
+    """
+    Parse and whitelist-check an expression that may use the given variable names.
+    Returns (tree, used_variables, rational). Raises UnsupportedExpression.
+    """
+    try:
+        tree = ast.parse(expr_str.strip(), mode='eval')
+    except SyntaxError as e:
+        raise UnsupportedExpression(f'Invalid syntax: {e.msg}')
+    validator = _Validator(variables)
+    validator.visit(tree)
+    return tree, frozenset(validator.used_variables), validator.rational
+
+
+class _Rewriter(ast.NodeTransformer):
+    """Route ** through _checked_pow and wrap literals as Fraction (exact) or float."""
+
+    def __init__(self, exact):
+        self.exact = exact
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Pow):
+            return ast.Call(func=ast.Name(id='_pow', ctx=ast.Load()), args=[node.left, node.right], keywords=[])
+        return node
+
+    def visit_Constant(self, node):
+        if self.exact:
+            return ast.Call(func=ast.Name(id='_F', ctx=ast.Load()), args=[ast.Constant(repr(node.value))], keywords=[])
+        return ast.Constant(float(node.value))
+
+
+@lru_cache(maxsize=4096)
+def compile_constant(expr_str):
+    """Validate and compile a variable-free expression. Returns (code, exact)."""
+    tree, _, exact = validate(expr_str)
+    tree = ast.fix_missing_locations(_Rewriter(exact).visit(tree))
+    return compile(tree, '<constant>', 'eval'), exact
+
+
+def evaluate_constant(expr_str, *, angle_mode):
+    """
+    Evaluate a variable-free expression, with trig arguments in angle_mode
+    ('degrees' or 'radians'; required, as the two give different answers).
+    Returns a Fraction for exact rational arithmetic, otherwise a float. Raises
+    UnsupportedExpression, ValueError or ZeroDivisionError when the expression
+    cannot be evaluated numerically.
+    """
+    code = compile_constant(expr_str)[0]
+    try:
+        value = eval(code, {'__builtins__': {}}, _EVAL_NAMESPACES[angle_mode])
+    except OverflowError:
+        raise UnsupportedExpression('Result is too large to evaluate numerically')
+    if isinstance(value, complex):
+        raise UnsupportedExpression('Result is not a real number')
+    if isinstance(value, Fraction):
+        # Products of allowed powers can still outgrow the cap
+        if _bits(value) > MAX_EXACT_BITS:
+            raise ResultTooLarge('Result too large for exact evaluation')
+        return value
+    value = float(value)
+    if math.isnan(value) or math.isinf(value):
+        raise UnsupportedExpression('Result is not a finite number')
+    return value
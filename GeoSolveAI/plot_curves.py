@@ -0,0 +1,138 @@
+"""
+Overlay, parametric and polar curves for /api/plot.
+
+A request may list several curves:
+
+    "sin x"                                        function of x
+    {"expr": "cos x", "label": "cos"}              function of x
+    {"type": "parametric", "x": "cos t", "y": "sin 2t", "from": 0, "to": 360}
+    {"type": "polar", "r": "1 + cos theta"}
+
+Every component is compiled once through the shared expression compiler.
+Components whose parameter runs over the same interval are sampled together
+on one shared adaptive grid (adaptive_sampling.sample_many), so an extra curve
+costs one more vectorized evaluation per grid point rather than a new sampling
+pass. As with single plots, in degrees mode the parameter is shown in degrees
+and trig functions receive it converted to radians.
+"""
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+import adaptive_sampling
+from expression_normalizer import normalize_expression
+
+MAX_CURVES = 8
+
+CURVE_TYPES = {
+    'function': ('x', ('y',), 'expr'),
+    'parametric': ('t', ('x', 'y'), None),
+    'polar': ('theta', ('r',), None)
+}
+
+Curve = namedtuple('Curve', ['kind', 'label', 'x', 'y', 'evaluations', 'breaks'])
+
+
+def _default_range(mode):
+    return (0.0, 360.0) if mode == 'degrees' else (0.0, 2 * np.pi)
+
+
+def _number(value, default):
+    if value is None or value == '':
+        return default
+    return float(value)
+
+
+def parse_specs(specs, x_range, mode):
+    """
+    Validate and normalize curve specs. Returns a list of dicts with type, exprs
+    (component -> normalized expression), range and label. Raises ValueError.
+    """
+    if not isinstance(specs, list) or not specs:
+        raise ValueError('curves must be a non-empty list')
+    if len(specs) > MAX_CURVES:
+        raise ValueError(f'At most {MAX_CURVES} curves can be plotted together')
+
+    parsed = []
+    for spec in specs:
+        if isinstance(spec, str):
+            spec = {'expr': spec}
+        if not isinstance(spec, dict):
+            raise ValueError('Each curve must be an expression string or an object')
+        kind = spec.get('type', 'function')
+        if kind not in CURVE_TYPES:
+            raise ValueError(f"Unknown curve type '{kind}'. Use function, parametric or polar")
+
+        _, components, alias = CURVE_TYPES[kind]
+        exprs = {}
+        for component in components:
+            raw = spec.get(component, spec.get(alias) if alias else None)
+            if not isinstance(raw, str) or not raw.strip():
+                raise ValueError(f"A {kind} curve needs '{alias or component}'")
+            exprs[component] = normalize_expression(raw.strip(), degree_angles=False, space_multiplies=True)
+
+        if kind == 'function':
+            start, stop = x_range
+        else:
+            default_start, default_stop = _default_range(mode)
+            start, stop = _number(spec.get('from'), default_start), _number(spec.get('to'), default_stop)
+        if start == stop:
+            raise ValueError('A curve range must not be empty')
+
+        parsed.append({'type': kind, 'exprs': exprs, 'from': start, 'to': stop, 'label': spec.get('label') or _label(kind, exprs)})
+    return parsed
+
+
+def _label(kind, exprs):
+    if kind == 'parametric':
+        return f"({exprs['x']}, {exprs['y']})"
+    if kind == 'polar':
+        return f"r = {exprs['r']}"
+    return f"y = {exprs['y']}"
+
+
+def build_curves(specs, mode, budget, compiler):
+    """
+    Compile and sample parsed specs. Returns (curves, y_limits) where y_limits is
+    the clipped view around poles of function curves, or None.
+    Raises ValueError for expressions outside the whitelist.
+    """
+    # Group every component by its parameter interval; each group shares one grid
+    groups = OrderedDict()
+    for index, spec in enumerate(specs):
+        variable = CURVE_TYPES[spec['type']][0]
+        for component, expr in spec['exprs'].items():
+            compiled = compiler.compile(expr, (variable,))
+            groups.setdefault((spec['from'], spec['to']), []).append((index, component, compiled))
+
+    def as_radians(compiled):
+        if mode == 'degrees':
+            return lambda values: compiled(np.radians(values))
+        return compiled
+
+    samples = [dict() for _ in specs]
+    limits = []
+    for (start, stop), rows in groups.items():
+        shared = adaptive_sampling.sample_many([as_radians(c) for _, _, c in rows], start, stop, budget)
+        for (index, component, _), ys, breaks, y_limits in zip(rows, shared.ys, shared.breaks, shared.y_limits):
+            samples[index][component] = ys
+            samples[index]['t'] = shared.x
+            samples[index]['evaluations'] = shared.evaluations
+            samples[index]['breaks'] = samples[index].get('breaks', 0) + breaks
+            if y_limits is not None and specs[index]['type'] == 'function':
+                limits.append(y_limits)
+
+    curves = []
+    for spec, sampled in zip(specs, samples):
+        t = sampled['t']
+        if spec['type'] == 'function':
+            x, y = t, sampled['y']
+        elif spec['type'] == 'parametric':
+            x, y = sampled['x'], sampled['y']
+        else:
+            theta = np.radians(t) if mode == 'degrees' else t
+            x, y = sampled['r'] * np.cos(theta), sampled['r'] * np.sin(theta)
+        curves.append(Curve(spec['type'], spec['label'], x, y, sampled['evaluations'], sampled['breaks']))
+
+    y_limits = (min(low for low, _ in limits), max(high for _, high in limits)) if limits else None
+    return curves, y_limits
@@ -0,0 +1,95 @@
+"""
+Sampled-curve payloads for /api/plot with format=data.
+
+The frontend can draw the curve itself from the sampled points, so nothing is
+rasterized. Samples are packed as little-endian float32 (half the size of
+float64 and plenty for screen coordinates) either as base64 strings inside
+JSON, as a raw application/octet-stream body (x block followed by y block),
+or as plain JSON arrays. Non-finite y values (poles, domain errors) become
+NaN in the binary forms and null in JSON, which clients treat as line breaks.
+"""
+import base64
+import json
+
+import numpy as np
+
+ENCODINGS = ('base64', 'binary', 'json')
+DTYPE = '<f4'
+
+
+def as_float32(values, length):
+    """Coerce samples to a contiguous little-endian float32 array with NaN for non-finite values."""
+    with np.errstate(over='ignore', invalid='ignore'):
+        arr = np.broadcast_to(np.asarray(values, dtype=float), (length,)).astype(DTYPE)
+    arr[~np.isfinite(arr)] = np.nan
+    return arr
+
+
+def _json_values(arr):
+    # 7 significant digits is all float32 carries; longer float64 reprs only add bytes
+    return [None if v != v else float(f'{v:.7g}') for v in arr.tolist()]
+
+
+def content_type(encoding, body):
+    """(mimetype, headers) for an encoded payload; binary bodies hold 2 * count float32 values."""
+    if encoding == 'binary':
+        count = len(body) // (2 * np.dtype(DTYPE).itemsize)
+        return 'application/octet-stream', {'X-Point-Count': str(count), 'X-Sample-Layout': 'x[count],y[count] float32le'}
+    return 'application/json', {}
+
+
+def encode_samples(x, y, encoding='base64', meta=None):
+    """
+    Encode sampled points. Returns (body_bytes, mimetype, headers).
+    Raises ValueError for an unknown encoding.
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown encoding '{encoding}'. Use one of: {', '.join(ENCODINGS)}")
+    x32 = as_float32(x, len(x))
+    y32 = as_float32(y, len(x))
+    meta = dict(meta or {}, count=len(x32))
+
+    if encoding == 'binary':
+        body = x32.tobytes() + y32.tobytes()
+        return (body, *content_type(encoding, body))
+
+    if encoding == 'json':
+        points = {'x': _json_values(x32), 'y': _json_values(y32)}
+    else:
+        points = {
+            'dtype': 'float32le',
+            'x': base64.b64encode(x32.tobytes()).decode('ascii'),
+            'y': base64.b64encode(y32.tobytes()).decode('ascii')
+        }
+    body = json.dumps({**meta, **points}).encode('utf-8')
+    return (body, *content_type(encoding, body))
+
+
+def encode_curves(curves, encoding='base64', meta=None):
+    """
+    Encode several sampled curves (objects with kind, label, x and y) in one payload.
+    Binary bodies hold an x block and a y block per curve, in order, with the point
+    counts in X-Curve-Counts. Returns (body_bytes, mimetype, headers).
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown encoding '{encoding}'. Use one of: {', '.join(ENCODINGS)}")
+    packed = [(curve, as_float32(curve.x, len(curve.x)), as_float32(curve.y, len(curve.x))) for curve in curves]
+
+    if encoding == 'binary':
+        body = b''.join(x32.tobytes() + y32.tobytes() for _, x32, y32 in packed)
+        return body, 'application/octet-stream', {
+            'X-Curve-Counts': ','.join(str(len(x32)) for _, x32, _ in packed),
+            'X-Sample-Layout': 'per curve: x[count],y[count] float32le'
+        }
+
+    items = []
+    for curve, x32, y32 in packed:
+        item = {'type': curve.kind, 'label': curve.label, 'count': len(x32)}
+        if encoding == 'json':
+            item.update(x=_json_values(x32), y=_json_values(y32))
+        else:
+            item.update(dtype='float32le', x=base64.b64encode(x32.tobytes()).decode('ascii'),
+                        y=base64.b64encode(y32.tobytes()).decode('ascii'))
+        items.append(item)
+    body = json.dumps({**(meta or {}), 'curves': items}).encode('utf-8')
+    return body, 'application/json', {}
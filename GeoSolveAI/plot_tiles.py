@@ -0,0 +1,93 @@
+"""
+Level-of-detail tiles for zooming and panning plots.
+
+The x axis is cut into tiles like a slippy map: at zoom level z a tile spans
+BASE_SPAN[mode] / 2**z, and tile i covers [i * width, (i + 1) * width]. Every
+tile gets the same point budget, so each zoom level samples twice as densely
+as the one above it, and a tile is fully determined by (expression, mode,
+zoom, index). Panning only needs the newly exposed tiles, and zooming only
+needs the tiles of the new level; both come from the render cache once
+computed. Adjacent tiles share their edge sample, so curves join seamlessly.
+
+Tiles carry sampled points rather than pixels (the frontend draws them, as
+with format=data), so y is not tiled.
+"""
+import threading
+
+import numpy as np
+
+import adaptive_sampling
+
+# Width of one zoom-0 tile: one full turn
+BASE_SPAN = {'degrees': 360.0, 'radians': 2 * np.pi}
+MIN_ZOOM = -10
+MAX_ZOOM = 24
+MAX_TILE_INDEX = 1 << 20
+TILE_POINTS = 256
+
+
+def tile_bounds(zoom, index, mode):
+    """x range [start, stop] of a tile in display units. Raises ValueError if out of range."""
+    if not MIN_ZOOM <= zoom <= MAX_ZOOM:
+        raise ValueError(f'zoom must be between {MIN_ZOOM} and {MAX_ZOOM}')
+    if abs(index) > MAX_TILE_INDEX:
+        raise ValueError(f'tile index must be within +/-{MAX_TILE_INDEX}')
+    width = BASE_SPAN[mode] / 2.0 ** zoom
+    return index * width, (index + 1) * width
+
+
+def sample_tile(f, zoom, index, mode, budget=TILE_POINTS):
+    """Adaptively sample f over one tile. Returns an adaptive_sampling.SampledCurve."""
+    start, stop = tile_bounds(zoom, index, mode)
+    return adaptive_sampling.sample(f, start, stop, budget=budget)
+
+
+def neighbours(zoom, index):
+    """Tiles a viewer is likely to ask for next: both sides at this level and the two children."""
+    candidates = [(zoom, index - 1), (zoom, index + 1)]
+    if zoom < MAX_ZOOM:
+        candidates += [(zoom + 1, 2 * index), (zoom + 1, 2 * index + 1)]
+    return [(z, i) for z, i in candidates if abs(i) <= MAX_TILE_INDEX]
+
+
+class TilePrefetcher:
+    """
+    Computes tiles in the background on a shared executor. Requests for a tile
+    that is already queued or running are dropped, and the queue is bounded so
+    a fast pan cannot pile up unbounded work.
+    """
+
+    def __init__(self, executor, max_pending=64):
+        self.executor = executor
+        self.max_pending = max_pending
+        self._pending = set()
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.skipped = 0
+
+    def prefetch(self, key, compute):
+        """Run compute() in the background unless key is already pending. Returns whether it was queued."""
+        with self._lock:
+            if key in self._pending or len(self._pending) >= self.max_pending:
+                self.skipped += 1
+                return False
+            self._pending.add(key)
+            self.submitted += 1
+
+        def run():
+            try:
+                compute()
+            except Exception:
+                # Prefetching is best-effort; a real request will surface the error
+                pass
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+        self.executor.submit(run)
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {'submitted': self.submitted, 'skipped': self.skipped, 'pending': len(self._pending),
+                    'max_pending': self.max_pending}
@@ -0,0 +1,229 @@
+"""
+Grading for /api/quiz-submit.
+
+Scoring used to run one SELECT per answered question. Here a quiz's whole
+answer key is loaded in one query and kept in a bounded LRU (invalidated
+when a quiz is created or deleted), and a submission is graded with one
+vectorized comparison against it. Graded submissions are written by a single
+writer thread that commits whatever has queued up in one transaction, so a
+class submitting at the bell costs a handful of commits instead of one each.
+"""
+import queue
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+# question_ids: sorted int64 array; answers: object array aligned with it
+AnswerKey = namedtuple('AnswerKey', 'question_ids answers')
+# attempted/correct: ids (int64 arrays) of the quiz's questions that were answered / answered correctly
+Grade = namedtuple('Grade', 'score attempted correct')
+# One quiz_submissions row plus its Grade, as handed to SubmissionWriter's on_write hook
+Submission = namedtuple('Submission', 'quiz_id user_email responses score attempted correct')
+
+_KEY_QUERY = '''SELECT qq.id, qq.correct_answer
+                FROM quizzes q
+                LEFT JOIN quiz_questions qq ON qq.quiz_id = q.id
+                WHERE q.id = ? ORDER BY qq.id'''
+
+
+def load_answer_key(conn, quiz_id):
+    """Answer key of a quiz in one query, or None if the quiz does not exist."""
+    rows = conn.execute(_KEY_QUERY, (quiz_id,)).fetchall()
+    if not rows:
+        return None
+    # A quiz without questions comes back as one row of NULLs from the LEFT JOIN
+    rows = [row for row in rows if row[0] is not None]
+    return AnswerKey(np.array([row[0] for row in rows], dtype=np.int64),
+                     np.array([row[1] for row in rows], dtype=object))
+
+
+def grade(key, responses):
+    """
+    Grade responses ({question id string: answer}) against the key. Answers to
+    questions outside the quiz count as wrong and as not attempted. Raises
+    ValueError naming the first question id that is not an integer.
+    """
+    ids = np.empty(len(responses), dtype=np.int64)
+    for k, qid_str in enumerate(responses):
+        try:
+            ids[k] = int(qid_str)
+        except (ValueError, TypeError, OverflowError):
+            raise ValueError(f'Invalid question ID: {qid_str}') from None
+    if not len(key.question_ids) or not len(ids):
+        return Grade(0, ids[:0], ids[:0])
+    # Element by element: a slice assignment would broadcast list-valued answers into the array
+    answers = np.empty(len(responses), dtype=object)
+    for k, answer in enumerate(responses.values()):
+        answers[k] = answer
+    pos = np.minimum(np.searchsorted(key.question_ids, ids), len(key.question_ids) - 1)
+    attempted = key.question_ids[pos] == ids
+    correct = attempted & (key.answers[pos] == answers)
+    return Grade(int(np.count_nonzero(correct)), ids[attempted], ids[correct])
+
+
+def score(key, responses):
+    """Number of responses matching the key (see grade())."""
+    return grade(key, responses).score
+
+
+class AnswerKeyCache:
+    """Bounded LRU of quiz answer keys."""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by invalidate() so a load that raced with it is not stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, database, quiz_id):
+        """Answer key of quiz_id, loading it on a miss. None if the quiz does not exist."""
+        with self._lock:
+            key = self._entries.get(quiz_id)
+            if key is not None:
+                self._entries.move_to_end(quiz_id)
+                self.hits += 1
+                return key
+            self.misses += 1
+            generation = self._generation
+
+        with database.connection() as conn:
+            key = load_answer_key(conn, quiz_id)
+        if key is not None:
+            with self._lock:
+                if generation == self._generation:
+                    self._entries[quiz_id] = key
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+        return key
+
+    def invalidate(self, quiz_id):
+        with self._lock:
+            self._entries.pop(quiz_id, None)
+            self._generation += 1
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries
+            }
+
+
+class _Pending:
+    __slots__ = ('row', 'done', 'submission_id', 'error')
+
+    def __init__(self, row):
+        self.row = row
+        self.done = threading.Event()
+        self.submission_id = None
+        self.error = None
+
+
+class SubmissionWriter:
+    """
+    Group commit for quiz_submissions rows. submit() blocks until the row is
+    committed and returns its id; meanwhile a writer thread takes everything
+    queued (up to max_batch) and inserts it in one transaction, so rows that
+    arrive while a commit is in flight share the next one. on_write(conn,
+    submissions), if given, runs inside that transaction with the batch's
+    Submission tuples (e.g. to update rollups atomically with the rows).
+    If a batch fails, its rows are retried one transaction each, so only
+    the submissions that fail on their own see the error.
+    """
+
+    INSERT = '''INSERT INTO quiz_submissions (quiz_id, user_email, responses, score)
+                VALUES (?, ?, ?, ?)'''
+
+    def __init__(self, database, max_batch=256, on_write=None):
+        self.database = database
+        self.max_batch = max_batch
+        self.on_write = on_write
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.written = 0
+        self.failed = 0
+        self.retried_batches = 0
+        self.largest_batch = 0
+
+    def submit(self, quiz_id, user_email, responses_json, grade):
+        """Write one graded submission (a Grade, or a bare score) and return its id once committed."""
+        if not isinstance(grade, Grade):
+            grade = Grade(grade, (), ())
+        self._ensure_started()
+        pending = _Pending(Submission(quiz_id, user_email, responses_json, *grade))
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.submission_id
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='submission-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch):
+        try:
+            ids = self._insert(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                with self._stats_lock:
+                    self.failed += 1
+                batch[0].error = e
+                batch[0].done.set()
+                return
+            # One bad row must not fail everyone it happened to share a commit with: retry each alone
+            with self._stats_lock:
+                self.retried_batches += 1
+            for pending in batch:
+                self._write([pending])
+            return
+        with self._stats_lock:
+            self.batches += 1
+            self.written += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+        for pending, submission_id in zip(batch, ids):
+            pending.submission_id = submission_id
+            pending.done.set()
+
+    def _insert(self, batch):
+        with self.database.transaction() as conn:
+            # lastrowid per row, so one execute each; the transaction is what is shared
+            ids = [conn.execute(self.INSERT, pending.row[:4]).lastrowid for pending in batch]
+            if self.on_write is not None:
+                self.on_write(conn, [pending.row for pending in batch])
+        return ids
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'batches': self.batches,
+                'written': self.written,
+                'failed': self.failed,
+                'retried_batches': self.retried_batches,
+                'largest_batch': self.largest_batch,
+                'queued': self._queue.qsize()
+            }
@@ -0,0 +1,142 @@
+"""
+Rendered-output cache for /api/plot, /api/geometry and /api/render.
+
+A render is fully determined by its inputs (normalized expression, range,
+angle mode, output format and size), so the hash of those inputs is used both
+as the cache key and as the response ETag. The in-memory tier is an LRU
+bounded by total bytes; an optional directory tier keeps renders across
+restarts and is shared by every server process pointed at it. Each entry
+keeps the mimetype and extra headers it must be served with.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+# Bump when the rendered output changes so stale disk entries are ignored
+RENDER_VERSION = 5
+
+
+def render_key(*parts):
+    """Content address for a render: sha256 over the version and every input that affects the output."""
+    canonical = json.dumps([RENDER_VERSION, *parts], separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """Byte-bounded LRU of rendered payloads (body, mimetype, headers) with an optional on-disk tier."""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, disk_dir=None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], key)
+
+    def _load_disk(self, key):
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), 'rb') as f:
+                header, body = f.read().split(b'\n', 1)
+            meta = json.loads(header)
+        except (OSError, ValueError):
+            return None
+        return body, meta['mimetype'], meta['headers']
+
+    def _store_disk(self, key, entry):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file and rename so readers never see a partial render
+            body, mimetype, headers = entry
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'wb') as f:
+                # One JSON header line (mimetype, headers), then the raw body
+                f.write(json.dumps({'mimetype': mimetype, 'headers': headers}).encode('utf-8') + b'\n')
+                f.write(body)
+            os.replace(tmp_path, path)
+        except OSError:
+            # The disk tier is best-effort; the in-memory copy is still served
+            pass
+
+    def _remember(self, key, entry):
+        """Insert into the in-memory tier and evict least-recently-used entries. Caller holds the lock."""
+        size = len(entry[0])
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._bytes -= len(self._entries.pop(key)[0])
+        self._entries[key] = entry
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted[0])
+            self.evictions += 1
+
+    def __contains__(self, key):
+        """Whether key is stored in either tier, without touching the LRU order or counters."""
+        with self._lock:
+            if key in self._entries:
+                return True
+        return bool(self.disk_dir) and os.path.exists(self._disk_path(key))
+
+    def get(self, key):
+        """Return the cached (body, mimetype, headers) for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        entry = self._load_disk(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, entry)
+        return entry
+
+    def put(self, key, body, mimetype='application/json', headers=None):
+        """Store a rendered body (bytes) under key together with how it is served."""
+        entry = (body, mimetype, dict(headers or {}))
+        with self._lock:
+            self._remember(key, entry)
+        self._store_disk(key, entry)
+
+    def clear(self):
+        """Drop the in-memory tier (the disk tier is left untouched)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Return hit/miss counters and current occupancy."""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'disk': bool(self.disk_dir)
+            }
@@ -0,0 +1,137 @@
+"""
+Thread-safe matplotlib rendering without pyplot.
+
+pyplot keeps one global "current figure" state machine, which is not safe to
+drive from several request threads at once, and building a Figure per request
+costs more than drawing on it. Instead one process-wide pool keeps pre-built
+Figure + FigureCanvasAgg pairs per figure size; a render borrows one (it is
+then owned by that thread alone), clears its axes, draws, encodes and hands
+it back. The number of idle figures kept is capped per size and in total.
+
+Layout uses fixed margins set once per figure rather than tight_layout() or
+bbox_inches='tight', both of which add an extra layout/draw pass per render.
+
+A drawn figure can be encoded in three tiers: full-resolution PNG, a
+low-dpi PNG thumbnail for history lists, and SVG, which for line art is
+usually smaller than the PNG and scales without blurring.
+"""
+import base64
+import io
+import threading
+from contextlib import contextmanager
+
+import matplotlib
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+# Margins (fractions of the figure) used in place of tight layout
+DEFAULT_MARGINS = {'left': 0.08, 'right': 0.97, 'bottom': 0.1, 'top': 0.9}
+
+IMAGE_FORMATS = ('png', 'svg', 'thumb')
+MIMETYPES = {'png': 'image/png', 'svg': 'image/svg+xml', 'thumb': 'image/png'}
+# Thumbnails are the full render at this fraction of its dpi
+THUMB_SCALE = 0.3
+
+# Keep SVG text as <text> rather than glyph paths, and make element ids repeatable
+# so identical renders produce identical bytes (the SVG is content-addressed)
+matplotlib.rcParams['svg.fonttype'] = 'none'
+matplotlib.rcParams['svg.hashsalt'] = 'geosolve'
+
+
+class FigurePool:
+    """Process-wide pool of reusable single-axes figures, keyed by (figsize, dpi, margins)."""
+
+    def __init__(self, max_per_key=4, max_idle=16):
+        self.max_per_key = max_per_key
+        self.max_idle = max_idle
+        self._free = {}
+        self._idle = 0
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+
+    def _build(self, figsize, dpi, margins):
+        fig = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(fig)
+        fig.subplots_adjust(**margins)
+        ax = fig.add_subplot()
+        with self._lock:
+            self.created += 1
+        return fig, ax
+
+    @contextmanager
+    def axes(self, figsize, dpi=100, margins=None):
+        """Borrow a cleared (fig, ax) pair for the duration of the with-block."""
+        margins = margins or DEFAULT_MARGINS
+        key = (tuple(figsize), dpi, tuple(sorted(margins.items())))
+        with self._lock:
+            free = self._free.get(key)
+            borrowed = free.pop() if free else None
+            if borrowed is not None:
+                self._idle -= 1
+                self.reused += 1
+        fig, ax = borrowed or self._build(figsize, dpi, margins)
+        try:
+            yield fig, ax
+        finally:
+            # Callers draw on ax only, so clearing it restores a blank figure - except for the
+            # aspect settings, which clear() keeps (overlays and shapes set an equal aspect)
+            ax.clear()
+            ax.set_aspect('auto')
+            ax.set_adjustable('box')
+            with self._lock:
+                free = self._free.setdefault(key, [])
+                if len(free) < self.max_per_key and self._idle < self.max_idle:
+                    free.append((fig, ax))
+                    self._idle += 1
+                else:
+                    self.discarded += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'created': self.created,
+                'reused': self.reused,
+                'discarded': self.discarded,
+                'idle': self._idle,
+                'max_per_key': self.max_per_key,
+                'max_idle': self.max_idle
+            }
+
+
+def render_png(fig, dpi=100):
+    """Rasterize a figure to PNG bytes through its own Agg canvas."""
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=dpi)
+    return buf.getvalue()
+
+
+def render_svg(fig):
+    """Vector render of a figure, without the timestamp matplotlib adds by default."""
+    buf = io.BytesIO()
+    fig.savefig(buf, format='svg', metadata={'Date': None})
+    return buf.getvalue()
+
+
+def render_image(fig, image_format='png', dpi=100):
+    """
+    Encode a figure in one of IMAGE_FORMATS. Returns (bytes, mimetype).
+    Raises ValueError for an unknown format.
+    """
+    if image_format == 'svg':
+        body = render_svg(fig)
+    elif image_format == 'thumb':
+        body = render_png(fig, max(1, round(dpi * THUMB_SCALE)))
+    elif image_format == 'png':
+        body = render_png(fig, dpi)
+    else:
+        raise ValueError(f"Unknown image format '{image_format}'. Use one of: {', '.join(IMAGE_FORMATS)}")
+    return body, MIMETYPES[image_format]
+
+
+def data_url(body, mimetype):
+    return f'data:{mimetype};base64,' + base64.b64encode(body).decode('utf-8')
+
+
+figure_pool = FigurePool()
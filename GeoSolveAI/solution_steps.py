@@ -0,0 +1,156 @@
+"""
+Step-by-step explanations for /api/solve/stream.
+
+Each explainer is a generator that yields one step dict at a time while the
+engine is working, so the first steps reach the client long before a slow
+operation finishes. Integration steps come from SymPy's manual integrator
+(integral_steps), which records the rule applied at every node: substitution,
+integration by parts, constant multiple, sum rule and so on.
+"""
+import dataclasses
+
+import sympy as sp
+from sympy.integrals.manualintegrate import Rule, integral_steps
+
+from solver_strategy import classify, solve_polynomial_fast
+
+# Deepest rule tree walked before the remaining substeps are summarised
+MAX_RULE_DEPTH = 12
+
+_RULE_NAMES = {
+    'ConstantRule': 'Constant rule',
+    'ConstantTimesRule': 'Constant multiple rule',
+    'PowerRule': 'Power rule',
+    'AddRule': 'Sum rule',
+    'URule': 'Substitution',
+    'PartsRule': 'Integration by parts',
+    'CyclicPartsRule': 'Integration by parts (cyclic)',
+    'RewriteRule': 'Rewrite',
+    'AlternativeRule': 'Alternative forms',
+    'DontKnowRule': 'No elementary rule'
+}
+
+
+def _step(stage, text, **extra):
+    return {'stage': stage, 'text': text, **extra}
+
+
+def _rule_name(rule):
+    name = type(rule).__name__
+    if name in _RULE_NAMES:
+        return _RULE_NAMES[name]
+    # SinRule -> "Sin rule", ReciprocalRule -> "Reciprocal rule"
+    return name[:-4] + ' rule' if name.endswith('Rule') else name
+
+
+def _rule_detail(rule):
+    name = type(rule).__name__
+    if name == 'URule':
+        return f'let u = {rule.u_func}'
+    if name in ('PartsRule', 'CyclicPartsRule'):
+        return f'u = {rule.u}, dv = {rule.dv} d{rule.variable}'
+    if name == 'ConstantTimesRule':
+        return f'factor out {rule.constant}'
+    if name == 'RewriteRule':
+        return f'rewrite as {rule.rewritten}'
+    if name == 'AddRule':
+        return f'integrate {len(rule.substeps)} terms separately'
+    return None
+
+
+def _child_rules(rule):
+    for field in dataclasses.fields(rule):
+        value = getattr(rule, field.name)
+        if isinstance(value, Rule):
+            yield value
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                if isinstance(item, Rule):
+                    yield item
+
+
+def _walk_rules(rule, depth=0):
+    """Pre-order walk of a manualintegrate rule tree, yielding (depth, rule)."""
+    yield depth, rule
+    if depth >= MAX_RULE_DEPTH:
+        return
+    for child in _child_rules(rule):
+        yield from _walk_rules(child, depth + 1)
+
+
+def explain_integrate(expr, symbol):
+    yield _step('classify', f'Integrand: {expr}, integrating with respect to {symbol}')
+    rule = integral_steps(expr, symbol)
+    if type(rule).__name__ == 'DontKnowRule':
+        yield _step('rule', 'No elementary rule applies; using the general Risch/heuristic integrator')
+        return
+    for depth, node in _walk_rules(rule):
+        text = f'{_rule_name(node)}: ∫ {node.integrand} d{node.variable}'
+        detail = _rule_detail(node)
+        if detail:
+            text += f' ({detail})'
+        yield _step('rule', text, depth=depth, rule=type(node).__name__)
+
+
+def _derivative_rule(term, symbol):
+    if not term.has(symbol):
+        return 'Constant rule'
+    if term.is_Pow and term.base.has(symbol) and not term.exp.has(symbol):
+        return 'Power rule' if term.base == symbol else 'Power rule with chain rule'
+    if term.is_Mul:
+        varying = [f for f in term.args if f.has(symbol)]
+        if len(varying) > 1:
+            return 'Product rule'
+        return 'Constant multiple rule'
+    if isinstance(term, sp.Function) and term.args and term.args[0] != symbol:
+        return 'Chain rule'
+    return 'Standard derivative'
+
+
+def explain_differentiate(expr, symbol):
+    terms = sp.Add.make_args(expr)
+    if len(terms) > 1:
+        yield _step('rule', f'Sum rule: differentiate {len(terms)} terms separately')
+    for term in terms:
+        yield _step('rule', f'{_derivative_rule(term, symbol)}: d/d{symbol} [{term}] = {sp.diff(term, symbol)}',
+                    depth=1 if len(terms) > 1 else 0)
+
+
+def explain_solve(expr, symbol):
+    classification, degree = classify(expr, symbol)
+    text = f'Equation type: {classification}'
+    if degree is not None:
+        text += f' of degree {degree}'
+    yield _step('classify', text)
+    fast = solve_polynomial_fast(expr, symbol)
+    if fast is not None:
+        yield _step('rule', f"Closed-form {fast['tier']}: {', '.join(fast['solutions'])}")
+
+
+def explain_factor(expr, symbol=None):
+    factored = sp.factor(expr)
+    for factor, multiplicity in sp.factor_list(expr)[1]:
+        yield _step('rule', f'Factor: {factor}' + (f' (multiplicity {multiplicity})' if multiplicity > 1 else ''))
+    if factored == expr:
+        yield _step('rule', 'Expression is already irreducible over the rationals')
+
+
+def explain_simplify(expr, symbol=None):
+    for name, func in (('Expand', sp.expand), ('Cancel', sp.cancel), ('Trigonometric simplification', sp.trigsimp)):
+        rewritten = func(expr)
+        if rewritten != expr:
+            yield _step('rule', f'{name}: {rewritten}')
+
+
+EXPLAINERS = {
+    'solve': explain_solve,
+    'integrate': explain_integrate,
+    'differentiate': explain_differentiate,
+    'factor': explain_factor,
+    'simplify': explain_simplify
+}
+
+
+def explain(operation, expr, symbol=None):
+    """Yield the engine's intermediate steps for an operation."""
+    return EXPLAINERS[operation](expr, symbol)
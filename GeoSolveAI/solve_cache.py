@@ -0,0 +1,148 @@
+"""
+Content-addressed result cache for /api/solve.
+
+Entries are keyed on the canonical SymPy form (srepr) of the parsed expression
+plus the operation name, so textually different inputs such as "x^2-5x+6" and
+"x**2 - 5*x + 6" share one entry. The in-memory tier is an LRU bounded by both
+entry count and total bytes; an optional SQLite tier keeps results across restarts.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import sympy as sp
+
+# Bump when the shape of cached values changes so stale persistent entries are ignored
+CACHE_VERSION = 4
+
+
+def cache_key(operation, expr):
+    """Build the content address for an (operation, parsed expression) pair."""
+    canonical = f'{CACHE_VERSION}\x00{operation}\x00{sp.srepr(expr)}'
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class SolveCache:
+    """LRU cache of JSON-serializable solve results with an optional SQLite tier."""
+
+    def __init__(self, max_entries=2048, max_bytes=16 * 1024 * 1024, db_path=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.db_path = db_path
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if db_path:
+            self._init_persistent()
+
+    def _init_persistent(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''CREATE TABLE IF NOT EXISTS solve_cache
+                        (key TEXT PRIMARY KEY,
+                         operation TEXT NOT NULL,
+                         value TEXT NOT NULL,
+                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+        conn.commit()
+        conn.close()
+
+    def _load_persistent(self, key):
+        if not self.db_path:
+            return None
+        try:
+            conn = sqlite3.connect(self.db_path)
+            row = conn.execute('SELECT value FROM solve_cache WHERE key = ?', (key,)).fetchone()
+            conn.close()
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+
+    def _store_persistent(self, key, operation, payload):
+        if not self.db_path:
+            return
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute('INSERT OR REPLACE INTO solve_cache (key, operation, value) VALUES (?, ?, ?)',
+                         (key, operation, payload))
+            conn.commit()
+            conn.close()
+        except sqlite3.Error:
+            # The persistent tier is best-effort; the in-memory result is still valid
+            pass
+
+    def _remember(self, key, payload):
+        """Insert into the in-memory tier and evict least-recently-used entries. Caller holds the lock."""
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._bytes -= len(self._entries.pop(key))
+        self._entries[key] = payload
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    def get(self, operation, expr):
+        """Return the cached result for (operation, expr), or None on a miss."""
+        key = cache_key(operation, expr)
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return json.loads(payload)
+
+        payload = self._load_persistent(key)
+        with self._lock:
+            if payload is None:
+                self.misses += 1
+                return None
+            self.persistent_hits += 1
+            self._remember(key, payload)
+        return json.loads(payload)
+
+    def put(self, operation, expr, value):
+        """Store a JSON-serializable result for (operation, expr)."""
+        key = cache_key(operation, expr)
+        payload = json.dumps(value)
+        with self._lock:
+            self._remember(key, payload)
+        self._store_persistent(key, operation, payload)
+
+    def get_or_compute(self, operation, expr, compute):
+        """Return the cached result, or call compute() and cache what it returns."""
+        value = self.get(operation, expr)
+        if value is None:
+            value = compute()
+            self.put(operation, expr, value)
+        return value
+
+    def clear(self):
+        """Drop the in-memory tier (the persistent tier is left untouched)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Return hit/miss counters and current occupancy."""
+        with self._lock:
+            lookups = self.hits + self.persistent_hits + self.misses
+            return {
+                'hits': self.hits,
+                'persistent_hits': self.persistent_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.hits + self.persistent_hits) / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'persistent': bool(self.db_path)
+            }
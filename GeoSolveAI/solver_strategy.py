@@ -0,0 +1,265 @@
+"""
+Tiered equation solving for /api/solve.
+
+Equations are classified (polynomial, rational, transcendental) and sent to
+the cheapest solver that is still correct for that class:
+
+1. linear / quadratic formula     - closed form, microseconds
+2. sp.roots on a Poly             - cubic/quartic formulas, factorable polynomials
+3. numerator of a rational        - solved with the polynomial tiers, poles removed
+4. numeric bracketing             - sign changes on a grid refined with mpmath
+5. sp.solve                       - general last resort
+
+Systems of equations are split into linear systems, solved from their
+coefficient matrix (linsolve, or NumPy/SciPy for large numeric systems), and
+nonlinear systems, which fall back to sp.solve under the worker pool's timeout.
+
+Every result reports the tier that answered and how long it took. Bracketed
+roots also carry the interval searched and complete=False.
+"""
+import time
+
+import mpmath
+import numpy as np
+import sympy as sp
+
+# Interval scanned by the bracketing tier for transcendental equations
+NUMERIC_RANGE = (-10.0, 10.0)
+NUMERIC_GRID_POINTS = 4001
+NUMERIC_MAX_ROOTS = 50
+
+# Linear systems with at least this many unknowns (and numeric coefficients) use floating point
+LARGE_SYSTEM_SIZE = 40
+# Coefficient matrices sparser than this use scipy.sparse when SciPy is installed
+SPARSE_DENSITY = 0.2
+
+
+def _format_value(value):
+    return str(value.evalf(chop=True) if value.is_number else value)
+
+
+def format_solutions(solutions):
+    """Render solutions the way /api/solve always has: numbers evaluated, symbols kept exact."""
+    return [_format_value(sol) for sol in solutions]
+
+
+def _sort_key(sol):
+    if sol.is_number:
+        value = complex(sol.evalf())
+        return (0, value.real, value.imag)
+    return (1, 0.0, 0.0)
+
+
+def _result(solutions, tier, classification, start):
+    return {
+        'solutions': format_solutions(solutions),
+        'tier': tier,
+        'classification': classification,
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 3)
+    }
+
+
+def choose_variable(expr, preferred='x'):
+    """Pick the unknown to solve/integrate for: x if present, otherwise the first free symbol."""
+    symbols = sorted(expr.free_symbols, key=lambda s: s.name)
+    if not symbols:
+        return sp.Symbol(preferred)
+    for symbol in symbols:
+        if symbol.name == preferred:
+            return symbol
+    return symbols[0]
+
+
+def classify(expr, symbol):
+    """Return (classification, polynomial degree or None)."""
+    if expr.is_polynomial(symbol):
+        return 'polynomial', sp.Poly(expr, symbol).degree()
+    if expr.is_rational_function(symbol):
+        return 'rational', None
+    return 'transcendental', None
+
+
+def _formula_roots(poly):
+    """Closed-form roots for degree 1 and 2 with numeric coefficients, or None."""
+    # With symbolic coefficients the formula leaves forms like sqrt(y**2); sp.roots simplifies those
+    if not all(coeff.is_number for coeff in poly.all_coeffs()):
+        return None
+    degree = poly.degree()
+    if degree == 1:
+        a, b = poly.all_coeffs()
+        return [-b / a]
+    if degree == 2:
+        a, b, c = poly.all_coeffs()
+        discriminant = sp.expand(b ** 2 - 4 * a * c)
+        if discriminant.is_zero:
+            return [-b / (2 * a)]
+        root = sp.sqrt(discriminant)
+        return [(-b - root) / (2 * a), (-b + root) / (2 * a)]
+    return None
+
+
+def solve_polynomial_fast(expr, symbol):
+    """
+    Closed-form path for linear and quadratic polynomials. Cheap enough to run
+    inline on the request thread; returns None when the equation needs a later tier.
+    """
+    start = time.perf_counter()
+    if not expr.is_polynomial(symbol):
+        return None
+    poly = sp.Poly(expr, symbol)
+    roots = _formula_roots(poly)
+    if roots is None:
+        return None
+    roots = sorted(roots, key=_sort_key)
+    tier = 'linear-formula' if poly.degree() == 1 else 'quadratic-formula'
+    return _result(roots, tier, 'polynomial', start)
+
+
+def _polynomial_roots(poly):
+    """Roots via sp.roots when it finds all of them (counting multiplicity), else None."""
+    found = sp.roots(poly)
+    if sum(found.values()) != poly.degree():
+        return None
+    return sorted(found, key=_sort_key)
+
+
+def _bracket_roots(expr, symbol, interval=NUMERIC_RANGE):
+    """Find real roots in an interval from sign changes on a grid, refined with mpmath."""
+    f = sp.lambdify(symbol, expr, 'numpy')
+    f_mp = sp.lambdify(symbol, expr, 'mpmath')
+    xs = np.linspace(interval[0], interval[1], NUMERIC_GRID_POINTS)
+    with np.errstate(all='ignore'):
+        ys = np.asarray(f(xs), dtype=complex) * np.ones_like(xs)
+    real = np.isfinite(ys) & (np.abs(ys.imag) < 1e-12)
+    ys = ys.real
+
+    crossing = real[:-1] & real[1:] & (np.sign(ys[:-1]) * np.sign(ys[1:]) < 0)
+    candidates = np.nonzero(crossing)[0]
+    exact_hits = xs[real & (ys == 0)]
+    roots = list(exact_hits)
+    for i in candidates[:NUMERIC_MAX_ROOTS]:
+        try:
+            root = float(mpmath.findroot(f_mp, (xs[i], xs[i + 1]), solver='anderson'))
+        except (ValueError, ZeroDivisionError):
+            continue
+        # A sign change across a pole (tan, 1/x) is not a root
+        if xs[i] <= root <= xs[i + 1] and abs(complex(f_mp(root))) < 1e-8:
+            roots.append(root)
+
+    # Roots of even multiplicity (cos(x) = 1, sin(x)**2 = 0) touch zero without a sign change.
+    # They sit at local minima of |f| away from any crossing, where f' changes sign instead
+    magnitude = np.abs(ys)
+    touching = (real[1:-1] & real[:-2] & real[2:] & (ys[1:-1] != 0)
+                & (magnitude[1:-1] <= magnitude[:-2]) & (magnitude[1:-1] < magnitude[2:])
+                & ~crossing[:-1] & ~crossing[1:])
+    touch_points = np.nonzero(touching)[0] + 1
+    if len(touch_points):
+        df_mp = sp.lambdify(symbol, sp.diff(expr, symbol), 'mpmath')
+        for i in touch_points[np.argsort(magnitude[touch_points])][:NUMERIC_MAX_ROOTS]:
+            try:
+                # Bisection: f' has a root of odd multiplicity here, which defeats the faster solvers
+                root = float(mpmath.findroot(df_mp, (xs[i - 1], xs[i + 1]), solver='bisect'))
+            except (ValueError, ZeroDivisionError):
+                continue
+            if xs[i - 1] <= root <= xs[i + 1] and abs(complex(f_mp(root))) < 1e-8:
+                roots.append(root)
+
+    unique = []
+    for root in sorted(roots):
+        if not unique or abs(root - unique[-1]) > 1e-9:
+            unique.append(root)
+    return unique
+
+
+def solve_equation(expr, symbol):
+    """Solve expr = 0 for symbol using the cheapest applicable tier."""
+    fast = solve_polynomial_fast(expr, symbol)
+    if fast is not None:
+        return fast
+
+    start = time.perf_counter()
+    classification, degree = classify(expr, symbol)
+
+    if classification == 'polynomial' and degree >= 1:
+        roots = _polynomial_roots(sp.Poly(expr, symbol))
+        if roots is not None:
+            return _result(roots, 'polynomial-roots', classification, start)
+
+    elif classification == 'rational':
+        numerator, denominator = sp.fraction(sp.together(expr))
+        if numerator.is_polynomial(symbol) and sp.Poly(numerator, symbol).degree() >= 1:
+            poly = sp.Poly(numerator, symbol)
+            roots = _formula_roots(poly) or _polynomial_roots(poly)
+            if roots is not None:
+                # Drop candidates that make the denominator vanish (removable points / poles)
+                roots = [r for r in roots if not sp.simplify(denominator.subs(symbol, r)).is_zero]
+                return _result(sorted(roots, key=_sort_key), 'rational-numerator', classification, start)
+
+    elif classification == 'transcendental' and expr.free_symbols == {symbol}:
+        roots = _bracket_roots(expr, symbol)
+        if roots:
+            # Only NUMERIC_RANGE was searched, so roots outside it (e.g. of periodic equations) are missing
+            result = _result([sp.Float(root, 15) for root in roots], 'numeric-bracketing', classification, start)
+            return {**result, 'interval': list(NUMERIC_RANGE), 'complete': False}
+
+    return _result(sp.solve(expr, symbol), 'general', classification, start)
+
+
+def _system_result(assignments, symbols, tier, classification, start):
+    return {
+        'solutions': [{str(sym): _format_value(sp.sympify(sol[sym])) for sym in symbols if sym in sol}
+                      for sol in assignments],
+        'variables': [str(sym) for sym in symbols],
+        'tier': tier,
+        'classification': classification,
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 3)
+    }
+
+
+def _is_linear_system(equations, symbols):
+    for eq in equations:
+        if not eq.is_polynomial(*symbols):
+            return False
+        if sp.Poly(eq, *symbols).total_degree() > 1:
+            return False
+    return True
+
+
+def _solve_linear_numeric(A, b, symbols):
+    """Floating-point solve for large numeric systems; sparse when SciPy is available."""
+    A_np = np.array(A.tolist(), dtype=float)
+    b_np = np.array(b.tolist(), dtype=float).ravel()
+    n_rows, n_cols = A_np.shape
+    if n_rows != n_cols or np.linalg.matrix_rank(A_np) < n_cols:
+        return None, None
+    density = np.count_nonzero(A_np) / A_np.size
+    if density < SPARSE_DENSITY:
+        try:
+            from scipy.sparse import csr_matrix
+            from scipy.sparse.linalg import spsolve
+            values = spsolve(csr_matrix(A_np), b_np)
+            return [dict(zip(symbols, (sp.Float(v) for v in values)))], 'scipy-sparse'
+        except ImportError:
+            pass
+    values = np.linalg.solve(A_np, b_np)
+    return [dict(zip(symbols, (sp.Float(v) for v in values)))], 'numpy-dense'
+
+
+def solve_system(equations, symbols):
+    """Solve a system of equations (each expr = 0) for the given symbols."""
+    start = time.perf_counter()
+    equations = list(equations)
+    symbols = list(symbols)
+
+    if _is_linear_system(equations, symbols):
+        A, b = sp.linear_eq_to_matrix(equations, symbols)
+        if len(symbols) >= LARGE_SYSTEM_SIZE and all(v.is_number for v in A) and all(v.is_number for v in b):
+            assignments, tier = _solve_linear_numeric(A, b, symbols)
+            if assignments is not None:
+                return _system_result(assignments, symbols, tier, 'linear', start)
+        solution_set = sp.linsolve((A, b), symbols)
+        assignments = [dict(zip(symbols, values)) for values in solution_set]
+        return _system_result(assignments, symbols, 'linsolve', 'linear', start)
+
+    assignments = sp.solve(equations, symbols, dict=True)
+    return _system_result(assignments, symbols, 'general', 'nonlinear', start)
@@ -0,0 +1,317 @@
+"""
+Isolated worker pool for SymPy operations.
+
+Heavy SymPy calls (solve, integrate, simplify, ...) run in a small pool of
+worker processes instead of on the Flask request thread. Each call has a hard
+timeout; a worker that overruns it is terminated and replaced, so one nasty
+integral cannot pin a server worker or leak a stuck process.
+
+Operations that return a generator stream their items back one at a time
+(run_stream), and whatever the generator returns is the final result; the
+time budget covers the whole stream.
+
+Expressions may arrive unevaluated (the request-thread parser defers anything
+that could be expensive to evaluate); workers evaluate them before running the
+operation, so that step falls under the same timeout.
+"""
+import inspect
+import multiprocessing
+import queue
+import threading
+import time
+
+import sympy as sp
+
+from expression_parser import evaluate
+from solution_steps import explain
+from solver_strategy import solve_equation, solve_system
+
+
+class OperationTimeout(Exception):
+    """Raised when a SymPy operation exceeds its time budget."""
+
+    def __init__(self, operation, timeout):
+        super().__init__(f'{operation} timed out after {timeout:g}s')
+        self.operation = operation
+        self.timeout = timeout
+
+
+class PoolBusy(Exception):
+    """Raised when the pool's queue-depth limit is reached."""
+
+
+class OperationCancelled(Exception):
+    """Raised when a caller cancels an in-flight operation."""
+
+
+class OperationError(Exception):
+    """Raised in the parent when the operation itself failed inside a worker."""
+
+
+def _evaluate(expr, symbol=None):
+    return str(expr)
+
+
+def _solve(expr, symbol):
+    return solve_equation(expr, symbol)
+
+
+def _solve_system(equations, symbols):
+    return solve_system(equations, symbols)
+
+
+def _integrate(expr, symbol):
+    return str(sp.integrate(expr, symbol))
+
+
+def _differentiate(expr, symbol):
+    return str(sp.diff(expr, symbol))
+
+
+def _factor(expr, symbol=None):
+    return str(sp.factor(expr))
+
+
+def _simplify(expr, symbol=None):
+    return str(sp.simplify(expr))
+
+
+def _explain(operation, expr, symbol=None, with_result=True):
+    """Yield the steps of an operation, then (with_result) return its result, all in one task."""
+    try:
+        yield from explain(operation, expr, symbol)
+    except Exception as e:
+        # Missing steps must not cost the answer
+        yield {'stage': 'note', 'text': f'Step details unavailable: {e}'}
+    if with_result:
+        return OPERATIONS[operation](expr, symbol)
+    return None
+
+
+OPERATIONS = {
+    'explain': _explain,
+    'evaluate': _evaluate,
+    'solve': _solve,
+    'solve_system': _solve_system,
+    'integrate': _integrate,
+    'differentiate': _differentiate,
+    'factor': _factor,
+    'simplify': _simplify
+}
+
+
+def _evaluated(arg):
+    if isinstance(arg, sp.Basic):
+        return evaluate(arg)
+    if isinstance(arg, (list, tuple)):
+        return type(arg)(_evaluated(item) for item in arg)
+    return arg
+
+
+def run_operation(operation, *args):
+    """Run a named SymPy operation in the current process and return a JSON-serializable result."""
+    return OPERATIONS[operation](*(_evaluated(arg) for arg in args))
+
+
+def _worker_main(conn):
+    """
+    Worker loop: receive (operation, args), send back ('ok', result) or ('error', message).
+    Generator results are sent item by item as ('step', item), then ('ok', what the generator returned).
+    """
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if task is None:
+            break
+        operation, args = task
+        try:
+            value = run_operation(operation, *args)
+            if inspect.isgenerator(value):
+                steps = value
+                while True:
+                    try:
+                        item = next(steps)
+                    except StopIteration as done:
+                        value = done.value
+                        break
+                    conn.send(('step', item))
+            conn.send(('ok', value))
+        except Exception as e:
+            conn.send(('error', str(e)))
+
+
+class _Worker:
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        try:
+            self.process.terminate()
+            self.process.join(1)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+        finally:
+            self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+
+def _worker_context():
+    """
+    Workers are forked from a single-threaded fork server, not from the (multithreaded)
+    server process. Preloading __main__ and this module there means each new worker
+    is a fork of an already-initialized process rather than a fresh interpreter.
+    """
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+    ctx = multiprocessing.get_context('forkserver')
+    ctx.set_forkserver_preload(['__main__', __name__])
+    return ctx
+
+
+class SympyWorkerPool:
+    """
+    Bounded process pool with per-operation timeout, queue-depth limit and cancellation.
+    Workers are started lazily on first use.
+    """
+
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, size=2, timeout=10.0, max_queue=16):
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.max_queue = max_queue
+        self._ctx = _worker_context()
+        self._idle = queue.Queue()
+        self._slots = threading.BoundedSemaphore(self.size + max_queue)
+        self._lock = threading.Lock()
+        self._started = False
+        self.completed = 0
+        self.timeouts = 0
+        self.recycled = 0
+        self.rejected = 0
+
+    def _ensure_started(self):
+        with self._lock:
+            if not self._started:
+                for _ in range(self.size):
+                    self._idle.put(_Worker(self._ctx))
+                self._started = True
+
+    def _replace(self, worker):
+        worker.kill()
+        with self._lock:
+            self.recycled += 1
+        self._idle.put(_Worker(self._ctx))
+
+    def _messages(self, operation, args, timeout, cancel_event):
+        """
+        Send one task to a worker and yield its (kind, value) messages until it finishes.
+        A worker abandoned mid-task (timeout, cancel, crash, or the consumer stopping
+        early) is killed and replaced; a worker that finished cleanly goes back idle.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PoolBusy('Solver queue is full')
+        worker = None
+        finished = False
+        try:
+            self._ensure_started()
+            deadline = time.monotonic() + timeout
+            try:
+                worker = self._idle.get(timeout=timeout)
+            except queue.Empty:
+                with self._lock:
+                    self.timeouts += 1
+                raise OperationTimeout(operation, timeout)
+
+            worker.conn.send((operation, args))
+            while True:
+                while not worker.conn.poll(self.POLL_INTERVAL):
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise OperationCancelled(f'{operation} cancelled')
+                    if time.monotonic() >= deadline:
+                        with self._lock:
+                            self.timeouts += 1
+                        raise OperationTimeout(operation, timeout)
+                kind, value = worker.conn.recv()
+                if kind == 'step':
+                    yield kind, value
+                    continue
+                finished = True
+                with self._lock:
+                    self.completed += 1
+                if kind == 'error':
+                    raise OperationError(value)
+                yield kind, value
+                return
+        except (EOFError, OSError) as e:
+            # The worker died underneath us (e.g. out of memory); start a fresh one
+            raise OperationError(f'Solver worker crashed: {e}')
+        finally:
+            if worker is not None:
+                if finished:
+                    self._idle.put(worker)
+                else:
+                    self._replace(worker)
+            self._slots.release()
+
+    def run(self, operation, *args, timeout=None, cancel_event=None):
+        """
+        Run a named operation in a worker and return its result.
+        Raises PoolBusy, OperationTimeout, OperationCancelled or OperationError.
+        """
+        for kind, value in self._messages(operation, args, timeout, cancel_event):
+            if kind == 'ok':
+                return value
+
+    def run_stream(self, operation, *args, timeout=None, cancel_event=None):
+        """
+        Run a generator operation in a worker, yielding its items as they arrive
+        and returning the generator's return value (result = yield from ...).
+        The timeout bounds the whole stream; raises like run().
+        """
+        for kind, value in self._messages(operation, args, timeout, cancel_event):
+            if kind == 'step':
+                yield value
+            else:
+                return value
+
+    def shutdown(self):
+        """Stop all idle workers."""
+        with self._lock:
+            while True:
+                try:
+                    self._idle.get_nowait().stop()
+                except queue.Empty:
+                    break
+            self._started = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': self.size,
+                'timeout': self.timeout,
+                'max_queue': self.max_queue,
+                'completed': self.completed,
+                'timeouts': self.timeouts,
+                'recycled': self.recycled,
+                'rejected': self.rejected
+            }
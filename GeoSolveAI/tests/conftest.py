@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def client(tmp_path_factory):
+    """
+    Flask test client for app.py. The app opens geosolve.db and uploads/
+    relative to the working directory, so the session runs from a scratch
+    directory and never touches the checked-in database.
+    """
+    os.chdir(tmp_path_factory.mktemp('app'))
+    import app
+    return app.app.test_client()
@@ -0,0 +1,49 @@
+import base64
+import json
+
+import pytest
+
+import admin_lists
+
+
+def _cursor(sort_value, row_id):
+    return base64.urlsafe_b64encode(json.dumps([sort_value, row_id]).encode()).decode()
+
+
+@pytest.mark.parametrize('cursor', [_cursor([1], 1), _cursor({'a': 1}, 1), _cursor('2025-01-01', '1'), 'not-base64!'])
+def test_decode_cursor_rejects_malformed_cursors(cursor):
+    with pytest.raises(ValueError):
+        admin_lists.decode_cursor(cursor)
+
+
+@pytest.fixture
+def admin(client, monkeypatch):
+    monkeypatch.setenv('ADMIN_EMAIL', 'admin@school.test')
+    for k in range(3):
+        client.post('/api/feedback', json={'user_email': f'list{k}@school.test', 'message': 'm'})
+    return {'X-Admin-Key': 'admin@school.test'}
+
+
+def test_lists_without_limit_return_the_first_page(client, admin, monkeypatch):
+    import app
+    monkeypatch.setattr(app, 'ADMIN_PAGE_SIZE', 2)
+    body = client.get('/api/admin/feedback', headers=admin).get_json()
+    assert len(body['feedback']) == 2
+    assert body['next_cursor']
+
+
+def test_lists_with_limit_are_paged(client, admin):
+    everything = client.get('/api/admin/feedback', query_string={'limit': 1000}, headers=admin).get_json()['feedback']
+    body = client.get('/api/admin/feedback', query_string={'limit': 2}, headers=admin).get_json()
+    seen = body['feedback']
+    while body['next_cursor']:
+        body = client.get('/api/admin/feedback', query_string={'cursor': body['next_cursor'], 'limit': 2},
+                          headers=admin).get_json()
+        seen += body['feedback']
+    assert 'total' not in body
+    assert seen == everything
+
+
+def test_cursor_with_a_list_sort_value_is_a_400(client, admin):
+    response = client.get('/api/admin/quiz-submissions', query_string={'cursor': _cursor([1], 1)}, headers=admin)
+    assert response.status_code == 400
@@ -0,0 +1,28 @@
+import time
+
+import sympy as sp
+
+from expression_parser import ExpressionParser, evaluate
+
+
+def test_cheap_input_is_evaluated():
+    parser = ExpressionParser()
+    assert parser.parse('2*x*3 + x - -3') == 7 * sp.Symbol('x') + 3
+    assert parser.stats()['deferred'] == 0
+
+
+def test_huge_constants_are_left_unevaluated():
+    parser = ExpressionParser()
+    start = time.perf_counter()
+    for cleaned in ('9**9**9', 'x + 9**9**9', 'factorial(10**7)', 'factorial(3000000)'):
+        expr = parser.parse(cleaned)
+        assert not expr.is_Integer
+    assert time.perf_counter() - start < 1
+    assert parser.stats()['deferred'] == 4
+
+
+def test_evaluate_matches_an_evaluating_parse():
+    parser = ExpressionParser()
+    expr = parser.parse('2**(2**5) + factorial(5)')
+    assert parser.stats()['deferred'] == 1
+    assert evaluate(expr) == 2 ** 32 + 120
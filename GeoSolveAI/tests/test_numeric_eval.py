@@ -0,0 +1,22 @@
+from fractions import Fraction
+
+import pytest
+
+from numeric_eval import UnsupportedExpression, evaluate_constant
+
+
+@pytest.mark.parametrize('expr', ['9**9**9', '((2**4096)**4096)**8', '2**4096*2**4096*2**4096*2**4096'])
+def test_oversized_exact_results_are_rejected(expr):
+    with pytest.raises(UnsupportedExpression):
+        evaluate_constant(expr, angle_mode='radians')
+
+
+def test_large_exact_results_within_the_cap():
+    assert evaluate_constant('10**4000', angle_mode='radians') == 10 ** 4000
+    assert evaluate_constant('(2/3)**-3', angle_mode='radians') == Fraction(27, 8)
+
+
+def test_angle_mode_is_required():
+    with pytest.raises(TypeError):
+        evaluate_constant('sin(90)')
+    assert evaluate_constant('sin(90)', angle_mode='degrees') == pytest.approx(1)
@@ -0,0 +1,40 @@
+import time
+
+import pytest
+
+
+@pytest.mark.parametrize('expr', ['9**9**9', 'x + 9**9**9', '2**10**10 * sin(x)'])
+def test_huge_power_literals_are_rejected_quickly(client, expr):
+    start = time.perf_counter()
+    response = client.post('/api/plot', json={'expr': expr, 'format': 'data', 'mode': 'radians'})
+    assert response.status_code == 400
+    assert time.perf_counter() - start < 5
+
+
+def test_integer_literals_still_plot(client):
+    response = client.post('/api/plot', json={'expr': '1/2*x**2', 'format': 'data', 'encoding': 'json',
+                                              'mode': 'radians', 'from': 1, 'to': 2})
+    assert response.status_code == 200
+    curve = response.get_json()
+    assert curve['y'][0] == pytest.approx(0.5)
+
+
+@pytest.mark.parametrize('fields', [{'max_points': 'lots'}, {'max_points': [1]}, {'from': 'a'}, {'to': 'inf'},
+                                    {'from': {'x': 1}}])
+def test_non_numeric_plot_options_are_a_400(client, fields):
+    response = client.post('/api/plot', json={'expr': 'sin(x)', 'format': 'data', **fields})
+    assert response.status_code == 400
+    response = client.get('/api/plot', query_string={'expr': 'sin(x)', 'format': 'data',
+                                                    **{k: str(v) for k, v in fields.items()}})
+    assert response.status_code == 400
+
+
+def test_images_are_inline_unless_a_render_url_is_requested(client):
+    response = client.post('/api/plot', json={'expr': 'x**2', 'mode': 'radians'})
+    assert response.status_code == 200
+    assert response.get_json()['image'].startswith('data:image/png;base64,')
+
+    response = client.post('/api/plot', json={'expr': 'x**2', 'mode': 'radians', 'inline': False})
+    url = response.get_json()['image']
+    assert url.startswith('/api/render/')
+    assert client.get(url).status_code == 200
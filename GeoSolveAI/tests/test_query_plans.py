@@ -0,0 +1,29 @@
+import pytest
+
+from benchmarks.bench_queries import QUERIES
+from db import Database
+import migrations
+
+
+@pytest.fixture(scope='module')
+def conn(tmp_path_factory):
+    database = Database(str(tmp_path_factory.mktemp('plans') / 'plans.db'))
+    migrations.migrate(database)
+    with database.transaction() as c:
+        c.executemany("INSERT INTO quizzes (title, created_by) VALUES (?, 'admin')", [(f'Quiz {k}',) for k in range(3)])
+        c.executemany('''INSERT INTO quiz_questions
+                         (quiz_id, question_text, option_a, option_b, option_c, option_d, correct_answer)
+                         VALUES (?, 'Q', '1', '2', '3', '4', 'a')''', [(q,) for q in (1, 1, 2, 3)])
+        c.executemany('''INSERT INTO quiz_submissions (quiz_id, user_email, responses, score)
+                         VALUES (?, ?, '{}', 1)''', [(k % 3 + 1, f'student{k}@school.test') for k in range(10)])
+        c.executemany('INSERT INTO feedback (user_email, message, resolved) VALUES (?, ?, ?)',
+                      [(f'student{k}@school.test', 'message', k % 2) for k in range(5)])
+    with database.connection() as conn:
+        yield conn
+    database.close()
+
+
+@pytest.mark.parametrize('name', QUERIES)
+def test_hot_query_uses_its_index(conn, name):
+    old, new, params, index = QUERIES[name]
+    assert migrations.uses_index(conn, new or old, params, index), migrations.explain(conn, new or old, params)
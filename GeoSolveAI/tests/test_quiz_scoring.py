@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from db import Database
+from quiz_scoring import AnswerKey, Submission, SubmissionWriter, _Pending, grade
+import migrations
+
+
+@pytest.fixture
+def database(tmp_path):
+    database = Database(str(tmp_path / 'quiz.db'))
+    migrations.migrate(database)
+    yield database
+    database.close()
+
+
+def test_bad_row_fails_alone(database):
+    writer = SubmissionWriter(database)
+    batch = [_Pending(Submission(1, email, '{}', 1, (), ())) for email in ('a@school.test', None, 'b@school.test')]
+    writer._write(batch)
+
+    assert all(pending.done.is_set() for pending in batch)
+    assert batch[0].submission_id and batch[2].submission_id
+    assert batch[1].submission_id is None and batch[1].error is not None
+    stats = writer.stats()
+    assert (stats['written'], stats['failed'], stats['retried_batches']) == (2, 1, 1)
+    assert database.query_one('SELECT COUNT(*) FROM quiz_submissions')[0] == 2
+
+
+def test_submit_quiz_rejects_non_string_email(client):
+    response = client.post('/api/quiz-submit', json={'quiz_id': 1, 'user_email': ['x'], 'responses': {'1': 'a'}})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('responses', [{'1': ['A'], '2': 'B'}, {'1': ['A'], '2': ['B']}, {'1': ['A']},
+                                       {'1': ['A', 'B'], '2': ['B', 'A']}, {'1': {'choice': 'A'}}])
+def test_grade_keeps_non_scalar_answers_whole(responses):
+    key = AnswerKey(np.array([1, 2], dtype=np.int64), np.array(['A', 'B'], dtype=object))
+    result = grade(key, responses)
+    assert list(result.correct) == [2] * isinstance(responses.get('2'), str)
+    assert len(result.attempted) == len(responses)
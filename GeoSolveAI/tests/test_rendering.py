@@ -0,0 +1,39 @@
+import threading
+
+from rendering import FigurePool
+
+
+def test_pooled_axes_do_not_keep_an_equal_aspect():
+    pool = FigurePool(max_per_key=1)
+    with pool.axes((4, 3)) as (fig, ax):
+        ax.plot([0, 1], [0, 2])
+        ax.set_aspect('equal', adjustable='datalim')
+        fig.canvas.draw()
+    with pool.axes((4, 3)) as (fig, reused):
+        assert reused is ax
+        assert reused.get_aspect() == 'auto'
+        assert reused.get_adjustable() == 'box'
+    assert pool.stats()['reused'] == 1
+
+
+def test_figures_are_shared_across_threads_up_to_the_cap():
+    pool = FigurePool(max_per_key=2, max_idle=2)
+    with pool.axes((4, 3)) as (fig, ax):
+        pass
+    borrowed = []
+
+    def borrow():
+        with pool.axes((4, 3)) as (_, reused):
+            borrowed.append(reused)
+
+    worker = threading.Thread(target=borrow)
+    worker.start()
+    worker.join()
+    assert borrowed == [ax]
+
+    with pool.axes((4, 3)), pool.axes((5, 3)), pool.axes((6, 3)):
+        pass
+    stats = pool.stats()
+    assert stats['idle'] == 2
+    assert stats['discarded'] == 1
+    assert stats['created'] == 3
@@ -0,0 +1,50 @@
+import math
+import time
+
+import pytest
+
+
+@pytest.mark.parametrize('query', ['9**9**9', '9^9^9', '((2**4096)**4096)**8', '2**4096*2**4096*2**4096*2**4096'])
+def test_oversized_powers_are_a_quick_400(client, query):
+    start = time.perf_counter()
+    response = client.post('/api/solve', json={'query': query})
+    assert response.status_code == 400
+    assert time.perf_counter() - start < 5
+
+
+def test_large_exact_results_within_the_cap_still_evaluate(client):
+    response = client.post('/api/solve', json={'query': '2**100'})
+    assert response.status_code == 200
+    assert response.get_json()['solution'] == str(2 ** 100)
+
+
+@pytest.mark.parametrize('query', ['solve x = 9**9**9', 'integrate x*9^9^9', 'diff x*9^9^9'])
+def test_huge_constants_are_evaluated_under_the_pool_timeout(client, monkeypatch, query):
+    import app
+    monkeypatch.setattr(app.sympy_pool, 'timeout', 1.0)
+    start = time.perf_counter()
+    response = client.post('/api/solve', json={'query': query})
+    assert response.status_code == 504
+    assert response.get_json()['timed_out']
+    assert time.perf_counter() - start < 5
+
+
+def test_bracketed_solutions_are_marked_incomplete(client):
+    payload = client.post('/api/solve', json={'query': 'solve cos(x) = x/20'}).get_json()
+    assert payload['solver']['tier'] == 'numeric-bracketing'
+    assert payload['solver']['complete'] is False
+    assert any('[-10, 10]' in step for step in payload['steps'])
+
+
+@pytest.mark.parametrize('query, solution', [('sin 90', '1'), ('sin(1.5 rad)', f'{math.sin(1.5):.6f}'),
+                                             ('cos 0 radians', '1'), ('acos 0.5 rad', 'π/3')])
+def test_trig_constants_take_a_radian_suffix(client, query, solution):
+    response = client.post('/api/solve', json={'query': query})
+    assert response.status_code == 200
+    assert response.get_json()['solution'] == solution
+
+
+def test_trig_tables_take_a_radian_suffix(client):
+    payload = client.post('/api/solve', json={'query': 'sin 0..3 step 1 rad'}).get_json()
+    assert [row['value'] for row in payload['solution']] == [round(math.sin(k), 6) for k in range(4)]
+    assert 'rad' in payload['steps'][0]
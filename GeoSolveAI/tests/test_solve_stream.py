@@ -0,0 +1,42 @@
+import json
+import time
+
+
+def _events(response):
+    events = []
+    for block in response.get_data(as_text=True).strip().split('\n\n'):
+        event, data = block.split('\n')
+        events.append((event[len('event: '):], json.loads(data[len('data: '):])))
+    return events
+
+
+def test_steps_and_result_come_from_one_worker_task(client):
+    import app
+    before = app.sympy_pool.stats()['completed']
+    events = _events(client.post('/api/solve/stream', json={'query': 'integrate x*cos(x)'}))
+    assert app.sympy_pool.stats()['completed'] == before + 1
+
+    assert any(data['stage'] == 'rule' for event, data in events if event == 'step')
+    event, result = events[-1]
+    assert event == 'result' and result['status'] == 200
+    expected = client.post('/api/solve', json={'query': 'integrate x*cos(x)'}).get_json()
+    assert result['solution'] == expected['solution']
+
+
+def test_closing_a_batch_stream_frees_its_workers(client):
+    import app
+    before = app.sympy_pool.stats()
+    slow = 'integrate exp(x^2)*log(x)*sin(x)^3/(1+x^3)'
+    response = client.post('/api/solve/batch', json={'queries': ['2+2', slow], 'stream': True}, buffered=False)
+    lines = response.response
+    assert json.loads(next(iter(lines)))['query'] == '2+2'
+    # Give the slow query time to reach a worker, then hang up
+    deadline = time.monotonic() + 5
+    while app.sympy_pool._idle.qsize() == app.sympy_pool.size and time.monotonic() < deadline:
+        time.sleep(0.05)
+    start = time.monotonic()
+    response.close()
+    while app.sympy_pool.stats()['recycled'] == before['recycled'] and time.monotonic() - start < 5:
+        time.sleep(0.05)
+    assert app.sympy_pool.stats()['recycled'] == before['recycled'] + 1
+    assert app.sympy_pool.stats()['timeouts'] == before['timeouts']
@@ -0,0 +1,35 @@
+import math
+
+import pytest
+import sympy as sp
+
+from solver_strategy import solve_equation
+
+x = sp.Symbol('x')
+
+
+@pytest.mark.parametrize('expr, period', [(sp.cos(x) - 1, 2 * math.pi), (sp.sin(x) ** 2, math.pi),
+                                          (sp.sin(x) ** 4, math.pi)])
+def test_even_multiplicity_roots_are_bracketed(expr, period):
+    result = solve_equation(expr, x)
+    assert result['tier'] == 'numeric-bracketing'
+    expected = [k * period for k in range(-10, 11) if abs(k * period) <= 10]
+    assert [float(s) for s in result['solutions']] == pytest.approx(expected, abs=1e-9)
+
+
+def test_symbolic_coefficients_skip_the_formula_tier():
+    result = solve_equation(x ** 2 - x * sp.Symbol('y'), x)
+    assert result['tier'] == 'polynomial-roots'
+    assert result['solutions'] == ['0', 'y']
+
+
+def test_bracketed_roots_format_like_the_exact_tiers():
+    assert solve_equation(sp.sin(x), x)['solutions'][3] == solve_equation(x, x)['solutions'][0] == '0'
+    assert solve_equation((x - 1) ** 2 * sp.exp(x), x)['solutions'] == solve_equation(x - 1, x)['solutions']
+
+
+def test_bracketed_roots_report_the_interval_searched():
+    result = solve_equation(sp.sin(x), x)
+    assert result['interval'] == [-10.0, 10.0]
+    assert result['complete'] is False
+    assert 'complete' not in solve_equation(x ** 2 - 4, x)
@@ -0,0 +1,53 @@
+import threading
+import time
+
+import pytest
+import sympy as sp
+
+from sympy_worker import OperationCancelled, OperationTimeout, PoolBusy, SympyWorkerPool
+
+x = sp.Symbol('x')
+# Left unevaluated here; the worker evaluating it never finishes
+SLOW = sp.Pow(9, sp.Pow(9, 9, evaluate=False), evaluate=False)
+
+
+@pytest.fixture
+def pool():
+    pool = SympyWorkerPool(size=1, timeout=5.0, max_queue=0)
+    yield pool
+    pool.shutdown()
+
+
+def test_slow_operation_times_out_and_the_worker_is_replaced(pool):
+    with pytest.raises(OperationTimeout):
+        pool.run('evaluate', SLOW, timeout=0.5)
+    assert pool.stats()['timeouts'] == 1
+    assert pool.stats()['recycled'] == 1
+    # The replacement worker takes the next task
+    assert pool.run('differentiate', x ** 3, x) == '3*x**2'
+
+
+def test_full_queue_raises_pool_busy(pool):
+    cancel = threading.Event()
+    outcome = []
+
+    def occupy():
+        try:
+            pool.run('evaluate', SLOW, cancel_event=cancel)
+        except Exception as e:
+            outcome.append(e)
+
+    occupier = threading.Thread(target=occupy)
+    occupier.start()
+    # The pool starts its workers only after the occupying call has taken the single slot
+    deadline = time.monotonic() + 5
+    while not pool._started and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    with pytest.raises(PoolBusy):
+        pool.run('differentiate', x ** 3, x)
+    assert pool.stats()['rejected'] == 1
+
+    cancel.set()
+    occupier.join(5)
+    assert isinstance(outcome[0], OperationCancelled)
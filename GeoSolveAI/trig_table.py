@@ -0,0 +1,183 @@
+"""
+Precomputed exact values for trigonometric constants.
+
+At import, exact values of all six trig functions are built once with SymPy
+for every standard angle (multiples of 15 degrees over a full turn), together
+with reverse indexes for the six inverse functions. Lookups are plain dict
+hits. Angles off the table are evaluated with NumPy, and whole ranges such as
+"sin 0..360 step 15" are evaluated in one vectorized call.
+"""
+import math
+from fractions import Fraction
+
+import numpy as np
+import sympy as sp
+
+FUNCTIONS = ('sin', 'cos', 'tan', 'cot', 'sec', 'csc')
+INVERSE_FUNCTIONS = ('asin', 'acos', 'atan', 'acot', 'asec', 'acsc')
+STANDARD_STEP = 15
+
+# Largest number of rows a single vectorized table request may produce
+MAX_TABLE_ROWS = 5000
+
+_SYMPY_FUNCS = {'sin': sp.sin, 'cos': sp.cos, 'tan': sp.tan, 'cot': sp.cot, 'sec': sp.sec, 'csc': sp.csc}
+
+_NUMPY_FUNCS = {
+    'sin': np.sin,
+    'cos': np.cos,
+    'tan': np.tan,
+    'cot': lambda r: 1 / np.tan(r),
+    'sec': lambda r: 1 / np.cos(r),
+    'csc': lambda r: 1 / np.sin(r)
+}
+
+_INVERSE_NUMPY = {
+    'asin': np.arcsin,
+    'acos': np.arccos,
+    'atan': np.arctan,
+    'acot': lambda v: np.arctan2(1, v),
+    'asec': lambda v: np.arccos(1 / v),
+    'acsc': lambda v: np.arcsin(1 / v)
+}
+
+# Principal value ranges (degrees, inclusive) used to invert the forward table
+_PRINCIPAL_RANGES = {
+    'asin': ('sin', -90, 90),
+    'acos': ('cos', 0, 180),
+    'atan': ('tan', -90, 90),
+    'acot': ('cot', 0, 180),
+    'asec': ('sec', 0, 180),
+    'acsc': ('csc', -90, 90)
+}
+
+
+def format_exact(value):
+    """Render an exact SymPy value in the app's notation: √(3)/2, UNDEFINED, ..."""
+    if value is sp.zoo or value.has(sp.zoo, sp.nan):
+        return 'UNDEFINED'
+    return str(value).replace('sqrt', '√')
+
+
+def format_radians(degrees):
+    """Exact radian form of a degree value, e.g. 30 -> 'π/6'."""
+    ratio = Fraction(degrees).limit_denominator(360) / 180
+    if ratio == 0:
+        return '0'
+    sign = '-' if ratio < 0 else ''
+    ratio = abs(ratio)
+    numerator = '' if ratio.numerator == 1 else str(ratio.numerator)
+    if ratio.denominator == 1:
+        return f'{sign}{numerator}π'
+    return f'{sign}{numerator}π/{ratio.denominator}'
+
+
+def _value_key(value):
+    return round(value, 9)
+
+
+def _build_tables():
+    forward = {}
+    for degrees in range(0, 360, STANDARD_STEP):
+        angle = sp.pi * degrees / 180
+        for name, func in _SYMPY_FUNCS.items():
+            exact = func(angle)
+            defined = not (exact is sp.zoo or exact.has(sp.zoo, sp.nan))
+            forward[(name, degrees)] = (format_exact(exact), float(exact) if defined else None)
+
+    inverse = {}
+    for name, (forward_name, low, high) in _PRINCIPAL_RANGES.items():
+        for degrees in range(low, high + 1, STANDARD_STEP):
+            exact, numeric = forward[(forward_name, degrees % 360)]
+            if numeric is None:
+                continue
+            inverse.setdefault((name, _value_key(numeric)), (degrees, exact))
+    return forward, inverse
+
+
+EXACT_VALUES, INVERSE_VALUES = _build_tables()
+
+
+def _standard_degrees(degrees):
+    """Map an angle in degrees to its table key, or None if it is not a standard angle."""
+    reduced = degrees % 360
+    nearest = round(reduced / STANDARD_STEP) * STANDARD_STEP
+    if abs(reduced - nearest) > 1e-9:
+        return None
+    return int(nearest) % 360
+
+
+def to_degrees(angle, unit='degrees'):
+    return angle if unit == 'degrees' else math.degrees(angle)
+
+
+def lookup(func_name, angle, unit='degrees'):
+    """Exact table entry (exact_str, float_or_None) for a standard angle, else None."""
+    key = _standard_degrees(to_degrees(angle, unit))
+    if key is None:
+        return None
+    return EXACT_VALUES[(func_name, key)]
+
+
+def evaluate(func_name, angle, unit='degrees'):
+    """Return (exact_str_or_None, float_or_None). A None float means the value is undefined."""
+    entry = lookup(func_name, angle, unit)
+    if entry is not None:
+        return entry
+    radians = math.radians(angle) if unit == 'degrees' else angle
+    with np.errstate(divide='ignore'):
+        value = float(_NUMPY_FUNCS[func_name](np.float64(radians)))
+    if not math.isfinite(value) or abs(value) > 1e15:
+        return None, None
+    return None, value
+
+
+def lookup_inverse(func_name, value):
+    """Exact principal angle (degrees, exact_value_str) for a standard input value, else None."""
+    return INVERSE_VALUES.get((func_name, _value_key(value)))
+
+
+def evaluate_inverse(func_name, value):
+    """Return (degrees_float_or_None, exact_degrees_or_None). None degrees means outside the domain."""
+    entry = lookup_inverse(func_name, value)
+    if entry is not None:
+        return float(entry[0]), entry[0]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        radians = float(_INVERSE_NUMPY[func_name](np.float64(value)))
+    if not math.isfinite(radians):
+        return None, None
+    return math.degrees(radians), None
+
+
+def table(func_name, start, stop, step, unit='degrees'):
+    """
+    Evaluate func over start..stop (inclusive) in one vectorized pass.
+    Standard angles carry their exact value from the precomputed table.
+    """
+    if step <= 0:
+        raise ValueError('Step must be positive')
+    count = int(math.floor((stop - start) / step + 1e-9)) + 1
+    if count <= 0:
+        raise ValueError('Empty range')
+    if count > MAX_TABLE_ROWS:
+        raise ValueError(f'Range produces more than {MAX_TABLE_ROWS} rows')
+
+    angles = start + step * np.arange(count)
+    radians = np.radians(angles) if unit == 'degrees' else angles
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = _NUMPY_FUNCS[func_name](radians)
+
+    rows = []
+    for angle, value in zip(angles.tolist(), values.tolist()):
+        entry = lookup(func_name, angle, unit)
+        if entry is not None:
+            exact, value = entry
+        else:
+            exact = None
+            if not math.isfinite(value) or abs(value) > 1e15:
+                value = None
+        rows.append({
+            'angle': angle,
+            'value': None if value is None else round(value, 6),
+            'exact': exact if exact is not None else ('UNDEFINED' if value is None else None)
+        })
+    return rows